@@ -0,0 +1,122 @@
+import arcade
+from assets import ASSETS
+from profiler import PROFILER
+
+# Sprites this far outside the view still count as visible (about one tile)
+VIEW_MARGIN = 100
+
+
+class AnimationClip:
+    """One animation, defined once and shared by every sprite that plays it.
+
+    frames are indices into the spritesheet `sheet` (see assets.ASSET_CATALOG), each
+    shown for frame_time seconds. After the last frame the clip loops back to
+    frames[loop_from]. An autostart clip plays from the start of the race, in step on
+    every sprite; the others wait for AnimatedSprite.start_animation().
+    """
+
+    def __init__(self, sheet, frame_time, frames, loop_from=0, autostart=True):
+        self.sheet = sheet
+        self.frame_time = frame_time
+        self.frames = tuple(frames)
+        self.loop_from = loop_from
+        self.autostart = autostart
+
+    def frame(self, ticks):
+        """Sheet frame shown `ticks` frame times after the clip started."""
+        if ticks >= len(self.frames):
+            loop = len(self.frames) - self.loop_from
+            ticks = self.loop_from + (ticks - self.loop_from) % loop
+        return self.frames[ticks]
+
+
+ANIMATION_CLIPS = {
+    "fire": AnimationClip("fire_sheet", 0.5, (0, 1, 2)),
+    "drone": AnimationClip("drone_sheet", 0.1, (0, 1)),
+    # Lights up when the player gets close, then loops between frames 3 and 4 at max fire
+    "fire_dispenser": AnimationClip("fire_dispenser_sheet", 0.15, (1, 2, 3, 4), loop_from=2, autostart=False),
+}
+
+
+class AnimatedSprite(arcade.Sprite):
+    """Sprite playing an animation clip; its texture is set by the level's Animator."""
+
+    def __init__(self, clip_name):
+        super().__init__()
+        self.clip = ANIMATION_CLIPS[clip_name]
+        # Frames are shared by every sprite of the clip
+        self.textures = ASSETS.get(self.clip.sheet)
+        self.reset_animation()
+
+    def reset_animation(self):
+        """Back to the first frame; a clip that does not autostart waits again."""
+        self.texture = self.textures[0]
+        # Animator tick the clip started on, None while it waits
+        self.started_at = 0 if self.clip.autostart else None
+        self.is_stopped = False
+
+    def start_animation(self, tick):
+        self.started_at = tick
+        self.texture = self.textures[self.clip.frames[0]]
+
+    def stop_animation(self):
+        """Freezes the current frame (stopped traps, broken obstacles)."""
+        self.is_stopped = True
+
+
+class Animator:
+    """Clock shared by every animated sprite of a level, with batched texture updates.
+
+    Frame indices come from the clock, so a clip changes frame on the same step for
+    every sprite playing it. update() only sets textures on the steps where a clip's
+    frame changes, and then only for the sprites in view: off-screen sprites cost
+    nothing. A sprite scrolling into view shows the frame it last had until its
+    clip's next frame, at most one frame time. Sprites waiting to start are asked
+    every step, so they start on the step their trigger holds.
+    """
+
+    def __init__(self):
+        self.time = 0.0
+        # Sprite list -> clip tick it was last updated on
+        self._ticks = {}
+
+    def reset(self):
+        self.time = 0.0
+        self._ticks.clear()
+
+    def advance(self, delta_time):
+        self.time += delta_time
+
+    def update(self, sprite_lists, view_bottom, view_top, trigger=None):
+        """Starts the waiting sprites whose trigger holds, then sets the textures of
+        the sprites in view whose clip changed frame.
+
+        Sprites of a clip that does not autostart start once trigger(sprite) is true;
+        it is asked every step, for every waiting sprite of the lists (the streamed
+        sprites around the view, a handful per clip).
+        """
+        bottom = view_bottom - VIEW_MARGIN
+        top = view_top + VIEW_MARGIN
+        for sprites in sprite_lists:
+            if not sprites:
+                continue
+            clip = sprites[0].clip
+            tick = int(self.time / clip.frame_time)
+
+            updated = 0
+            if trigger is not None and not clip.autostart:
+                for sprite in sprites:
+                    if sprite.started_at is None and not sprite.is_stopped and trigger(sprite):
+                        sprite.start_animation(tick)
+                        updated += 1
+
+            if self._ticks.get(sprites) != tick:
+                self._ticks[sprites] = tick
+                for sprite in sprites:
+                    if sprite.started_at is None or sprite.is_stopped or not bottom < sprite.center_y < top:
+                        continue
+                    texture = sprite.textures[clip.frame(tick - sprite.started_at)]
+                    if sprite.texture is not texture:
+                        sprite.texture = texture
+                        updated += 1
+            PROFILER.count("sprites_animated", updated)
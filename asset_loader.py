@@ -0,0 +1,69 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import arcade
+from assets import ASSETS
+from constants import ASSET_LOADER_THREADS
+from level_loader import ATLAS_UPLOADS_PER_FRAME
+
+
+class AssetLoader:
+    """Loads the game's assets on worker threads while the window keeps drawing.
+
+    start() hands every asset to a small thread pool, where ASSETS.acquire() decodes
+    the images and sounds. update(), called once per frame on the main thread, takes
+    the finished assets in order and adds their textures to the texture atlas a few
+    at a time, so no single frame stalls. An asset counts towards progress once it is
+    decoded and all its textures are on the GPU; done is True when every asset is.
+
+    A failed load raises its exception from update(), on the main thread.
+    """
+
+    def __init__(self, assets, workers=ASSET_LOADER_THREADS):
+        self.assets = list(assets)
+        self.workers = workers
+        self.loaded = 0
+        # Seconds from start() until everything was loaded
+        self.seconds = None
+        self._futures = []
+        self._pending_textures = []
+        self._start = 0.0
+
+    def start(self):
+        self._start = time.perf_counter()
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="assets")
+        self._futures = [pool.submit(ASSETS.acquire, asset) for asset in self.assets]
+        # The workers exit once the queue is empty; nothing waits for them here
+        pool.shutdown(wait=False)
+
+    @property
+    def progress(self):
+        """Share of the assets loaded, 0 to 1."""
+        return self.loaded / len(self.assets) if self.assets else 1.0
+
+    @property
+    def done(self):
+        return self.loaded == len(self.assets)
+
+    def update(self):
+        """Uploads the next few textures of the decoded assets to the texture atlas."""
+        atlas = arcade.get_window().ctx.default_atlas
+        uploads = ATLAS_UPLOADS_PER_FRAME
+        while uploads and not self.done:
+            if not self._pending_textures:
+                future = self._futures[self.loaded]
+                if not future.done():
+                    break
+                asset = future.result()
+                if isinstance(asset, list):
+                    self._pending_textures = list(asset)
+                elif isinstance(asset, arcade.Texture):
+                    self._pending_textures = [asset]
+            while uploads and self._pending_textures:
+                texture = self._pending_textures.pop(0)
+                if not atlas.has_texture(texture):
+                    atlas.add(texture)
+                uploads -= 1
+            if not self._pending_textures:
+                self.loaded += 1
+        if self.done and self.seconds is None:
+            self.seconds = time.perf_counter() - self._start
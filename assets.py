@@ -0,0 +1,175 @@
+import threading
+import arcade
+import PIL.Image
+
+# Named assets shared across the game
+# ("texture", path): whole image
+# ("texture", path, x, y, width, height): region of an image
+# ("spritesheet", path, frame_width, frame_height, columns, count): list of frames
+# ("sound", path)
+# ("font", path): registers a font file so text can use it by name
+ASSET_CATALOG = {
+    # Player and bot
+    "player_car": ("texture", "assets/sprites/player/player_car.png"),
+    "player_sheet": ("spritesheet", "assets/sprites/player/player_animations.png", 44, 80, 4, 16),
+    "bot_sheet": ("spritesheet", "assets/sprites/bots/bot_animations.png", 44, 80, 4, 16),
+    # HUD and screen overlays
+    "dashboard_sheet": ("spritesheet", "assets/sprites/player/dashboard.png", 500, 200, 2, 10),
+    "heart": ("texture", "assets/sprites/player/heart.png"),
+    "skull": ("texture", "assets/sprites/player/skull.png"),
+    "light": ("texture", "assets/sprites/obstacles/light.png"),
+    "hit_wall": ("texture", "assets/sprites/player/hit_wall.png"),
+    "start_screen": ("texture", "assets/sprites/player/start_screen.png"),
+    # Obstacles
+    "broken_texture": ("texture", "assets/sprites/obstacles/broken_texture.png"),
+    "fire_sheet": ("spritesheet", "assets/sprites/obstacles/fire.png", 64, 64, 3, 3),
+    "fire_dispenser_sheet": ("spritesheet", "assets/sprites/obstacles/fire_dispenser.png", 64, 64, 5, 5),
+    "drone_sheet": ("spritesheet", "assets/sprites/obstacles/drones.png", 64, 64, 2, 2),
+    # Sounds
+    "engine_start": ("sound", "assets/sounds/player/start_engine.wav"),
+    "engine_low": ("sound", "assets/sounds/player/low_speed.wav"),
+    "engine_mid": ("sound", "assets/sounds/player/mid_speed.wav"),
+    "engine_high": ("sound", "assets/sounds/player/high_speed.wav"),
+    "win_sound": ("sound", "assets/sounds/player/win.wav"),
+    "loss_sound": ("sound", "assets/sounds/player/loss.wav"),
+    "crash_sound": ("sound", "assets/sounds/player/crash.wav"),
+    "button_sound": ("sound", "assets/sounds/player/button.wav"),
+    "life_lost_sound": ("sound", "assets/sounds/player/life_lost.wav"),
+    # Fonts
+    "pixelify_font": ("font", "assets/font/Pixelify_Sans/static/PixelifySans-Regular.ttf"),
+}
+
+
+class AssetRegistry:
+    """Process-wide cache of textures, spritesheets, sounds and fonts.
+
+    An asset is either a name from the catalog or a spec tuple as in ASSET_CATALOG.
+    Each file is decoded once; every later request gets the same objects back.
+    Safe to use from loader threads while the main thread runs the game: different
+    assets decode in parallel, and a thread asking for an asset that another thread
+    is decoding waits for that one instead of decoding it again.
+
+    get() loads and caches without taking a reference. acquire() also counts the
+    caller as a user until it calls release(). Nothing is dropped when a count
+    reaches zero, so a level that is torn down and rebuilt (retry) finds everything
+    still loaded; collect() evicts whatever nobody holds at that point.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._assets = {}
+        self._refs = {}
+        # Decoded source images, shared by every texture and frame cut from them
+        self._images = {}
+        # Number of image and sound files decoded so far
+        self.file_loads = 0
+        self._lock = threading.RLock()
+        # One lock per asset or image being decoded, so only its users wait for it
+        self._loading = {}
+
+    def _spec(self, asset):
+        if isinstance(asset, str):
+            return self.catalog[asset]
+        return tuple(asset)
+
+    def get(self, asset):
+        """Returns a loaded asset, loading it on first use."""
+        spec = self._spec(asset)
+        return self._cached(self._assets, spec, lambda: self._load(spec))
+
+    def acquire(self, asset):
+        """Like get(), and keeps the asset loaded until the matching release()."""
+        spec = self._spec(asset)
+        with self._lock:
+            self._refs[spec] = self._refs.get(spec, 0) + 1
+        return self.get(spec)
+
+    def _cached(self, table, key, load):
+        """table[key], calling load() outside the registry lock if it is missing."""
+        # Cached entries are returned without waiting for a load on another thread
+        value = table.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            value = table.get(key)
+            if value is None:
+                value = load()
+                with self._lock:
+                    table[key] = value
+                    self._loading.pop(key, None)
+            return value
+
+    def release(self, asset):
+        spec = self._spec(asset)
+        with self._lock:
+            count = self._refs.get(spec, 0)
+            if count <= 0:
+                raise ValueError(f"Asset {asset!r} released more often than acquired")
+            if count == 1:
+                del self._refs[spec]
+            else:
+                self._refs[spec] = count - 1
+
+    def preload(self, assets):
+        """Loads assets ahead of time so the first frame using them does no file IO."""
+        for asset in assets:
+            self.get(asset)
+
+    def collect(self):
+        """Evicts every asset without references and returns how many were dropped."""
+        with self._lock:
+            unused = [spec for spec in self._assets if spec not in self._refs]
+            for spec in unused:
+                del self._assets[spec]
+            live_paths = {spec[1] for spec in self._assets}
+            for path in list(self._images):
+                if path not in live_paths:
+                    del self._images[path]
+            return len(unused)
+
+    def is_loaded(self, asset):
+        return self._spec(asset) in self._assets
+
+    def _image(self, path):
+        return self._cached(self._images, path, lambda: self._decode_image(path))
+
+    def _decode_image(self, path):
+        image = PIL.Image.open(path).convert("RGBA")
+        with self._lock:
+            self.file_loads += 1
+        return image
+
+    def _load(self, spec):
+        kind, path = spec[0], spec[1]
+        if kind == "texture":
+            if len(spec) == 2:
+                return arcade.Texture(path, self._image(path), hit_box_algorithm="Simple")
+            x, y, width, height = spec[2:]
+            image = self._image(path).crop((x, y, x + width, y + height))
+            return arcade.Texture(f"{path}-{x}-{y}-{width}-{height}", image, hit_box_algorithm="Simple")
+        if kind == "spritesheet":
+            frame_width, frame_height, columns, count = spec[2:]
+            source = self._image(path)
+            frames = []
+            for frame in range(count):
+                x = frame % columns * frame_width
+                y = frame // columns * frame_height
+                image = source.crop((x, y, x + frame_width, y + frame_height))
+                frames.append(arcade.Texture(f"{path}-{frame}", image, hit_box_algorithm="Simple"))
+            return frames
+        if kind == "sound":
+            sound = arcade.load_sound(path)
+            with self._lock:
+                self.file_loads += 1
+            return sound
+        if kind == "font":
+            arcade.load_font(path)
+            with self._lock:
+                self.file_loads += 1
+            return path
+        raise ValueError(f"Unknown asset kind '{kind}' in {spec}")
+
+
+ASSETS = AssetRegistry(ASSET_CATALOG)
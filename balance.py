@@ -0,0 +1,268 @@
+"""Monte Carlo balancing of the bot presets (BOT_DIFFICULTY in constants.py).
+
+Each level's preset is judged on many seeded headless races. The player is driven by
+an input script and the race goes on until the bot finishes or explodes. A bot should
+finish BALANCE_BOT_MARGIN seconds after the player's reference time, and should
+finish at all in most races (FINISH_RATE_TARGET).
+
+The search starts from the current preset. Every round races the best preset so far
+and a few random variations of it, all on the same seeds so they are compared on the
+same races. max_speed is also rescaled from the measured finish times, because a
+finish time goes with 1 / speed. The winner is then raced again on fresh seeds for
+the confidence intervals. The races run on a process pool, one worker per core.
+
+    python balance.py                            # every level with a reference time
+    python balance.py --levels 1 2 --races 400
+    python balance.py --target 6=55              # level 6 has no reference time
+    python balance.py --apply                    # also write the table into constants.py
+
+The proposed table, with the confidence intervals, is written as JSON.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+RESULTS_PATH = "balance/proposed.json"
+CONSTANTS_PATH = "constants.py"
+
+# Share of races the bot should finish
+FINISH_RATE_TARGET = 0.9
+# Score weights: a finish time TIME_TOLERANCE seconds off the target costs as much as
+# a finish rate RATE_TOLERANCE short of FINISH_RATE_TARGET, or bots stopping on
+# average PROGRESS_TOLERANCE of the track short of the finish
+TIME_TOLERANCE = 2.0
+RATE_TOLERANCE = 0.1
+PROGRESS_TOLERANCE = 0.1
+# Score of a preset whose bot never finishes, on top of its shortfalls
+NO_FINISH_SCORE = 100.0
+
+# Preset entries the search varies: (low, high, step, variation)
+# variation is relative for scale-like entries and absolute for chances
+PARAMETERS = {
+    "reaction_time": (0.1, 1.5, 0.05, ("relative", 0.25)),
+    "lane_change_chance": (0.0, 1.0, 0.05, ("absolute", 0.1)),
+    "follow_accuracy": (0.0, 1.0, 0.05, ("absolute", 0.1)),
+    "max_speed": (3.0, 9.0, 0.1, ("relative", 0.05)),
+    "awareness_distance": (100, 800, 10, ("relative", 0.25)),
+    "avoidance_strength": (0.0, 1.0, 0.05, ("absolute", 0.15)),
+    "panic_chance": (0.0, 1.0, 0.05, ("absolute", 0.1)),
+}
+
+
+def bot_done(car, level):
+    """Race end for balancing: the bot finished or exploded."""
+    bot = level.bot_list[0]
+    return bot.race_finished or bot.exploding
+
+
+def race_bot(task):
+    """Runs one race with the given preset in this worker.
+
+    Returns (finish time or None, share of the track the bot covered).
+    """
+    level_index, preset, seed, script_name = task
+    import constants
+    import headless
+    # Each worker is its own process: the preset only changes there
+    constants.BOT_DIFFICULTY[constants.LEVEL_MANIFEST_LIST[level_index]["bot_difficulty"]] = preset
+    result = headless.run_race(level_index, headless.INPUT_SCRIPTS[script_name], seed=seed, bots=1, until=bot_done)
+    return result["bot_finish_time"], result["bot_progress"]
+
+
+def race_presets(pool, level_index, presets, seeds, args):
+    """Races every preset on every seed; returns the race_bot() results per preset."""
+    tasks = [(level_index, preset, seed, args.script) for preset in presets for seed in seeds]
+    # A few chunks per worker: few round trips, and the workers finish together
+    chunksize = max(1, len(tasks) // (4 * args.jobs))
+    times = list(pool.map(race_bot, tasks, chunksize=chunksize))
+    return [times[i * len(seeds):(i + 1) * len(seeds)] for i in range(len(presets))]
+
+
+def summarize(results, target):
+    """Finish time and finish rate of a preset's races, with 95% confidence intervals."""
+    finished = [finish_time for finish_time, progress in results if finish_time is not None]
+    races = len(results)
+    rate = len(finished) / races
+    # Wilson score interval for the finish rate
+    z = 1.96
+    centre = (rate + z * z / (2 * races)) / (1 + z * z / races)
+    half = z * math.sqrt(rate * (1 - rate) / races + z * z / (4 * races * races)) / (1 + z * z / races)
+    summary = {
+        "races": races,
+        "finish_rate": rate,
+        "finish_rate_ci": [max(0.0, centre - half), min(1.0, centre + half)],
+        "finish_time": None,
+        "finish_time_ci": None,
+        "target_time": target,
+        # Finished races count as the whole track
+        "progress": sum(1.0 if finish_time is not None else progress for finish_time, progress in results) / races,
+    }
+    if finished:
+        mean = sum(finished) / len(finished)
+        spread = math.sqrt(sum((value - mean) ** 2 for value in finished) / max(1, len(finished) - 1))
+        margin = z * spread / math.sqrt(len(finished))
+        summary["finish_time"] = mean
+        summary["finish_time_sd"] = spread
+        summary["finish_time_ci"] = [mean - margin, mean + margin]
+    summary["score"] = score(summary)
+    return summary
+
+
+def score(summary):
+    """How far a preset is from the targets; 0 is on target."""
+    shortfall = max(0.0, FINISH_RATE_TARGET - summary["finish_rate"]) / RATE_TOLERANCE
+    stopped = (1.0 - summary["progress"]) / PROGRESS_TOLERANCE
+    if summary["finish_time"] is None:
+        error = NO_FINISH_SCORE ** 0.5
+    else:
+        error = (summary["finish_time"] - summary["target_time"]) / TIME_TOLERANCE
+    return error ** 2 + shortfall ** 2 + stopped ** 2
+
+
+def clamp(name, value):
+    low, high, step, variation = PARAMETERS[name]
+    value = min(high, max(low, round(value / step) * step))
+    return int(value) if isinstance(step, int) else round(value, 2)
+
+
+def vary(preset, rng):
+    """A random variation of a preset."""
+    varied = dict(preset)
+    for name, (low, high, step, (kind, amount)) in PARAMETERS.items():
+        if kind == "relative":
+            value = preset[name] * math.exp(rng.gauss(0.0, amount))
+        else:
+            value = preset[name] + rng.gauss(0.0, amount)
+        varied[name] = clamp(name, value)
+    return varied
+
+
+def rescale_speed(preset, summary):
+    """The preset with max_speed set for the target time (finish time goes with 1 / speed)."""
+    if summary["finish_time"] is None:
+        return dict(preset)
+    scaled = dict(preset)
+    scaled["max_speed"] = clamp("max_speed", preset["max_speed"] * summary["finish_time"] / summary["target_time"])
+    return scaled
+
+
+def fit_level(pool, level_index, preset, target, args, rng):
+    """Searches presets for one level; returns (best preset, summary on fresh seeds)."""
+    seeds = list(range(args.seed, args.seed + args.races))
+    best = dict(preset)
+    best_summary = summarize(race_presets(pool, level_index, [best], seeds, args)[0], target)
+    start = best_summary
+    print(f"  current   {describe(best_summary)}")
+    for number in range(1, args.rounds + 1):
+        candidates = [rescale_speed(best, best_summary)]
+        candidates += [rescale_speed(vary(best, rng), best_summary) for i in range(args.candidates)]
+        summaries = [summarize(results, target)
+                     for results in race_presets(pool, level_index, candidates, seeds, args)]
+        for candidate, summary in zip(candidates, summaries):
+            if summary["score"] < best_summary["score"]:
+                best, best_summary = candidate, summary
+        print(f"  round {number}   {describe(best_summary)}")
+
+    # Confidence intervals from races the search never saw
+    fresh = list(range(args.seed + 1_000_000, args.seed + 1_000_000 + args.races))
+    final = summarize(race_presets(pool, level_index, [best], fresh, args)[0], target)
+    final["current"] = start
+    return best, final
+
+
+def describe(summary):
+    if summary["finish_time"] is None:
+        time_text = "no finishes"
+    else:
+        low, high = summary["finish_time_ci"]
+        time_text = f"finish {summary['finish_time']:.1f}s ({low:.1f}-{high:.1f})"
+    low, high = summary["finish_rate_ci"]
+    return (f"{time_text}, finished {summary['finish_rate']:.0%} ({low:.0%}-{high:.0%}), "
+            f"progress {summary['progress']:.0%}, score {summary['score']:.2f}")
+
+
+def format_preset(preset):
+    """A preset as the one-line dict literal used in constants.py."""
+    return "{" + ", ".join(f'"{name}": {value!r}' for name, value in preset.items()) + "}"
+
+
+def apply_table(table, path=CONSTANTS_PATH):
+    """Replaces the BOT_DIFFICULTY entries of the fitted presets in constants.py."""
+    with open(path) as file:
+        source = file.read()
+    for difficulty, preset in table.items():
+        pattern = re.compile(rf"^(\s*){difficulty}: \{{.*\}},$", re.MULTILINE)
+        source, count = pattern.subn(lambda match: f"{match.group(1)}{difficulty}: {format_preset(preset)},", source, 1)
+        if not count:
+            raise ValueError(f"No BOT_DIFFICULTY entry for {difficulty} in {path}")
+    with open(path, "w") as file:
+        file.write(source)
+
+
+def main():
+    import constants
+    parser = argparse.ArgumentParser(description="Fit the bot presets to the balance targets with seeded races.")
+    parser.add_argument("--levels", type=int, nargs="+", help="Level numbers (default: every level with a target)")
+    parser.add_argument("--target", action="append", default=[], metavar="LEVEL=SECONDS",
+                        help="Bot finish time to aim for on a level (default: reference time + margin)")
+    parser.add_argument("--races", type=int, default=100, help="Races per preset and round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--candidates", type=int, default=6, help="Random variations raced per round")
+    parser.add_argument("--script", default="lane_keeper", help="Player input script from headless.INPUT_SCRIPTS")
+    parser.add_argument("--seed", type=int, default=0, help="First race seed; also seeds the search")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--apply", action="store_true", help="Write the proposed presets into constants.py")
+    args = parser.parse_args()
+
+    targets = {level: seconds + constants.BALANCE_BOT_MARGIN
+               for level, seconds in constants.BALANCE_REFERENCE_TIMES.items()}
+    for item in args.target:
+        level, seconds = item.split("=")
+        targets[int(level)] = float(seconds)
+    levels = args.levels or sorted(targets)
+    missing = [level for level in levels if level not in targets]
+    if missing:
+        sys.exit(f"No target time for level(s) {missing}; pass --target LEVEL=SECONDS")
+
+    rng = random.Random(args.seed)
+    table = {}
+    report = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "script": args.script, "races": args.races,
+              "finish_rate_target": FINISH_RATE_TARGET, "levels": {}}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for level in levels:
+            manifest = constants.LEVEL_MANIFEST_LIST[level - 1]
+            difficulty = manifest["bot_difficulty"]
+            print(f"Level {level}: bot target {targets[level]:.1f}s")
+            preset, summary = fit_level(pool, level - 1, constants.BOT_DIFFICULTY[difficulty], targets[level], args, rng)
+            print(f"  proposed  {describe(summary)}")
+            table[difficulty] = preset
+            report["levels"][level] = {"bot_difficulty": difficulty, "preset": preset, **summary}
+    races = sum(args.races * (2 + args.rounds * (args.candidates + 1)) for level in levels)
+    elapsed = time.perf_counter() - start
+    print(f"{races} races in {elapsed:.0f}s ({races / elapsed:.1f} races/s on {args.jobs} workers)")
+
+    print("Proposed BOT_DIFFICULTY entries:")
+    for difficulty, preset in table.items():
+        print(f"    {difficulty}: {format_preset(preset)},")
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Report written to {args.output}")
+    if args.apply:
+        apply_table(table)
+        print(f"Presets written to {CONSTANTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
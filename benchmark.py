@@ -0,0 +1,307 @@
+"""End-to-end benchmark: every level of LEVEL_CLASSES raced start to finish.
+
+Each level is raced once with a fixed input script and seed, in a fresh process so
+load times and peak memory belong to that level alone. The headless mode runs only
+the simulation. The gl mode also draws every step into a hidden window (EGL, no
+display needed) the way MyGame.on_draw draws a race. Startup is measured once per
+run, also in fresh processes: the time to the first frame (the loading screen) and
+until the start screen is up with the assets loaded. The two startups differ only in
+the level cache: the first starts with an empty one, the second reuses what the
+first wrote. Neither clears the operating system's file cache.
+
+    python benchmark.py                          # both modes, compare to the baseline
+    python benchmark.py --mode headless --levels 1 6
+    python benchmark.py --save-baseline          # accept the current numbers
+    python benchmark.py --traffic 300            # with 300 traffic cars on every level
+    python benchmark.py --bots 16                # with a grid of 16 racing bots
+
+Results are written as JSON, with the machine they were measured on. A metric that is
+worse than the baseline by more than its threshold is reported and makes the command
+exit with status 1. Baselines belong to one machine and are not committed: without
+one the command exits with status 2 (run --save-baseline first), and a baseline from
+another machine is compared with a warning.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ["headless", "gl"]
+RESULTS_PATH = "benchmarks/latest.json"
+BASELINE_PATH = "benchmarks/baseline.json"
+
+# Startup runs, named after the only thing that differs between them
+STARTUP_LABELS = {
+    "startup_empty_level_cache": "Startup, empty level cache",
+    "startup_filled_level_cache": "Startup, level cache filled",
+}
+
+# Metric -> (direction, allowed relative change) for the baseline comparison
+# "higher": bigger is better, "lower": smaller is better
+THRESHOLDS = {
+    "ticks_per_sec": ("higher", 0.10),
+    "draw_ms": ("lower", 0.15),
+    "load_ms": ("lower", 0.25),
+    "peak_rss_mb": ("lower", 0.10),
+    "first_frame_ms": ("lower", 0.25),
+    "ready_ms": ("lower", 0.25),
+}
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_level(level_index, mode, script_name, seed, traffic=0, bots=None):
+    """Races one level in this process and returns its metrics."""
+    if mode == "gl":
+        # Draw through EGL so no display or visible window is needed
+        import pyglet
+        pyglet.options["headless"] = True
+        import arcade
+        import constants
+        window = arcade.Window(constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT, "Benchmark", visible=False)
+        camera = arcade.Camera(constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT)
+    import headless
+
+    draw_seconds = []
+    player_list = None
+
+    def draw(tick, car, level):
+        # Same layers, camera and order as MyGame.on_draw, synchronised with the GPU
+        nonlocal player_list
+        if player_list is None:
+            player_list = arcade.SpriteList()
+            player_list.append(car)
+        start = time.perf_counter()
+        window.clear()
+        if level.world_space:
+            camera.move_to((0, level.view_bottom))
+            camera.use()
+        level.draw()
+        player_list.draw()
+        window.ctx.finish()
+        draw_seconds.append(time.perf_counter() - start)
+
+    result = headless.run_race(
+        level_index,
+        headless.INPUT_SCRIPTS[script_name],
+        seed=seed,
+        on_step=draw if mode == "gl" else None,
+        traffic=traffic,
+        bots=bots,
+    )
+    metrics = {
+        "level": result["level"],
+        "mode": mode,
+        "traffic": traffic,
+        "bots": result["bots"],
+        "ticks": result["ticks"],
+        "won": result["won"],
+        "ticks_per_sec": result["ticks"] / result["sim_seconds"],
+        "load_ms": result["load_seconds"] * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if draw_seconds:
+        draw_seconds.sort()
+        metrics["draw_ms"] = sum(draw_seconds) / len(draw_seconds) * 1000
+        metrics["draw_ms_p95"] = draw_seconds[int(len(draw_seconds) * 0.95)] * 1000
+    return metrics
+
+
+def run_startup(mode, cache_dir):
+    """Starts the game in this process; returns the time to its first frame and to the start screen."""
+    start = time.perf_counter()
+    import pyglet
+    pyglet.options["headless"] = True
+    import constants
+    # Read by level_data when the first level is built
+    constants.LEVEL_CACHE_DIR = cache_dir
+    import game
+    window = game.MyGame(constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT)
+    window.when_loaded(window.setup)
+    window.on_draw()
+    window.ctx.finish()
+    first_frame = time.perf_counter() - start
+    frames = 1
+    # Frames as fast as they go, each advancing the loading as if 1/60 s had passed
+    while window.state == game.STATE_LOADING:
+        window.on_update(constants.SIM_DELTA_TIME)
+        window.on_draw()
+        window.ctx.finish()
+        frames += 1
+    return {
+        "level": 0,
+        "mode": mode,
+        "first_frame_ms": first_frame * 1000,
+        "ready_ms": (time.perf_counter() - start) * 1000,
+        "assets_ms": window.asset_loader.seconds * 1000,
+        "loading_frames": frames,
+        # Levels are imported when first built: setup() builds only the first one
+        "levels_loaded": [level.name for level in constants.LEVEL_REGISTRY.values() if level.loaded],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_startups():
+    """A start with an empty level cache, then one reusing it, each in a child process;
+    returns their metrics."""
+    cache_dir = tempfile.mkdtemp(prefix="benchmark-cache-")
+    try:
+        return [
+            run_child([sys.executable, os.path.abspath(__file__), "--child-startup", mode, cache_dir])
+            for mode in STARTUP_LABELS
+        ]
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def run_isolated(level_index, mode, script_name, seed, traffic=0, bots=None):
+    """Runs run_level() in a child process and returns its metrics."""
+    command = [
+        sys.executable, os.path.abspath(__file__), "--child", str(level_index), mode,
+        "--script", script_name, "--seed", str(seed), "--traffic", str(traffic),
+    ]
+    if bots is not None:
+        command += ["--bots", str(bots)]
+    return run_child(command)
+
+
+def run_child(command):
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    # The metrics are the last line; arcade may print before them
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(results, baseline):
+    """Returns a message for every metric worse than the baseline by more than its threshold."""
+    def key(entry):
+        return entry["level"], entry["mode"], entry.get("traffic", 0), entry.get("bots", 1)
+
+    previous = {key(entry): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        old = previous.get(key(entry))
+        if old is None:
+            continue
+        for metric, (direction, allowed) in THRESHOLDS.items():
+            if metric not in entry or metric not in old or not old[metric]:
+                continue
+            change = (entry[metric] - old[metric]) / old[metric]
+            if direction == "higher":
+                change = -change
+            if change > allowed:
+                regressions.append(
+                    f"level {entry['level']} {entry['mode']}: {metric} {old[metric]:.2f} -> "
+                    f"{entry[metric]:.2f} ({change:+.0%} worse, allowed {allowed:.0%})"
+                )
+    return regressions
+
+
+def machine():
+    """What the numbers were measured on; baselines only compare on the same machine."""
+    return {
+        "node": platform.node(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+    }
+
+
+def write_json(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(data, file, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Race every level and compare the timings to a baseline.")
+    parser.add_argument("--mode", choices=MODES + ["all"], default="all")
+    parser.add_argument("--levels", type=int, nargs="+", help="Level numbers (default: all)")
+    parser.add_argument("--script", default="lane_keeper", help="Input script from headless.INPUT_SCRIPTS")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--traffic", type=int, default=0, help="Traffic cars on the track")
+    parser.add_argument("--bots", type=int, help="Racing bots (default: BOT_GRID_SIZE)")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--child", nargs=2, metavar=("LEVEL_INDEX", "MODE"), help=argparse.SUPPRESS)
+    parser.add_argument("--child-startup", nargs=2, metavar=("MODE", "CACHE_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_startup:
+        print(json.dumps(run_startup(*args.child_startup)))
+        return
+    if args.child:
+        print(json.dumps(run_level(int(args.child[0]), args.child[1], args.script, args.seed, args.traffic, args.bots)))
+        return
+
+    import constants
+    levels = args.levels or list(range(1, len(constants.LEVEL_CLASSES) + 1))
+    modes = MODES if args.mode == "all" else [args.mode]
+
+    results = []
+    if "gl" in modes:
+        for entry in run_startups():
+            results.append(entry)
+            print(f"{STARTUP_LABELS[entry['mode']]}: first frame {entry['first_frame_ms']:.0f} ms, "
+                  f"start screen {entry['ready_ms']:.0f} ms (assets {entry['assets_ms']:.0f} ms "
+                  f"over {entry['loading_frames']} frames)")
+    print(f"{'level':>5} {'mode':<9}{'ticks/s':>9}{'draw ms':>9}{'load ms':>9}{'RSS MB':>8}  outcome")
+    for level in levels:
+        for mode in modes:
+            entry = run_isolated(level - 1, mode, args.script, args.seed, args.traffic, args.bots)
+            results.append(entry)
+            draw_ms = f"{entry['draw_ms']:9.2f}" if "draw_ms" in entry else f"{'-':>9}"
+            print(f"{level:>5} {mode:<9}{entry['ticks_per_sec']:9.0f}{draw_ms}{entry['load_ms']:9.1f}"
+                  f"{entry['peak_rss_mb']:8.1f}  {'won' if entry['won'] else 'not won'} in {entry['ticks']} ticks")
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": machine(),
+        "script": args.script,
+        "seed": args.seed,
+        "traffic": args.traffic,
+        "bots": args.bots,
+        "results": results,
+    }
+    write_json(args.output, report)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        write_json(args.baseline, report)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}: nothing was compared. "
+              f"Run with --save-baseline on this machine to store one.", file=sys.stderr)
+        sys.exit(2)
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if baseline.get("machine") != report["machine"]:
+        print(f"Warning: the baseline was measured on another machine ({baseline.get('machine')}); "
+              f"differences may not be regressions", file=sys.stderr)
+    regressions = compare(results, baseline)
+    if regressions:
+        print("Regressions against the baseline:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,28 @@
 import arcade
 import random
+from assets import ASSETS
 from constants import BOT_DIFFICULTY
+from lane_grid import HazardIndex
+from profiler import PROFILER
+from simulation import restore_fields, snapshot_fields
 
 class BotCar(arcade.Sprite):
-    def __init__(self, x, y, level_difficulty=1, car_target=None):
+    # Everything that changes during a race (see snapshot/restore)
+    STATE_FIELDS = (
+        "center_x", "center_y", "change_x", "change_y", "current_speed", "target_lane_x",
+        "is_changing_lane", "active", "reaction_timer", "stuck_timer", "slowing_down",
+        "current_frame", "texture", "animation_counter", "speed_row", "lean_state",
+        "exploding", "explosion_index", "explosion_counter", "destroyed", "collision_damaged",
+        "race_finished", "hit_wall", "spawn_time", "wall_contact_timer", "collision_cooldown",
+    )
+
+    def __init__(self, x, y, level_difficulty=1, car_target=None, rng=None, scheduler=None):
         super().__init__()
+
+        # Random stream for every AI choice (see simulation.rng_stream)
+        self.rng = rng if rng is not None else random.Random()
+        # Shares the AI decisions of a step with the other bots (race_grid.DecisionScheduler)
+        self.scheduler = scheduler
         
         # Difficulty settings
         # retrieves stats based on level, defaulting to level 1 if invalid
@@ -13,11 +31,13 @@ class BotCar(arcade.Sprite):
         # Target to follow (usually the player)
         self.target = car_target
         
-        # Environmental awareness (lists of sprites)
+        # Environmental awareness (lane grids of the level layers)
         self.obstacles = []     # Deadly obstacles (walls, objects)
         self.puddles = []       # Slowdown zones
         self.ramps = []         # Speed boost zones
         self.drones = []        # Moving obstacles (if any)
+        # Per-lane lookup of everything above, rebuilt by set_context()
+        self.hazard_index = HazardIndex([])
         
         # Position
         self.center_x = x
@@ -38,10 +58,7 @@ class BotCar(arcade.Sprite):
         self.slowing_down = False
         
         # Animation setup
-        sheet_path = "assets/sprites/bots/bot_animations.png"
-        FRAME_WIDTH = 44
-        FRAME_HEIGHT = 80
-        textures = arcade.load_spritesheet(sheet_path, FRAME_WIDTH, FRAME_HEIGHT, 4, 16)
+        textures = ASSETS.get("bot_sheet")  # 4x4 frames of 44x80
         
         self.frames = []
         index = 0
@@ -74,8 +91,14 @@ class BotCar(arcade.Sprite):
         self.wall_contact_timer = 0.0
         self.collision_cooldown = 0.0 # Timer to prevent constant collision speed penalties
 
+    def snapshot(self):
+        return snapshot_fields(self, self.STATE_FIELDS)
+
+    def restore(self, state):
+        restore_fields(self, self.STATE_FIELDS, state)
+
     def set_context(self, obstacles=None, puddles=None, ramps=None, drones=None):
-        """Pass various sprite lists for the bot to be aware of."""
+        """Pass the lane grids of the layers the bot should be aware of."""
         if obstacles:
             self.obstacles = obstacles if isinstance(obstacles, list) else [obstacles]
         if puddles:
@@ -84,6 +107,7 @@ class BotCar(arcade.Sprite):
             self.ramps = ramps if isinstance(ramps, list) else [ramps]
         if drones:
             self.drones = drones if isinstance(drones, list) else [drones]
+        self.hazard_index = HazardIndex(self.obstacles + self.drones + self.puddles)
 
     def update(self, delta_time=1/60):
         if self.destroyed:
@@ -110,10 +134,11 @@ class BotCar(arcade.Sprite):
 
         # AI Decision Making
         self.reaction_timer -= delta_time
-        if self.reaction_timer <= 0:
-            self._make_decision()
+        if self.reaction_timer <= 0 and (self.scheduler is None or self.scheduler.grant(self)):
+            with PROFILER.section("bot.decision"):
+                self._make_decision()
             # Randomize next decision time slightly
-            self.reaction_timer = self.stats["reaction_time"] * random.uniform(0.8, 1.2)
+            self.reaction_timer = self.stats["reaction_time"] * self.rng.uniform(0.8, 1.2)
         
         # Reset stuck timer if moving efficiently
         if self.target:
@@ -178,31 +203,15 @@ class BotCar(arcade.Sprite):
         current_max_speed = self.base_speed
         
         # Simple interaction checks
-        all_ramps = []
-        for r_list in self.ramps:
-            if isinstance(r_list, arcade.SpriteList):
-                all_ramps.extend(r_list)
-            else:
-                all_ramps.append(r_list)
-                
-        all_puddles = []
-        for p_list in self.puddles:
-            if isinstance(p_list, arcade.SpriteList):
-                all_puddles.extend(p_list)
-            else:
-                all_puddles.append(p_list)
-        
-        
-        # Correct approach for lists
         hit_ramp = False
-        for ramp in all_ramps:
-            if arcade.check_for_collision(self, ramp):
+        for grid in self.ramps:
+            if grid.check_for_collision(self):
                 hit_ramp = True
                 break
         
         hit_puddle = False
-        for puddle in all_puddles:
-            if arcade.check_for_collision(self, puddle):
+        for grid in self.puddles:
+            if grid.check_for_collision(self):
                 hit_puddle = True
                 break
                 
@@ -245,39 +254,12 @@ class BotCar(arcade.Sprite):
 
         awareness = self.stats.get("awareness_distance", 200)
         
-        # Gather all hazards
-        hazards = []
-        for obj in self.obstacles:
-            if isinstance(obj, arcade.SpriteList):
-                hazards.extend(obj)
-            else:
-                hazards.append(obj)
-        for obj in self.drones:
-            if isinstance(obj, arcade.SpriteList):
-                hazards.extend(obj)
-            else:
-                hazards.append(obj)
-        for obj in self.puddles:
-            if isinstance(obj, arcade.SpriteList):
-                hazards.extend(obj)
-            else:
-                hazards.append(obj)
-                
         # Player is a soft hazard (buffer zone)
         # We handle player separately for "Avoidance" vs "Panic"
 
-        imminent_crash = False
-        nearest_dist = float('inf')
-
         # Detect hazards ahead
-        for obs in hazards:
-            if obs.center_y > self.center_y and obs.center_y < self.center_y + awareness:
-                # Check lane overlap
-                if abs(obs.center_x - self.center_x) < 50:
-                    dist = obs.center_y - self.center_y
-                    if dist < nearest_dist:
-                        nearest_dist = dist
-                        imminent_crash = True
+        nearest_dist = self.hazard_index.nearest_ahead(self.center_x, self.center_y, awareness)
+        imminent_crash = nearest_dist is not None
         
         # Check player buffer separately
         player_too_close = False
@@ -293,19 +275,14 @@ class BotCar(arcade.Sprite):
             panic_chance = self.stats.get("panic_chance", 0.1)
             
             # Decide: Avoid or Panic
-            if random.random() < avoidance_strength or player_too_close: # Always try to avoid player
+            if self.rng.random() < avoidance_strength or player_too_close: # Always try to avoid player
                 # Smart Avoidance: Find safest lane
                 current_lane = min(self.lanes, key=lambda l: abs(l - self.center_x))
                 other_lanes = [l for l in self.lanes if l != current_lane]
                 safe_lanes = []
                 
                 for lane in other_lanes:
-                    is_safe = True
-                    for obs in hazards:
-                         if obs.center_y > self.center_y and obs.center_y < self.center_y + awareness:
-                             if abs(obs.center_x - lane) < 50:
-                                 is_safe = False
-                                 break
+                    is_safe = self.hazard_index.nearest_ahead(lane, self.center_y, awareness) is None
                     # Also check player buffer for this lane
                     if self.target and abs(lane - self.target.center_x) < 80 and abs(self.center_y - self.target.center_y) < 200:
                         is_safe = False
@@ -314,28 +291,28 @@ class BotCar(arcade.Sprite):
                         safe_lanes.append(lane)
                 
                 if safe_lanes:
-                    self.target_lane_x = random.choice(safe_lanes)
+                    self.target_lane_x = self.rng.choice(safe_lanes)
                     self.is_changing_lane = True
                 else:
                     # No safe lane? Slow down!
                     self.slowing_down = True
-            elif random.random() < panic_chance:
+            elif self.rng.random() < panic_chance:
                 # Panic: Random move
-                self.target_lane_x = random.choice(self.lanes)
+                self.target_lane_x = self.rng.choice(self.lanes)
                 self.is_changing_lane = True
         else:
             # No imminent crash, normal behavior
             target_x = self.target.center_x
             
             # Use follow_accuracy to determine if we track player lane or drift
-            if random.random() > self.stats["follow_accuracy"]:
-                offset = random.choice([-60, 60])
+            if self.rng.random() > self.stats["follow_accuracy"]:
+                offset = self.rng.choice([-60, 60])
                 target_x += offset
             
             # Logic: If behind player, try to overtake? Or execute lane changes for variety?
             if self.stuck_timer > 2.0:
-                if random.random() < self.stats["lane_change_chance"]:
-                    self.target_lane_x = random.choice(self.lanes)
+                if self.rng.random() < self.stats["lane_change_chance"]:
+                    self.target_lane_x = self.rng.choice(self.lanes)
                     self.is_changing_lane = True
                     self.stuck_timer = 0.0
                 else:
@@ -404,6 +381,18 @@ class BotCar(arcade.Sprite):
             
             # Push apart slightly logic handled in lateral movement (Buffer Zone Enforcement)
             
+    def bump(self, other):
+        """Contact with another bot: the one behind brakes and steers away from it."""
+        if self.center_y > other.center_y or self.collision_cooldown > 0:
+            return
+        self.current_speed *= 0.8
+        self.collision_cooldown = 1.0
+        if self.center_x < other.center_x:
+            self.target_lane_x = max(70, other.center_x - 120)
+        else:
+            self.target_lane_x = min(430, other.center_x + 120)
+        self.is_changing_lane = True
+
     def explode(self, force=False, damage_player=False):
         if self.exploding:
             return
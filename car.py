@@ -1,29 +1,29 @@
 import arcade
+from assets import ASSETS
 from constants import SCREEN_HEIGHT, SCREEN_WIDTH
+from simulation import restore_fields, snapshot_fields
 
 class PlayerCar(arcade.Sprite):
+    # Everything that changes during a race (see snapshot/restore)
+    STATE_FIELDS = (
+        "center_x", "center_y", "change_x", "change_y", "speed", "lives", "hit_wall",
+        "race_lost", "race_won", "losing", "lose_timer", "left_pressed", "right_pressed",
+        "up_pressed", "down_pressed", "current_frame", "texture", "exploding",
+        "explosion_index", "explosion_counter", "explosion_over", "animation_counter",
+        "wall_slowdown_timer", "destroyed", "speed_row", "life_just_lost",
+    )
+
     def __init__(self, x, y):
         # Initialize with the default sprite
-        super().__init__("assets/sprites/player/player_car.png", scale=2.0)
+        super().__init__(texture=ASSETS.get("player_car"), scale=2.0)
 
         # Initialize position
         self.center_x = x
         self.center_y = y
 
 
-        sheet_path = "assets/sprites/player/player_animations.png"
-
-        FRAME_WIDTH = 44
-        FRAME_HEIGHT = 80
-
-        # Load sprite sheet: 4 rows x 4 cols = 16 frames total
-        textures = arcade.load_spritesheet(
-            sheet_path,
-            FRAME_WIDTH,
-            FRAME_HEIGHT,
-            4,
-            16
-        )
+        # Sprite sheet: 4 rows x 4 cols = 16 frames of 44x80 (shared by every car)
+        textures = ASSETS.get("player_sheet")
 
         # Organize frames into 2D array [row][col] for easy access
         self.frames = []
@@ -83,6 +83,16 @@ class PlayerCar(arcade.Sprite):
         # Flag to track when a life was just lost (for sound system)
         self.life_just_lost = False
 
+        # State at the start line, restored for a retry
+        self.initial_state = self.snapshot()
+
+    def snapshot(self):
+        return snapshot_fields(self, self.STATE_FIELDS)
+
+    def restore(self, state=None):
+        """Puts the car back to a snapshot, by default to how it was created."""
+        restore_fields(self, self.STATE_FIELDS, state if state is not None else self.initial_state)
+
     def current_speed(self):
         """Returns current speed as an integer 0-8 for dashboard indexing"""
         return max(0, min(8, int(round(self.speed))))
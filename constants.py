@@ -1,6 +1,55 @@
 SCREEN_WIDTH = 500
 SCREEN_HEIGHT = 800
 
+# Scrolling mode
+# True: level sprites stay fixed in world space and the game camera follows view_bottom
+# False: legacy mode, every layer sprite is moved down by the car speed each frame
+WORLD_SPACE_SCROLLING = True
+
+# Fixed-step simulation: the game logic always advances in steps of
+# SIM_DELTA_TIME, whatever the frame rate (the game is balanced for 60 steps/s)
+SIM_DELTA_TIME = 1 / 60
+# Steps run at most per rendered frame; a longer stall slows the game down
+MAX_SIM_STEPS_PER_FRAME = 5
+
+# Tile streaming: sprites exist only for the map rows within
+# this many rows of the view and are recycled as the track scrolls past
+# None creates sprites for every row when the level loads
+TILE_STREAM_MARGIN_ROWS = 2
+
+# Compiled levels (see level_cache.py) are written here the first time a map loads
+# None always reads the TMX files
+LEVEL_CACHE_DIR = "cache/levels"
+
+# Worker threads decoding the game's images and sounds while the loading screen shows
+ASSET_LOADER_THREADS = 4
+
+# Frame profiler (F1 overlay, F2 writes the recent frames here as CSV)
+PROFILE_DIR = "profiles"
+
+# The input of the last race on each level is recorded here (see replay.py)
+REPLAY_DIR = "replays"
+
+# The path of the fastest win on each level is kept here and raced as a ghost car
+GHOST_DIR = "ghosts"
+
+# Per-tick race telemetry (see telemetry.py): the last race on each level is written
+# here; the ring buffers hold TELEMETRY_SECONDS of race, and a crash of the game
+# dumps its last TELEMETRY_CRASH_SECONDS
+TELEMETRY_DIR = "telemetry"
+TELEMETRY_SECONDS = 300
+TELEMETRY_CRASH_SECONDS = 10
+
+# Racing bots per race: the first drives the level's bot_difficulty preset, the
+# others easier presets, and any bot finishing before the player wins the race
+BOT_GRID_SIZE = 1
+# Bot AI decisions run at most per simulation step (see race_grid.DecisionScheduler);
+# a bot over the budget makes its decision on a later step
+AI_DECISIONS_PER_STEP = 4
+
+# Ambient traffic (see traffic.py): cars on the track besides the racers; 0 turns it off
+TRAFFIC_CARS = 0
+
 # Bot AI configuration per level
 # speed: tuned to ensure bot finishes ~10s after player's average time
 # reaction_time: how often (in seconds) the bot makes a new decision
@@ -24,22 +73,98 @@ BOT_DIFFICULTY = {
     6: {"reaction_time": 0.2, "lane_change_chance": 0.50, "follow_accuracy": 0.98, "max_speed": 6.5, "awareness_distance": 600, "avoidance_strength": 0.95, "panic_chance": 0.05},
 }
 
-from level1 import Level1Background
-from level2 import Level2Background
-from level3 import Level3Background
-from level4 import Level4Background
-from level5 import Level5Background
-from level6 import Level6Background
+# Level manifests: everything the LevelEngine needs to run a level
+# map: Tiled map file, scaling: tile scaling applied on load
+# bot_difficulty: key into BOT_DIFFICULTY
+# layers: Tiled layer name -> role, in draw order (roles are listed in level_engine.py)
+#   deadly: breaks and costs a life, trap: stops on contact, finish: finish line,
+#   slow: puddles, boost: speed ramps, light: light overlay, road: drawn only
+# animated: Tiled layer name -> animated sprite kind (see ANIMATED_KINDS in obstacles.py)
+LEVEL_MANIFESTS = {
+    1: {
+        "map": "assets/maps/Level1.tmx",
+        "scaling": 1.57,
+        "bot_difficulty": 1,
+        "layers": {"Road": "road", "Object1": "deadly", "FinishLine": "finish", "Puddles": "slow", "SpeedRamp": "boost"},
+    },
+    2: {
+        "map": "assets/maps/level2.tmx",
+        "scaling": 1.57,
+        "bot_difficulty": 2,
+        "layers": {"Road": "road", "Light": "light", "Object1": "deadly", "FinishLine": "finish", "Puddles": "slow", "SpeedRamp": "boost"},
+    },
+    3: {
+        "map": "assets/maps/level3.tmx",
+        "scaling": 1.57,
+        "bot_difficulty": 3,
+        "layers": {"Road": "road", "Object1": "deadly", "FinishLine": "finish", "Puddles": "slow", "SpeedRamp": "boost", "BrokenCar": "deadly"},
+        "animated": {"BrokenCar": "fire"},
+    },
+    4: {
+        "map": "assets/maps/level4.tmx",
+        "scaling": 1.57,
+        "bot_difficulty": 4,
+        "layers": {"Road": "road", "Object1": "deadly", "FinishLine": "finish", "Puddles": "slow", "SpeedRamp": "boost"},
+    },
+    5: {
+        "map": "assets/maps/level5.tmx",
+        "scaling": 1.57,
+        "bot_difficulty": 5,
+        "layers": {"Road": "road", "Object1": "deadly", "FinishLine": "finish", "Puddles": "slow", "SpeedRamp": "boost", "FireDispenser": "trap"},
+        "animated": {"FireDispenser": "fire_dispenser"},
+    },
+    6: {
+        "map": "assets/maps/level6.tmx",
+        "scaling": 1.57,
+        "bot_difficulty": 6,
+        "layers": {"Road": "road", "Light": "light", "Object1": "deadly", "FinishLine": "finish", "Puddles": "slow", "SpeedRamp": "boost", "Drones": "deadly"},
+        "animated": {"Drones": "drone"},
+    },
+}
+
+# Endless mode (see endless.py): the track is generated chunk by chunk from the tiles
+# of one map. map: map whose tilesets and layers supply the tiles; layers and animated
+# as in LEVEL_MANIFESTS (Road, Object1, Puddles and SpeedRamp take their tiles from the
+# map's layers of the same name)
+ENDLESS_MANIFEST = {
+    "map": "assets/maps/Level1.tmx",
+    "scaling": 1.57,
+    "layers": {"Road": "road", "Object1": "deadly", "Puddles": "slow", "SpeedRamp": "boost", "Drones": "deadly"},
+    "animated": {"Drones": "drone"},
+}
+# Rows per generated chunk, and how many chunks are live (recycled as they scroll past)
+ENDLESS_CHUNK_ROWS = 8
+ENDLESS_CHUNK_POOL_SIZE = 4
+# Distance shown on the endless HUD: the speedometer reads speed * 30 km/h at 60
+# steps per second, which makes a kilometre 7200 px of track
+PIXELS_PER_KM = 7200
+
+from level_registry import LazyLevel
+
+# Manifests in level order, indexed like LEVEL_CLASSES
+LEVEL_MANIFEST_LIST = [LEVEL_MANIFESTS[number] for number in sorted(LEVEL_MANIFESTS)]
 
 # List of level classes for easy index-based access in Game class
-LEVEL_CLASSES = [
-    Level1Background,
-    Level2Background,
-    Level3Background,
-    Level4Background,
-    Level5Background,
-    Level6Background
-]
+# Each entry builds a LevelEngine for its manifest: level_class(car, width, height).
+# The engine modules are imported the first time a level is built (level_registry.py)
+LEVEL_CLASSES = [LazyLevel(f"level{number}", "level_engine", "LevelEngine", LEVEL_MANIFESTS[number])
+                 for number in sorted(LEVEL_MANIFESTS)]
+
+# Endless mode takes the level index after the last level (menu, replays)
+ENDLESS_LEVEL_INDEX = len(LEVEL_CLASSES)
+ENDLESS_CLASS = LazyLevel("endless", "endless", "EndlessEngine", ENDLESS_MANIFEST)
+
+# Every level class by name: "level1".."level6" and "endless"
+LEVEL_REGISTRY = {level.name: level for level in LEVEL_CLASSES + [ENDLESS_CLASS]}
+
+
+def level_class(level):
+    """Class building a level, by index (endless mode included) or by registry name."""
+    if isinstance(level, str):
+        return LEVEL_REGISTRY[level]
+    if level == ENDLESS_LEVEL_INDEX:
+        return ENDLESS_CLASS
+    return LEVEL_CLASSES[level]
 
 # Time taken and average speed references for balancing
 """
@@ -49,4 +174,8 @@ Level3: 50 seconds, 212 km/hr
 Level4: 45 seconds, 225 km/hr
 Level5: 53 seconds, 200 km/hr
 """
+# The same references for balance.py: the player's time per level in seconds, and
+# how many seconds after it the bot should finish
+BALANCE_REFERENCE_TIMES = {1: 50, 2: 58, 3: 50, 4: 45, 5: 53}
+BALANCE_BOT_MARGIN = 10
 
@@ -0,0 +1,324 @@
+import random
+from array import array
+import arcade
+from constants import ENDLESS_CHUNK_POOL_SIZE, ENDLESS_CHUNK_ROWS
+from lane_grid import LaneGrid
+from level_data import LevelData
+from level_engine import COLLISION_ROLES, LAYER_ROLES, LevelEngine
+from obstacles import ANIMATED_KINDS
+from profiler import PROFILER
+from race_grid import RaceOrder
+from simulation import reseed_stream, restore_fields, rng_stream, snapshot_fields
+
+# Generation rules, in rows of the track
+START_CLEAR_ROWS = 10    # Nothing but road around the start line
+HAZARD_GAP_ROWS = 5      # Free rows after every row with blockers
+# Chunks over which the hazards ramp up to their full rate
+RAMP_CHUNKS = 40
+
+
+class _ChunkShape:
+    # The part of LevelData a LaneGrid needs, for a grid of one chunk
+    def __init__(self, level_data, rows):
+        self.width = level_data.width
+        self.height = rows
+        self.tile_size = level_data.tile_size
+        self._level_data = level_data
+
+    def has_layer(self, name):
+        return False
+
+    def hit_box(self, gid):
+        return self._level_data.hit_box(gid)
+
+
+class Chunk:
+    """One slot of the chunk pool: a few rows of track, refilled as it is recycled.
+
+    Per layer the chunk keeps its GIDs, its sprite list and (for collidable layers)
+    its lane grid. Sprites taken off the list when the chunk is recycled stay in the
+    chunk's pools, so a chunk allocates nothing once it has held its busiest rows.
+    """
+
+    def __init__(self, level_data, layers, rows):
+        self.number = None
+        self.rows = rows
+        cells = level_data.width * rows
+        shape = _ChunkShape(level_data, rows)
+        self.animated = [bool(layer["replace"]) for layer in layers]
+        self.gids = [array("H", bytes(2 * cells)) for layer in layers]
+        self.grids = [LaneGrid(shape, layer["name"], layer["hit_box"]) if layer["role"] != "road" else None
+                      for layer in layers]
+        self.sprite_lists = [arcade.SpriteList() for layer in layers]
+        # cell index -> live sprite, per layer
+        self.cell_sprites = [{} for layer in layers]
+        self.tile_pools = [[] for layer in layers]
+        self.animated_pools = [[] for layer in layers]
+
+    def clear(self):
+        """Takes every sprite off the chunk and back into its pools."""
+        for layer_index, sprite_list in enumerate(self.sprite_lists):
+            cell_sprites = self.cell_sprites[layer_index]
+            pool = self.animated_pools[layer_index] if self.animated[layer_index] else self.tile_pools[layer_index]
+            pool.extend(cell_sprites.values())
+            cell_sprites.clear()
+            sprite_list.clear()
+        self.number = None
+
+
+class ChunkStream:
+    """Sprites and lane grids of the live chunks of an endless track.
+
+    A fixed pool of chunks covers the view: the chunk under the bottom of the view
+    and the ones above it. When the view moves past a chunk, that chunk is recycled
+    as the next one above the top and refilled by fill(number, chunk). The number of
+    chunks, sprites and grids stays the same however far the track goes.
+
+    Works like TileStream for LevelEngine: update(), scroll(), draw(), sprite_at()
+    and animated_lists. The (layer_index) TileStream takes is a (slot, layer_index)
+    key here, as found in EndlessEngine.collision_layers.
+    """
+
+    def __init__(self, level_data, layers, fill, pool_size=ENDLESS_CHUNK_POOL_SIZE, rows=ENDLESS_CHUNK_ROWS):
+        self.level_data = level_data
+        self.layers = layers
+        self.fill = fill
+        self.chunk_height = rows * level_data.tile_size
+        self.chunks = [Chunk(level_data, layers, rows) for slot in range(pool_size)]
+        self._draw_sections = ["draw." + layer["name"] for layer in layers]
+        # Every list holding animated sprites
+        self.animated_lists = [chunk.sprite_lists[i] for chunk in self.chunks
+                               for i, layer in enumerate(layers) if layer["replace"]]
+        # Scratch sprite giving animated sprites their position (see respawn)
+        self._anchor = arcade.Sprite()
+        # Chunk number of the lowest live chunk
+        self.first = None
+        # How far the sprites have been moved down (legacy scrolling only)
+        self.scrolled_y = 0
+
+    def reset(self, view_bottom, scrolled_y=0):
+        """Recycles every chunk and fills the pool again from the chunk under view_bottom."""
+        for chunk in self.chunks:
+            chunk.clear()
+        self.first = None
+        self.scrolled_y = scrolled_y
+        self.update(view_bottom)
+
+    def update(self, view_bottom):
+        """Recycles the chunks below the view into the chunks above it."""
+        first = max(0, int(view_bottom // self.chunk_height))
+        if first == self.first:
+            return
+        self.first = first
+
+        live = set()
+        free = []
+        for chunk in self.chunks:
+            if chunk.number is not None and first <= chunk.number < first + len(self.chunks):
+                live.add(chunk.number)
+            else:
+                free.append(chunk)
+        # New chunks are always filled in track order (generation is sequential)
+        for number in range(first, first + len(self.chunks)):
+            if number not in live:
+                with PROFILER.section("endless.generate"):
+                    self._load(free.pop(), number)
+
+    def _load(self, chunk, number):
+        chunk.clear()
+        chunk.number = number
+        self.fill(number, chunk)
+
+        data = self.level_data
+        origin_y = number * self.chunk_height
+        for layer_index, layer in enumerate(self.layers):
+            gids = chunk.gids[layer_index]
+            grid = chunk.grids[layer_index]
+            if grid is not None:
+                grid.refill(gids)
+                grid.origin_y = origin_y
+                grid.scrolled_y = self.scrolled_y
+            sprite_list = chunk.sprite_lists[layer_index]
+            cell_sprites = chunk.cell_sprites[layer_index]
+            for index, gid in enumerate(gids):
+                if not gid:
+                    continue
+                row, col = divmod(index, data.width)
+                center_x, center_y = data.cell_center(col, row)
+                center_y += origin_y - self.scrolled_y
+                if layer["replace"]:
+                    pool = chunk.animated_pools[layer_index]
+                    self._anchor.center_x = center_x
+                    self._anchor.center_y = center_y
+                    if pool:
+                        sprite = pool.pop()
+                        sprite.respawn(self._anchor)
+                    else:
+                        sprite = layer["replace"](self._anchor)
+                else:
+                    pool = chunk.tile_pools[layer_index]
+                    sprite = pool.pop() if pool else arcade.Sprite()
+                    sprite.texture = data.texture(gid)
+                    sprite.scale = data.scaling
+                    sprite.center_x = center_x
+                    sprite.center_y = center_y
+                sprite_list.append(sprite)
+                cell_sprites[index] = sprite
+
+    def sprite_at(self, key, cell_index):
+        """Live sprite of a cell of the chunk in slot key[0], or None."""
+        slot, layer_index = key
+        return self.chunks[slot].cell_sprites[layer_index].get(cell_index)
+
+    def scroll(self, distance):
+        """Moves every live sprite down (legacy scrolling)."""
+        for chunk in self.chunks:
+            for sprite_list in chunk.sprite_lists:
+                for sprite in sprite_list:
+                    sprite.center_y -= distance
+                PROFILER.count("sprites_moved", len(sprite_list))
+        self.scrolled_y += distance
+
+    def draw(self):
+        # Layer by layer, so every chunk's road is under every chunk's obstacles
+        for layer_index, name in enumerate(self._draw_sections):
+            with PROFILER.section(name):
+                for chunk in self.chunks:
+                    chunk.sprite_lists[layer_index].draw()
+        PROFILER.count("draw_calls", len(self.chunks) * len(self.layers))
+
+
+class EndlessEngine(LevelEngine):
+    """Endless mode: a track without a finish, generated as the player drives.
+
+    The rules are LevelEngine's; only the track differs. It is built from the tiles
+    of the manifest's map, ENDLESS_CHUNK_ROWS rows at a time, by a random stream of
+    the race seed, so a seed always gives the same track. Blockers, drones, puddles
+    and ramps get more frequent over the first RAMP_CHUNKS chunks. There is no bot;
+    the race ends when the car runs out of lives.
+    """
+
+    endless = True
+
+    STATE_FIELDS = LevelEngine.STATE_FIELDS + ("player_chunk",)
+
+    def __init__(self, car, screen_width, screen_height, manifest, seed=None, prepared=None, traffic=None, bots=None):
+        # prepared, traffic and bots are accepted for LevelEngine compatibility; there is
+        # no map to prepare and no other car on a generated track
+        self._init_race(car, screen_width, screen_height, manifest, seed)
+        self.race_order = RaceOrder([car])
+        self.traffic = None
+
+        self.level_data = LevelData(self.map_path, manifest["scaling"])
+        self.track_start_y = 0
+        self.track_end_y = None
+
+        # Tiles the generator picks from, per role
+        palette = self.level_data
+        self.road_row = array("H", palette.row("Road", 0))
+        self.blocker_gids = sorted(set(palette.layer("Object1")) - {0})
+        self.puddle_gids = sorted(set(palette.layer("Puddles")) - {0})
+        self.ramp_gids = sorted(set(palette.layer("SpeedRamp")) - {0})
+        # Columns cars can drive in (the outer columns hold the road edges)
+        self.lanes = list(range(1, palette.width - 1))
+
+        animated = manifest.get("animated", {})
+        layers = []
+        for name, role in manifest["layers"].items():
+            if role not in LAYER_ROLES:
+                raise ValueError(f"Unknown role '{role}' for layer '{name}' in the endless manifest")
+            layer = {"name": name, "role": role, "replace": None, "hit_box": None}
+            if name in animated:
+                factory, mode, sheet = ANIMATED_KINDS[animated[name]]
+                if mode != "replace":
+                    raise ValueError(f"Endless layer '{name}' needs an animated kind that replaces its tiles")
+                layer["replace"] = factory
+                prototype = factory(arcade.Sprite(center_x=0, center_y=0))
+                layer["hit_box"] = prototype.get_adjusted_hit_box()
+            layers.append(layer)
+        self.layers = [(layer["role"], layer) for layer in layers]
+        self._layer_index = {layer["name"]: index for index, layer in enumerate(layers)}
+
+        self.track_rng = rng_stream(self.seed, "track")
+        self._rows_since_hazard = 0
+        self.tiles = ChunkStream(self.level_data, layers, self._fill_chunk)
+
+        # Every chunk's lane grids, keyed by (slot, layer) for tiles.sprite_at
+        self.collision_layers = sorted(
+            [(layer["role"], (slot, index), chunk.grids[index])
+             for slot, chunk in enumerate(self.tiles.chunks)
+             for index, layer in enumerate(layers) if layer["role"] != "road"],
+            key=lambda item: COLLISION_ROLES.index(item[0])
+        )
+
+        self.tiles.reset(self.view_bottom)
+        # Chunk the player drives in
+        self.player_chunk = 0
+        self.initial_state = self.snapshot()
+
+    @property
+    def distance(self):
+        """How far the player has driven, in pixels."""
+        return self.view_bottom
+
+    def snapshot(self):
+        return {"fields": snapshot_fields(self, self.STATE_FIELDS)}
+
+    def restore(self, state=None, seed=None):
+        """Back to the start line; the track is generated again from seed (random when None)."""
+        restore_fields(self, self.STATE_FIELDS, self.initial_state["fields"])
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        reseed_stream(self.track_rng, self.seed, "track")
+        self._rows_since_hazard = 0
+        self.tiles.reset(self.view_bottom, self.scrolled_y)
+        self.animator.reset()
+
+    def update(self, delta_time):
+        chunk = int(self._race_progress(self.car) // self.tiles.chunk_height)
+        if chunk != self.player_chunk:
+            # Each chunk's puddles and ramps act as fresh as a level's first ones
+            self.player_chunk = chunk
+            self.puddle_timer = 10
+            self.speed_ramp_timer = 5
+        super().update(delta_time)
+
+    def _fill_chunk(self, number, chunk):
+        # Lays out the next chunk of track into chunk.gids
+        rng = self.track_rng
+        columns = self.level_data.width
+        for gids in chunk.gids:
+            for index in range(len(gids)):
+                gids[index] = 0
+        road = chunk.gids[self._layer_index["Road"]]
+        blockers = chunk.gids[self._layer_index["Object1"]]
+        puddles = chunk.gids[self._layer_index["Puddles"]]
+        ramps = chunk.gids[self._layer_index["SpeedRamp"]]
+        drones = chunk.gids[self._layer_index["Drones"]]
+
+        ramp_up = min(1.0, number / RAMP_CHUNKS)
+        for row in range(chunk.rows):
+            base = row * columns
+            road[base:base + columns] = self.road_row
+            if number * chunk.rows + row < START_CLEAR_ROWS:
+                continue
+            if self._rows_since_hazard < HAZARD_GAP_ROWS:
+                self._rows_since_hazard += 1
+                continue
+
+            if rng.random() < 0.35 + 0.3 * ramp_up:
+                # Blockers in one lane, or two neighbouring lanes so a gap stays open
+                first = rng.randrange(len(self.lanes))
+                cols = [self.lanes[first]]
+                if rng.random() < 0.4 * ramp_up:
+                    second = first + 1 if first + 1 < len(self.lanes) else first - 1
+                    cols.append(self.lanes[second])
+                for col in cols:
+                    if rng.random() < 0.1 + 0.25 * ramp_up:
+                        drones[base + col] = self.blocker_gids[0]
+                    else:
+                        blockers[base + col] = rng.choice(self.blocker_gids)
+                self._rows_since_hazard = 0
+            elif rng.random() < 0.15:
+                puddles[base + rng.choice(self.lanes)] = rng.choice(self.puddle_gids)
+            elif rng.random() < 0.08:
+                ramps[base + rng.choice(self.lanes)] = rng.choice(self.ramp_gids)
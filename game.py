@@ -1,39 +1,81 @@
 import arcade
+import os
 import random
+import time
+from asset_loader import AssetLoader
+from assets import ASSETS
 from car import PlayerCar
 import constants
-from level1 import Level1Background
+from constants import (GHOST_DIR, MAX_SIM_STEPS_PER_FRAME, PIXELS_PER_KM, PROFILE_DIR, REPLAY_DIR, SIM_DELTA_TIME,
+                       TELEMETRY_CRASH_SECONDS, TELEMETRY_DIR)
+from ghost import Ghost, GhostRecorder, save_if_best
+from hud_text import HudText
+from level_loader import LevelLoader
+from menu import LEVEL_BUTTONS, LevelMenu
+from profiler import PROFILER
+from replay import InputRecorder, apply_input, input_mask
+from simulation import FixedStepClock
+from telemetry import Telemetry
 
 # Game state constants
 STATE_START = 0
 STATE_PLAYING = 1
 STATE_WIN = 2
 STATE_LOSE = 3
+STATE_LOADING = 4
+
+# Assets the game holds for its whole lifetime (see assets.ASSET_CATALOG)
+GAME_ASSETS = [
+    "player_car", "player_sheet", "dashboard_sheet", "heart", "skull", "light", "hit_wall", "start_screen",
+    "engine_start", "engine_low", "engine_mid", "engine_high",
+    "win_sound", "loss_sound", "crash_sound", "button_sound", "life_lost_sound", "pixelify_font",
+]
 
 class MyGame(arcade.Window):
     def __init__(self, width, height):
         super().__init__(width, height, "Blind Circuit")
         arcade.set_background_color(arcade.color.BLACK)
 
+        # Load everything the game needs on every screen once, on worker threads while
+        # the loading screen shows; finish_loading() runs when it is all in
+        self.asset_loader = AssetLoader(GAME_ASSETS)
+        self.asset_loader.start()
+        self.after_loading = None
+
         # Initialize track and background - these will be set up in setup()
         self.background = None
         self.car = None
         self.player_list = None
         self.current_level = 1
-        self.state = STATE_START
+        self.state = STATE_LOADING
         self.level_index = 0  # starts at first level
-        # FIXED: Load start screen sprite once during init, not every frame in on_draw
-        self.start_screen_sprite = arcade.Sprite(
-            "assets/sprites/player/start_screen.png",
-            scale=1
-        )
-        self.start_screen_sprite.center_x = width // 2
-        self.start_screen_sprite.center_y = height // 2
-        # Load hit wall texture for shake effect
-        self.hit_wall_rect = arcade.load_texture("assets/sprites/player/hit_wall.png")
-        # Load custom font for all text
-        arcade.load_font("assets/font/Pixelify_Sans/static/PixelifySans-Regular.ttf")
+        # Fixed-step simulation clock, and the seed of the next race (None = random)
+        self.sim_clock = FixedStepClock(SIM_DELTA_TIME, MAX_SIM_STEPS_PER_FRAME)
+        self.race_seed = None
+        # Input of the current race, and the recorded race being played back (or None)
+        self.recorder = None
+        self.replay = None
+        # Path of the current race, and the best run on this level drawn as a ghost (or None)
+        self.ghost_recorder = None
+        self.ghost = None
+        # Per-tick state of the current race (see telemetry.py)
+        self.telemetry = None
+        # Draw-time effects only, kept apart from the simulation's random streams
+        self.effects_rng = random.Random()
+        # Builds the likely next level in the background on the menu and end screens
+        self.level_loader = LevelLoader(constants.LEVEL_MANIFEST_LIST)
+        # Start screen sprite and hit wall texture for the shake effect (set in finish_loading)
+        self.start_screen_sprite = None
+        self.hit_wall_rect = None
+        # Custom font for all text, registered by the asset loader ("pixelify_font")
         self.font_name = "Pixelify Sans"
+        # Text objects reused from frame to frame
+        self.hud_text = HudText(self.font_name)
+        self.level_menu = LevelMenu(LEVEL_BUTTONS, self.font_name)
+        # Frame profiler overlay (F1): monospaced so the columns line up
+        self.profiler_text = HudText(("Courier New", "DejaVu Sans Mono", "monospace"))
+        self.profiler_lines = []
+        self.profiler_refresh = 0
         
         # Dashboard textures will be loaded in setup()
         self.dashboard_textures = None
@@ -52,13 +94,6 @@ class MyGame(arcade.Window):
         # Track cumulative speed for average calculation (speed * time)
         self.cumulative_speed_time = 0.0
         
-        # Button press state for visual feedback
-        self.level1_pressed = False
-        self.level2_pressed = False
-        self.level3_pressed = False
-        self.level4_pressed = False
-        self.level5_pressed = False
-        self.level6_pressed = False
         # Button transition delay timer
         self.button_transition_timer = 0.0
         self.pending_level_index = None
@@ -72,16 +107,50 @@ class MyGame(arcade.Window):
         # Track previous hit_wall state to detect wall collision events
         self.previous_hit_wall = False
         
-        # Engine sound system
-        self.engine_start = arcade.load_sound("assets/sounds/player/start_engine.wav")
-        self.engine_low = arcade.load_sound("assets/sounds/player/low_speed.wav")
-        self.engine_mid = arcade.load_sound("assets/sounds/player/mid_speed.wav")
-        self.engine_high = arcade.load_sound("assets/sounds/player/high_speed.wav")
-        
+        # Engine sound system (sounds set in finish_loading)
+        self.engine_start = None
+        self.engine_low = None
+        self.engine_mid = None
+        self.engine_high = None
+
         self.engine_player = None
         self.current_engine_row = None
         self.engine_started = False
 
+        # World camera follows view_bottom when WORLD_SPACE_SCROLLING is enabled
+        self.camera = arcade.Camera(width, height)
+
+        # Translucent car following the ghost's path (set in finish_loading)
+        self.ghost_sprite = None
+        self.ghost_list = None
+
+
+    def when_loaded(self, action):
+        """Calls action() once the assets are loaded, right away if they already are."""
+        if self.state == STATE_LOADING:
+            self.after_loading = action
+        else:
+            action()
+
+    def finish_loading(self):
+        """Leaves the loading screen for the start screen (or the action from when_loaded)."""
+        # FIXED: Load start screen sprite once, not every frame in on_draw
+        self.start_screen_sprite = arcade.Sprite(texture=ASSETS.get("start_screen"), scale=1)
+        self.start_screen_sprite.center_x = self.width // 2
+        self.start_screen_sprite.center_y = self.height // 2
+        self.hit_wall_rect = ASSETS.get("hit_wall")
+        self.engine_start = ASSETS.get("engine_start")
+        self.engine_low = ASSETS.get("engine_low")
+        self.engine_mid = ASSETS.get("engine_mid")
+        self.engine_high = ASSETS.get("engine_high")
+        self.ghost_sprite = arcade.Sprite(texture=ASSETS.get("player_sheet")[0], scale=3.0)
+        self.ghost_sprite.alpha = 90
+        self.ghost_list = arcade.SpriteList()
+        self.ghost_list.append(self.ghost_sprite)
+        self.state = STATE_START
+        action, self.after_loading = self.after_loading, None
+        if action is not None:
+            action()
 
     def setup(self):
         # Player - create fresh car each time
@@ -89,11 +158,12 @@ class MyGame(arcade.Window):
         # Player spawns in middle lane (205)
         self.car = PlayerCar(295, 400)
         
-        self.win_sound = arcade.load_sound("assets/sounds/player/win.wav")
-        self.loss_sound = arcade.load_sound("assets/sounds/player/loss.wav")
-        self.crash_sound = arcade.load_sound("assets/sounds/player/crash.wav")
-        self.button_sound = arcade.load_sound("assets/sounds/player/button.wav")
-        self.life_lost_sound = arcade.load_sound("assets/sounds/player/life_lost.wav")
+        # Shared assets, loaded once per process
+        self.win_sound = ASSETS.get("win_sound")
+        self.loss_sound = ASSETS.get("loss_sound")
+        self.crash_sound = ASSETS.get("crash_sound")
+        self.button_sound = ASSETS.get("button_sound")
+        self.life_lost_sound = ASSETS.get("life_lost_sound")
     
         # Reset car state to ensure it's ready
         self.car.race_won = False
@@ -117,23 +187,76 @@ class MyGame(arcade.Window):
         # Add the car to the player list
         self.player_list.append(self.car)
 
-        # Load dashboard sprite sheet (2 columns, 5 rows = 10 frames, but we use frames 0-8)
-        dashboard_path = "assets/sprites/player/dashboard.png"
-        self.dashboard_textures = arcade.load_spritesheet(
-            dashboard_path,
-            sprite_width=500,
-            sprite_height=200,
-            columns=2,
-            count=10
-        )
-        
-        # Load heart texture for lives display (32x32 pixels)
-        self.heart_texture = arcade.load_texture("assets/sprites/player/heart.png")
-        # Load skull texture for when out of lives
-        self.skull_texture = arcade.load_texture("assets/sprites/player/skull.png")
-        # Load light overlay texture
-        self.light_texture = arcade.load_texture("assets/sprites/obstacles/light.png")
+        # Dashboard sprite sheet (2 columns, 5 rows = 10 frames, but we use frames 0-8)
+        self.dashboard_textures = ASSETS.get("dashboard_sheet")
         
+        # Heart texture for lives display (32x32 pixels)
+        self.heart_texture = ASSETS.get("heart")
+        # Skull texture for when out of lives
+        self.skull_texture = ASSETS.get("skull")
+        # Light overlay texture
+        self.light_texture = ASSETS.get("light")
+
+        self.reset_race_state()
+
+        # Build the new level before releasing the old one, so a retry keeps
+        # every shared asset loaded and only a level change evicts anything
+        previous_level = self.background
+        level_class = constants.level_class(self.level_index)
+        prepared = self.level_loader.take(self.level_index)
+        self.background = level_class(self.car, self.width, self.height, seed=self.race_seed, prepared=prepared)
+        if previous_level is not None:
+            previous_level.release_assets()
+            ASSETS.collect()
+        self.sim_clock.reset()
+        self.recorder = InputRecorder(self.level_index + 1, self.background.seed)
+        self.ghost_recorder = GhostRecorder()
+        self.ghost = Ghost.load(self.ghost_path())
+        self.telemetry = Telemetry(len(self.background.bot_list))
+
+    def restart(self):
+        """Retries the current level in place: car and level go back to the start line."""
+        self.car.restore()
+        self.background.restore(seed=self.race_seed)
+        self.reset_race_state()
+        self.sim_clock.reset()
+        self.recorder = InputRecorder(self.level_index + 1, self.background.seed)
+        self.ghost_recorder = GhostRecorder()
+        self.telemetry.reset()
+
+    def play_replay(self, replay):
+        """Starts a recorded race (see replay.InputReplay); the keyboard only steers again
+        once it is over."""
+        self.replay = replay
+        self.race_seed = replay.seed
+        self.level_index = replay.level - 1
+        self.state = STATE_PLAYING
+        self.setup()
+
+    def stop_replay(self):
+        self.replay = None
+        self.race_seed = None
+
+    def ghost_path(self):
+        return os.path.join(GHOST_DIR, f"level{self.level_index + 1}.npy")
+
+    def save_recording(self):
+        """Writes the input of the race that just ended, replacing the level's previous one."""
+        if self.replay is None:
+            self.recorder.save(os.path.join(REPLAY_DIR, f"level{self.level_index + 1}-last.bcr"))
+        self.telemetry.save(os.path.join(TELEMETRY_DIR, f"level{self.level_index + 1}-last.npz"),
+                            level=self.level_index + 1, seed=self.background.seed)
+
+    def dump_telemetry(self):
+        """Writes the last TELEMETRY_CRASH_SECONDS of the race, when the game crashes."""
+        if self.telemetry is None or not self.telemetry.ticks:
+            return None
+        path = os.path.join(TELEMETRY_DIR, time.strftime("crash-%Y%m%d-%H%M%S.npz"))
+        return self.telemetry.save(path, last_seconds=TELEMETRY_CRASH_SECONDS,
+                                   level=self.level_index + 1, seed=self.background.seed)
+
+    def reset_race_state(self):
+        """Resets the game's own per-race state (HUD, timers, sound flags)."""
         # Initialize display speed to match car's initial speed
         self.display_speed = 0.0
         
@@ -162,9 +285,6 @@ class MyGame(arcade.Window):
             self.engine_player.pause()
             self.engine_player = None
 
-        level_class = constants.LEVEL_CLASSES[self.level_index]
-        self.background = level_class(self.car, self.width, self.height)
-
     def update_engine_sound(self, delta_time):
         """Update engine sounds based on car speed"""
         if not self.car:
@@ -197,435 +317,110 @@ class MyGame(arcade.Window):
         self.current_engine_row = row
 
     def on_draw(self):
+        PROFILER.begin_frame()
         self.clear()
         # Reset viewport to normal state at start of each frame
         arcade.set_viewport(0, self.width, 0, self.height)
 
-        if self.state == STATE_START:
-            # FIXED: Sprite is now loaded once in __init__, just draw it here
+        if self.state == STATE_LOADING:
+            self.draw_loading_screen()
+
+        elif self.state == STATE_START:
+            # FIXED: Sprite is now loaded once in finish_loading, just draw it here
             self.start_screen_sprite.draw()
 
             # Draw controls instructions
-            arcade.draw_text(
+            self.hud_text.draw(
+                "controls",
                 "Controls: Arrow Keys / WASD",
                 self.width // 2,
                 self.height - 100,
                 arcade.color.WHITE,
                 20,
                 anchor_x="center",
-                font_name=self.font_name,
             )
-            arcade.draw_text(
+            self.hud_text.draw(
+                "controls_accelerate",
                 "UP/W: Accelerate | DOWN/S: Brake",
                 self.width // 2,
                 self.height - 130,
                 arcade.color.WHITE,
                 14,
                 anchor_x="center",
-                font_name=self.font_name,
             )
-            arcade.draw_text(
+            self.hud_text.draw(
+                "controls_steer",
                 "LEFT/A: Left | RIGHT/D: Right",
                 self.width // 2,
                 self.height - 155,
                 arcade.color.WHITE,
                 14,
                 anchor_x="center",
-                font_name=self.font_name,
             )
             
             # Draw level selection buttons
-            # Level 1 button - use pressed color if clicked
-            level1_button_x = self.width // 2 - 80
-            level1_button_y = self.height // 2 - 100
-            level1_button_width = 120
-            level1_button_height = 50
-            # Change button color based on press state
-            level1_color = arcade.color.DARK_GRAY if self.level1_pressed else arcade.color.GRAY
-            arcade.draw_rectangle_filled(
-                level1_button_x,
-                level1_button_y,
-                level1_button_width,
-                level1_button_height,
-                level1_color
-            )
-            arcade.draw_rectangle_outline(
-                level1_button_x,
-                level1_button_y,
-                level1_button_width,
-                level1_button_height,
-                arcade.color.WHITE,
-                2
-            )
-            arcade.draw_text(
-                "Level 1",
-                level1_button_x,
-                level1_button_y,
-                arcade.color.WHITE,
-                20,
-                anchor_x="center",
-                anchor_y="center",
-                font_name=self.font_name,
-            )
-            
-            # Level 2 button - use pressed color if clicked
-            level2_button_x = self.width // 2 + 80
-            level2_button_y = self.height // 2 - 100
-            level2_button_width = 120
-            level2_button_height = 50
-            # Change button color based on press state
-            level2_color = arcade.color.DARK_GRAY if self.level2_pressed else arcade.color.GRAY
-            arcade.draw_rectangle_filled(
-                level2_button_x,
-                level2_button_y,
-                level2_button_width,
-                level2_button_height,
-                level2_color
-            )
-            arcade.draw_rectangle_outline(
-                level2_button_x,
-                level2_button_y,
-                level2_button_width,
-                level2_button_height,
-                arcade.color.WHITE,
-                2
-            )
-            arcade.draw_text(
-                "Level 2",
-                level2_button_x,
-                level2_button_y,
-                arcade.color.WHITE,
-                20,
-                anchor_x="center",
-                anchor_y="center",
-                font_name=self.font_name,
-            )
-
-            # Level 3 button - use pressed color if clicked
-            level3_button_x = self.width // 2 - 80
-            level3_button_y = self.height // 2 - 180
-            level3_button_width = 120
-            level3_button_height = 50
-            # Change button color based on press state
-            level3_color = arcade.color.DARK_GRAY if self.level3_pressed else arcade.color.GRAY
-            arcade.draw_rectangle_filled(
-                level3_button_x,
-                level3_button_y,
-                level3_button_width,
-                level3_button_height,
-                level3_color
-            )
-            arcade.draw_rectangle_outline(
-                level3_button_x,
-                level3_button_y,
-                level3_button_width,
-                level3_button_height,
-                arcade.color.WHITE,
-                2
-            )
-            arcade.draw_text(
-                "Level 3",
-                level3_button_x,
-                level3_button_y,
-                arcade.color.WHITE,
-                20,
-                anchor_x="center",
-                anchor_y="center",
-                font_name=self.font_name,
-            )
-
-            # Level 4 button - use pressed color if clicked
-            level4_button_x = self.width // 2 + 80
-            level4_button_y = self.height // 2 - 180
-            level4_button_width = 120
-            level4_button_height = 50
-            # Change button color based on press state
-            level4_color = arcade.color.DARK_GRAY if self.level4_pressed else arcade.color.GRAY
-            arcade.draw_rectangle_filled(
-                level4_button_x,
-                level4_button_y,
-                level4_button_width,
-                level4_button_height,
-                level4_color
-            )
-            arcade.draw_rectangle_outline(
-                level4_button_x,
-                level4_button_y,
-                level4_button_width,
-                level4_button_height,
-                arcade.color.WHITE,
-                2
-            )
-            arcade.draw_text(
-                "Level 4",
-                level4_button_x,
-                level4_button_y,
-                arcade.color.WHITE,
-                20,
-                anchor_x="center",
-                anchor_y="center",
-                font_name=self.font_name,
-            )
-
-            # Level 5 button (center bottom)
-            level5_button_x = self.width // 2 - 80
-            level5_button_y = self.height // 2 - 260
-            level5_button_width = 120
-            level5_button_height = 50
-            # Change button color based on press state
-            level5_color = arcade.color.DARK_GRAY if self.level5_pressed else arcade.color.GRAY
-            arcade.draw_rectangle_filled(
-                level5_button_x,
-                level5_button_y,
-                level5_button_width,
-                level5_button_height,
-                level5_color
-            )
-            arcade.draw_rectangle_outline(
-                level5_button_x,
-                level5_button_y,
-                level5_button_width,
-                level5_button_height,
-                arcade.color.WHITE,
-                2
-            )
-            arcade.draw_text(
-                "Level 5",
-                level5_button_x,
-                level5_button_y,
-                arcade.color.WHITE,
-                20,
-                anchor_x="center",
-                anchor_y="center",
-                font_name=self.font_name,
-            )
-
-            # Level 6 button (right bottom row 3)
-            level6_button_x = self.width // 2 + 80
-            level6_button_y = self.height // 2 - 260
-            level6_button_width = 120
-            level6_button_height = 50
-            # Change button color based on press state
-            level6_color = arcade.color.DARK_GRAY if self.level6_pressed else arcade.color.GRAY
-            arcade.draw_rectangle_filled(
-                level6_button_x,
-                level6_button_y,
-                level6_button_width,
-                level6_button_height,
-                level6_color
-            )
-            arcade.draw_rectangle_outline(
-                level6_button_x,
-                level6_button_y,
-                level6_button_width,
-                level6_button_height,
-                arcade.color.WHITE,
-                2
-            )
-            arcade.draw_text(
-                "Level 6",
-                level6_button_x,
-                level6_button_y,
-                arcade.color.WHITE,
-                20,
-                anchor_x="center",
-                anchor_y="center",
-                font_name=self.font_name,
-            )
+            self.level_menu.draw(self.width, self.height)
 
         elif self.state == STATE_PLAYING:
             # Camera shake effect for obstacle hits
+            shake_x = 0
+            shake_y = 0
             if self.background.shake_time > 0:
-                shake_x = random.uniform(-5, 5)
-                shake_y = random.uniform(-5, 5)
+                shake_x = self.effects_rng.uniform(-5, 5)
+                shake_y = self.effects_rng.uniform(-5, 5)
                 arcade.set_viewport(-shake_x, self.width - shake_x, -shake_y, self.height - shake_y)
-            
+
+            if self.background.world_space:
+                # Level sprites never move; only the camera follows the scroll position
+                self.camera.move_to((-shake_x, self.background.view_bottom - shake_y))
+                self.camera.use()
+
             self.background.draw()
-            self.player_list.draw()
+            with PROFILER.section("draw.player"):
+                if self.ghost is not None:
+                    self.draw_ghost()
+                self.player_list.draw()
+            PROFILER.count("draw_calls")
+
+            if self.background.world_space:
+                # Back to screen space for the hit wall overlay
+                arcade.set_viewport(-shake_x, self.width - shake_x, -shake_y, self.height - shake_y)
             
-            # Draw hit wall rectangle with shake effect (shake managed by level1.py)
+            # Draw hit wall rectangle with shake effect (shake managed by the level engine)
             if self.car.hit_wall:
                 arcade.draw_texture_rectangle(
                     constants.SCREEN_WIDTH//2 + self.background.hit_wall_shake_offset_x,
                     constants.SCREEN_HEIGHT//2 + self.background.hit_wall_shake_offset_y,
                     502, 802, self.hit_wall_rect
                 )
+                PROFILER.count("draw_calls")
             
-            # Reset viewport before drawing HUD elements (HUD should be in screen space)
-            arcade.set_viewport(0, self.width, 0, self.height)
-            
-            # Draw light overlay if player is in light area (for Level 2)
-            if self.background.in_light and self.light_texture:
-                arcade.draw_texture_rectangle(
-                    self.width // 2,
-                    self.height // 2,
-                    self.width,
-                    self.height,
-                    self.light_texture
-                )
-            
-            # Draw dashboard HUD at bottom center of screen
-            if self.dashboard_textures:
-                speed_index = max(0, min(8, int(round(self.display_speed))))
-                dashboard_texture = self.dashboard_textures[speed_index]
-                arcade.draw_texture_rectangle(
-                    self.width // 2,
-                    100,
-                    500,
-                    200,
-                    dashboard_texture
-                )
-            
-            # Draw speed text (updates in increments of 10, positioned lower)
-            speed_kmh = self.display_speed * 30.0
-            # Round to nearest 10
-            speed_rounded = int(round(speed_kmh / 10)) * 10
-            speed_text = f"{speed_rounded}Km/hr"
-            arcade.draw_text(
-                speed_text,
-                self.width // 2,
-                50,  # Lowered by 50 pixels from 190
-                arcade.color.WHITE,
-                20,  # Reduced from 48
-                anchor_x="center",
-                font_name=self.font_name,
-            )
-            
-            # Calculate track progress (using vertical/y-axis progress from level)
-            if self.car and self.background:
-                track_start_y = self.background.track_start_y
-                track_end_y = self.background.track_end_y
-                # Use view_bottom which tracks vertical scroll progress
-                current_progress = self.background.view_bottom
-                progress = (current_progress - track_start_y) / (track_end_y - track_start_y)
-                progress = max(0.0, min(1.0, progress))  # Clamp between 0.0 and 1.0
-                
-                # Draw progress bar in left circular area of dashboard
-                bar_x = 60  # Left side of dashboard
-                bar_y = 15  # Middle area of dashboard
-                bar_width = 60
-                bar_height = 10
-                
-                # Draw percentage text just above the progress bar
-                percentage = int(progress * 100)
-                arcade.draw_text(
-                    f"{percentage}%",
-                    bar_x + 50,
-                    bar_y- 5,  # Just above the bar
-                    arcade.color.WHITE,
-                    14,
-                    anchor_x="center",
-                    font_name=self.font_name,
-                )
-                
-                # Background bar (dark gray) - centered at bar_x, bar_y
-                arcade.draw_rectangle_filled(
-                    bar_x, bar_y,
-                    bar_width, bar_height,
-                    arcade.color.DARK_GRAY
-                )
-                
-                # Foreground bar (white, scaled by progress)
-                if progress > 0:
-                    # Calculate left edge of filled portion
-                    filled_width = bar_width * progress
-                    filled_x = bar_x - bar_width // 2 + filled_width // 2
-                    arcade.draw_rectangle_filled(
-                        filled_x, bar_y,
-                        filled_width, bar_height,
-                        arcade.color.WHITE
-                    )
-            
-            # Draw position tracker (placeholder)
-            arcade.draw_text(
-                "Position: 1",
-                self.width - 20,  # Top-right area
-                15,  # Just above dashboard
-                arcade.color.WHITE,
-                15,
-                anchor_x="right",
-                font_name=self.font_name,
-            )
-            
-            # Draw Lives HUD on right side of dashboard
-            if self.car and self.heart_texture:
-                lives_x = self.width - 120  # Right side of dashboard area
-                lives_y = 45  # Aligned with dashboard HUD
-                
-                # Draw "Lives: " label
-                arcade.draw_text(
-                    "Lives:",
-                    lives_x,
-                    lives_y,
-                    arcade.color.WHITE,
-                    10,
-                    anchor_x="left",
-                    font_name=self.font_name,
-                )
-                
-                # If out of lives, draw skull icon instead of hearts
-                if self.car.lives <= 0 and self.skull_texture:
-                    skull_x = lives_x + 50  # Start after "Lives: " text
-                    skull_size = 25
-                    arcade.draw_texture_rectangle(
-                        skull_x,
-                        lives_y + 3,
-                        skull_size,
-                        skull_size,
-                        self.skull_texture
-                    )
-                else:
-                    # Draw heart icons (25x25 each, 30px spacing)
-                    heart_size = 20
-                    heart_spacing = 20
-                    start_x = lives_x + 50  # Start after "Lives: " text
-                    
-                    for i in range(self.car.lives):
-                        heart_x = start_x + (i * heart_spacing)
-                        arcade.draw_texture_rectangle(
-                            heart_x,
-                            lives_y + 3,
-                            heart_size,
-                            heart_size,
-                            self.heart_texture
-                        )
-            
-            # Draw time on dashboard (near bottom center)
-            minutes = int(self.level_time // 60)
-            seconds = int(self.level_time % 60)
-            time_text = f"Time: {minutes:02d}:{seconds:02d}"
-            arcade.draw_text(
-                time_text,
-                30,
-                40,
-                arcade.color.WHITE,
-                14,
-                font_name=self.font_name,
-            )
+            with PROFILER.section("draw.hud"):
+                self.draw_hud()
 
         elif self.state == STATE_WIN:
             # Draw big "W" for win
-            arcade.draw_text(
+            self.hud_text.draw(
+                "win_title",
                 "W",
                 self.width // 2,
                 self.height // 2 + 120,
                 arcade.color.GREEN,
                 160,
                 anchor_x="center",
-                font_name=self.font_name,
             )
             
             # Draw time taken
             minutes = int(self.level_time // 60)
             seconds = int(self.level_time % 60)
-            arcade.draw_text(
+            self.hud_text.draw(
+                "win_time",
                 f"Time Taken: {minutes:02d}:{seconds:02d}",
                 self.width // 2,
                 self.height // 2 + 20,
                 arcade.color.WHITE,
                 28,
                 anchor_x="center",
-                font_name=self.font_name,
             )
             
             # Draw average speed (calculate from cumulative speed over time)
@@ -633,99 +428,386 @@ class MyGame(arcade.Window):
                 average_speed = (self.cumulative_speed_time / self.level_time) * 30
             else:
                 average_speed = 0
-            arcade.draw_text(
+            self.hud_text.draw(
+                "win_average_speed",
                 f"Average Speed: {int(average_speed)} Km/hr",
                 self.width // 2,
                 self.height // 2 - 20,
                 arcade.color.WHITE,
                 28,
                 anchor_x="center",
-                font_name=self.font_name,
             )
             
             # Draw next level instruction
-            arcade.draw_text(
+            self.hud_text.draw(
+                "win_next",
                 "Press N for Next Level",
                 self.width // 2,
                 self.height // 2 - 80,
                 arcade.color.WHITE,
                 20,
                 anchor_x="center",
-                font_name=self.font_name,
             )
 
         elif self.state == STATE_LOSE:
             # Draw big "L" for lose
-            arcade.draw_text(
+            self.hud_text.draw(
+                "lose_title",
                 "L",
                 self.width // 2,
                 self.height // 2 + 120,
                 arcade.color.RED,
                 160,
                 anchor_x="center",
-                font_name=self.font_name,
             )
             
             # Draw crash message
-            arcade.draw_text(
+            self.hud_text.draw(
+                "lose_message",
                 "You Crashed!",
                 self.width // 2,
                 self.height // 2 + 20,
                 arcade.color.WHITE,
                 28,
                 anchor_x="center",
-                font_name=self.font_name,
             )
             
             # Draw retry instruction
-            arcade.draw_text(
+            self.hud_text.draw(
+                "lose_retry",
                 "Press R to Retry",
                 self.width // 2,
                 self.height // 2 - 60,
                 arcade.color.WHITE,
                 20,
                 anchor_x="center",
-                font_name=self.font_name,
             )
 
+        PROFILER.end_frame()
+        if PROFILER.enabled:
+            self.draw_profiler_overlay()
+
+    def draw_loading_screen(self):
+        """Progress bar of the asset loader."""
+        left, right = self.width // 2 - 150, self.width // 2 + 150
+        bottom, top = self.height // 2 - 10, self.height // 2 + 10
+        self.hud_text.draw(
+            "loading",
+            "Loading...",
+            self.width // 2,
+            top + 20,
+            arcade.color.WHITE,
+            20,
+            anchor_x="center",
+        )
+        fill = left + (right - left) * self.asset_loader.progress
+        if fill > left:
+            arcade.draw_lrtb_rectangle_filled(left, fill, top, bottom, arcade.color.WHITE)
+        arcade.draw_lrtb_rectangle_outline(left, right, top, bottom, arcade.color.WHITE, 2)
+
+    def draw_profiler_overlay(self):
+        """Draws the profiler's rolling statistics in the top left corner."""
+        # Recompute twice a second so the numbers stay readable
+        self.profiler_refresh -= 1
+        if self.profiler_refresh <= 0:
+            self.profiler_refresh = 30
+            self.profiler_lines = [f"{'ms':<18}{'p50':>7}{'p95':>7}{'p99':>7}{'worst':>7}"]
+            for name, p50, p95, p99, worst in PROFILER.stats():
+                self.profiler_lines.append(f"{name:<18}{p50:7.2f}{p95:7.2f}{p99:7.2f}{worst:7.2f}")
+            self.profiler_lines.append(f"{'per frame':<18}{'p50':>7}{'worst':>7}")
+            for name, p50, worst in PROFILER.counter_stats():
+                self.profiler_lines.append(f"{name:<18}{p50:7d}{worst:7d}")
+
+        arcade.set_viewport(0, self.width, 0, self.height)
+        line_height = 13
+        arcade.draw_lrtb_rectangle_filled(
+            0, 380, self.height, self.height - line_height * len(self.profiler_lines) - 8, (0, 0, 0, 180)
+        )
+        for i, line in enumerate(self.profiler_lines):
+            self.profiler_text.draw(
+                f"profile_{i}", line, 6, self.height - 4 - line_height * (i + 1), arcade.color.WHITE, 9
+            )
+
+    def draw_ghost(self):
+        """Draws the best run's car where it was at the current tick of this race."""
+        self.ghost.seek(max(0, self.ghost_recorder.ticks - 1))
+        if self.ghost.finished:
+            return
+        # Both cars are at the same height on screen when their view_bottoms are level
+        self.ghost_sprite.center_x = self.ghost.x
+        self.ghost_sprite.center_y = self.car.center_y + self.ghost.view_bottom - self.background.view_bottom
+        self.ghost_list.draw()
+        PROFILER.count("draw_calls")
+
+    def draw_hud(self):
+        """Draws the overlays and the dashboard HUD over the race, in screen space."""
+        # Reset viewport before drawing HUD elements (HUD should be in screen space)
+        arcade.set_viewport(0, self.width, 0, self.height)
+
+        # Draw light overlay if player is in light area (for Level 2)
+        if self.background.in_light and self.light_texture:
+            arcade.draw_texture_rectangle(
+                self.width // 2,
+                self.height // 2,
+                self.width,
+                self.height,
+                self.light_texture
+            )
+            PROFILER.count("draw_calls")
+
+        # Draw dashboard HUD at bottom center of screen
+        if self.dashboard_textures:
+            speed_index = max(0, min(8, int(round(self.display_speed))))
+            dashboard_texture = self.dashboard_textures[speed_index]
+            arcade.draw_texture_rectangle(
+                self.width // 2,
+                100,
+                500,
+                200,
+                dashboard_texture
+            )
+            PROFILER.count("draw_calls")
+
+        # Draw speed text (updates in increments of 10, positioned lower)
+        speed_kmh = self.display_speed * 30.0
+        # Round to nearest 10
+        speed_rounded = int(round(speed_kmh / 10)) * 10
+        speed_text = f"{speed_rounded}Km/hr"
+        self.hud_text.draw(
+            "speed",
+            speed_text,
+            self.width // 2,
+            50,  # Lowered by 50 pixels from 190
+            arcade.color.WHITE,
+            20,  # Reduced from 48
+            anchor_x="center",
+        )
+
+        if self.car and self.background and self.background.endless:
+            # No finish line: show the distance driven instead of the progress bar
+            kilometres = self.background.distance / PIXELS_PER_KM
+            self.hud_text.draw(
+                "distance",
+                f"{kilometres:.2f}Km",
+                60,
+                10,
+                arcade.color.WHITE,
+                14,
+                anchor_x="center",
+            )
+
+        # Calculate track progress (using vertical/y-axis progress from level)
+        elif self.car and self.background:
+            track_start_y = self.background.track_start_y
+            track_end_y = self.background.track_end_y
+            # Use view_bottom which tracks vertical scroll progress
+            current_progress = self.background.view_bottom
+            progress = (current_progress - track_start_y) / (track_end_y - track_start_y)
+            progress = max(0.0, min(1.0, progress))  # Clamp between 0.0 and 1.0
+
+            # Draw progress bar in left circular area of dashboard
+            bar_x = 60  # Left side of dashboard
+            bar_y = 15  # Middle area of dashboard
+            bar_width = 60
+            bar_height = 10
+
+            # Draw percentage text just above the progress bar
+            percentage = int(progress * 100)
+            self.hud_text.draw(
+                "progress_percent",
+                f"{percentage}%",
+                bar_x + 50,
+                bar_y- 5,  # Just above the bar
+                arcade.color.WHITE,
+                14,
+                anchor_x="center",
+            )
+
+            # Background bar (dark gray) - centered at bar_x, bar_y
+            arcade.draw_rectangle_filled(
+                bar_x, bar_y,
+                bar_width, bar_height,
+                arcade.color.DARK_GRAY
+            )
+            PROFILER.count("draw_calls")
+
+            # Foreground bar (white, scaled by progress)
+            if progress > 0:
+                # Calculate left edge of filled portion
+                filled_width = bar_width * progress
+                filled_x = bar_x - bar_width // 2 + filled_width // 2
+                arcade.draw_rectangle_filled(
+                    filled_x, bar_y,
+                    filled_width, bar_height,
+                    arcade.color.WHITE
+                )
+                PROFILER.count("draw_calls")
+
+        # Draw the player's place among the racers
+        self.hud_text.draw(
+            "position",
+            f"Position: {self.background.player_position}/{len(self.background.race_order.racers)}",
+            self.width - 20,  # Top-right area
+            15,  # Just above dashboard
+            arcade.color.WHITE,
+            15,
+            anchor_x="right",
+        )
+
+        # Draw Lives HUD on right side of dashboard
+        if self.car and self.heart_texture:
+            lives_x = self.width - 120  # Right side of dashboard area
+            lives_y = 45  # Aligned with dashboard HUD
+
+            # Draw "Lives: " label
+            self.hud_text.draw(
+                "lives_label",
+                "Lives:",
+                lives_x,
+                lives_y,
+                arcade.color.WHITE,
+                10,
+                anchor_x="left",
+            )
+
+            # If out of lives, draw skull icon instead of hearts
+            if self.car.lives <= 0 and self.skull_texture:
+                skull_x = lives_x + 50  # Start after "Lives: " text
+                skull_size = 25
+                arcade.draw_texture_rectangle(
+                    skull_x,
+                    lives_y + 3,
+                    skull_size,
+                    skull_size,
+                    self.skull_texture
+                )
+                PROFILER.count("draw_calls")
+            else:
+                # Draw heart icons (25x25 each, 30px spacing)
+                heart_size = 20
+                heart_spacing = 20
+                start_x = lives_x + 50  # Start after "Lives: " text
+
+                for i in range(self.car.lives):
+                    heart_x = start_x + (i * heart_spacing)
+                    arcade.draw_texture_rectangle(
+                        heart_x,
+                        lives_y + 3,
+                        heart_size,
+                        heart_size,
+                        self.heart_texture
+                    )
+                PROFILER.count("draw_calls", self.car.lives)
+
+        # Draw time on dashboard (near bottom center)
+        minutes = int(self.level_time // 60)
+        seconds = int(self.level_time % 60)
+        time_text = f"Time: {minutes:02d}:{seconds:02d}"
+        self.hud_text.draw(
+            "time",
+            time_text,
+            30,
+            40,
+            arcade.color.WHITE,
+            14,
+        )
+
+    def preload_next_level(self):
+        """Asks the loader for the level the player is most likely to start next.
+
+        Nothing is needed on the lose screen: a retry restores the current level in place.
+        """
+        if self.state in (STATE_LOADING, STATE_START):
+            # The clicked level, otherwise the one any key starts
+            index = self.pending_level_index if self.pending_level_index is not None else 0
+            # Endless mode has no map to prepare, and the level built behind the start
+            # screen is restarted rather than built again (see start_level)
+            if index != constants.ENDLESS_LEVEL_INDEX and not self.is_built(index):
+                self.level_loader.request(index)
+        elif self.state == STATE_WIN:
+            self.level_loader.request((self.level_index + 1) % len(constants.LEVEL_CLASSES))
+
+    def is_built(self, index):
+        return self.background is not None and index == self.level_index
+
+    def start_level(self, index):
+        """Starts a level from the start screen."""
+        self.state = STATE_PLAYING
+        if self.is_built(index):
+            self.restart()
+        else:
+            self.level_index = index
+            self.setup()
 
     def on_update(self, delta_time):
+        PROFILER.begin_frame()
+        # Prepare the next level off the main thread, finishing it a slice per frame
+        with PROFILER.section("loader"):
+            self.preload_next_level()
+            self.level_loader.update()
+
+        if self.state == STATE_LOADING:
+            with PROFILER.section("assets"):
+                self.asset_loader.update()
+            if self.asset_loader.done:
+                self.finish_loading()
+            return
+
         # Handle button transition delay
         if self.state == STATE_START and self.button_transition_timer > 0:
             self.button_transition_timer -= delta_time
             if self.button_transition_timer <= 0 and self.pending_level_index is not None:
                 # Timer finished, now transition to the level
-                self.level_index = self.pending_level_index
-                self.state = STATE_PLAYING
-                self.setup()
+                self.start_level(self.pending_level_index)
                 # Reset button states
-                self.level1_pressed = False
-                self.level2_pressed = False
-                self.level3_pressed = False
-                self.level4_pressed = False
-                self.level5_pressed = False
-                self.level6_pressed = False
+                self.level_menu.pressed = None
                 self.pending_level_index = None
                 return  # Skip other updates during transition
         
-        self.background.update(delta_time)
-        if self.car:
-            self.car.update(delta_time)
-        
+        # Run the simulation in fixed steps, however long this frame took
+        for step in range(self.sim_clock.advance(delta_time)):
+            self.simulation_step(SIM_DELTA_TIME)
+
         # Update smoothed display speed for HUD
         if self.car:
             actual_speed = self.car.speed
             # Smooth the display speed: display_speed += (actual_speed - display_speed) * 0.1
             self.display_speed += (actual_speed - self.display_speed) * 0.1
-        
-        # Update level timer if playing and level not finished
+
+        # Update engine sounds during gameplay
         if self.state == STATE_PLAYING and not self.level_finished:
+            with PROFILER.section("sound"):
+                self.update_engine_sound(delta_time)
+
+    def simulation_step(self, delta_time):
+        """Advances the race by one fixed step of delta_time (SIM_DELTA_TIME)."""
+        # Input, ghost path and telemetry are only recorded while the race runs, not
+        # behind the start, win and lose screens
+        racing = self.state == STATE_PLAYING and not self.level_finished
+
+        # A replay holds the keys instead of the player; either way the step's input is recorded
+        if self.replay is not None and not self.car.losing:
+            apply_input(self.car, self.replay.mask_at(self.recorder.ticks))
+        if racing:
+            self.recorder.record(input_mask(self.car))
+
+        with PROFILER.section("level.update"):
+            self.background.update(delta_time)
+        if self.car:
+            with PROFILER.section("car.update"):
+                self.car.update(delta_time)
+            PROFILER.count("sprites_moved")
+            if racing:
+                self.ghost_recorder.record(self.car.center_x, self.background.view_bottom)
+                with PROFILER.section("telemetry"):
+                    self.telemetry.record(self.car, self.background)
+
+        # Update level timer if playing and level not finished
+        if racing:
             self.level_time += delta_time
             # Track cumulative speed for average calculation
             if self.car:
                 self.cumulative_speed_time += self.car.speed * delta_time
-            # Update engine sounds during gameplay
-            self.update_engine_sound(delta_time)
 
         # Check for wall collision sound (only once per collision)
         if self.car.hit_wall and not self.previous_hit_wall and not self.crash_sound_played:
@@ -751,6 +833,8 @@ class MyGame(arcade.Window):
         if self.car.race_won and not self.level_finished:
             self.level_finished = True
             self.state = STATE_WIN
+            self.save_recording()
+            save_if_best(self.ghost_recorder, self.ghost_path())
             # Play win sound once
             if not self.win_sound_played:
                 arcade.play_sound(self.win_sound, volume=0.8)
@@ -764,6 +848,7 @@ class MyGame(arcade.Window):
         if self.car.explosion_over and not self.level_finished:
             self.level_finished = True
             self.state = STATE_LOSE
+            self.save_recording()
             # Play loss sound once
             if not self.loss_sound_played:
                 arcade.play_sound(self.loss_sound, volume=0.8)
@@ -777,120 +862,33 @@ class MyGame(arcade.Window):
     def on_mouse_press(self, x, y, button, modifiers):
         """Handle mouse clicks for level selection"""
         if self.state == STATE_START and button == arcade.MOUSE_BUTTON_LEFT:
-            # Reset button press states
-            self.level1_pressed = False
-            self.level2_pressed = False
-            self.level3_pressed = False
-            self.level4_pressed = False
-            self.level5_pressed = False
-            
-            # Level 1 button (left side)
-            level1_button_x = self.width // 2 - 80
-            level1_button_y = self.height // 2 - 100
-            level1_button_width = 120
-            level1_button_height = 50
-            
-            if (level1_button_x - level1_button_width // 2 <= x <= level1_button_x + level1_button_width // 2 and
-                level1_button_y - level1_button_height // 2 <= y <= level1_button_y + level1_button_height // 2):
-                # If Level 1 clicked - show visual feedback first
-                self.level1_pressed = True
+            level_index = self.level_menu.button_at(x, y, self.width, self.height)
+            self.level_menu.pressed = level_index
+            if level_index is not None:
+                # Show visual feedback first, then start the level
                 arcade.play_sound(self.button_sound, volume=0.35)
-                self.pending_level_index = 0
+                self.pending_level_index = level_index
                 self.button_transition_timer = 0.15  # 0.15 second delay to show feedback
-                return
-            
-            # Level 2 button (right side)
-            level2_button_x = self.width // 2 + 80
-            level2_button_y = self.height // 2 - 100
-            level2_button_width = 120
-            level2_button_height = 50
-            
-            if (level2_button_x - level2_button_width // 2 <= x <= level2_button_x + level2_button_width // 2 and
-                level2_button_y - level2_button_height // 2 <= y <= level2_button_y + level2_button_height // 2):
-                # If Level 2 clicked - show visual feedback first
-                self.level2_pressed = True
-                arcade.play_sound(self.button_sound, volume=0.35)
-                self.pending_level_index = 1
-                self.button_transition_timer = 0.15  # 0.15 second delay to show feedback
-                return
-            
-            # Level 3 button (center bottom)
-            level3_button_x = self.width // 2 - 80
-            level3_button_y = self.height // 2 - 160
-            level3_button_width = 120
-            level3_button_height = 50
-            
-            if (level3_button_x - level3_button_width // 2 <= x <= level3_button_x + level3_button_width // 2 and
-                level3_button_y - level3_button_height // 2 <= y <= level3_button_y + level3_button_height // 2):
-                # If Level 3 clicked - show visual feedback first
-                self.level3_pressed = True
-                arcade.play_sound(self.button_sound, volume=0.35)
-                self.pending_level_index = 2
-                self.button_transition_timer = 0.15  # 0.15 second delay to show feedback
-                return
-
-            # Level 4 button (right bottom)
-            level4_button_x = self.width // 2 + 80
-            level4_button_y = self.height // 2 - 180
-            level4_button_width = 120
-            level4_button_height = 50
-            
-            if (level4_button_x - level4_button_width // 2 <= x <= level4_button_x + level4_button_width // 2 and
-                level4_button_y - level4_button_height // 2 <= y <= level4_button_y + level4_button_height // 2):
-                # If Level 4 clicked - show visual feedback first
-                self.level4_pressed = True
-                arcade.play_sound(self.button_sound, volume=0.35)
-                self.pending_level_index = 3
-                self.button_transition_timer = 0.15  # 0.15 second delay to show feedback
-                return
-
-            # Level 5 button (center bottom row 3)
-            # Must match drawing position: self.width // 2 - 80 (user customized)
-            level5_button_x = self.width // 2 - 80
-            level5_button_y = self.height // 2 - 260
-            level5_button_width = 120
-            level5_button_height = 50
-            
-            if (level5_button_x - level5_button_width // 2 <= x <= level5_button_x + level5_button_width // 2 and
-                level5_button_y - level5_button_height // 2 <= y <= level5_button_y + level5_button_height // 2):
-                # If Level 5 clicked - show visual feedback first
-                self.level5_pressed = True
-                arcade.play_sound(self.button_sound, volume=0.35)
-                self.pending_level_index = 4
-                self.button_transition_timer = 0.15  # 0.15 second delay to show feedback
-                return
-
-            # Level 6 button (right bottom row 3)
-            level6_button_x = self.width // 2 + 80
-            level6_button_y = self.height // 2 - 260
-            level6_button_width = 120
-            level6_button_height = 50
-            
-            if (level6_button_x - level6_button_width // 2 <= x <= level6_button_x + level6_button_width // 2 and
-                level6_button_y - level6_button_height // 2 <= y <= level6_button_y + level6_button_height // 2):
-                # If Level 6 clicked - show visual feedback first
-                self.level6_pressed = True
-                arcade.play_sound(self.button_sound, volume=0.35)
-                self.pending_level_index = 5
-                self.button_transition_timer = 0.15  # 0.15 second delay to show feedback
-                return
 
     def on_mouse_release(self, x, y, button, modifiers):
         """Reset button press states when mouse is released"""
-        self.level1_pressed = False
-        self.level2_pressed = False
-        self.level3_pressed = False
-        self.level4_pressed = False
-        self.level5_pressed = False
-        self.level6_pressed = False
+        self.level_menu.pressed = None
 
     def on_key_press(self, key, modifiers):
+        # Frame profiler: F1 shows or hides the overlay, F2 saves the recent frames
+        if key == arcade.key.F1:
+            PROFILER.enable(not PROFILER.enabled)
+            self.profiler_refresh = 0
+            return
+        if key == arcade.key.F2:
+            if PROFILER.frames:
+                path = os.path.join(PROFILE_DIR, time.strftime("profile-%Y%m%d-%H%M%S.csv"))
+                print(f"Profile written to {PROFILER.dump_csv(path)}")
+            return
 
         if self.state == STATE_START:
             # Default to Level 1 if any key is pressed (for backward compatibility)
-            self.level_index = 0
-            self.state = STATE_PLAYING
-            self.setup()
+            self.start_level(0)
             return
 
         if self.state == STATE_WIN:
@@ -898,18 +896,20 @@ class MyGame(arcade.Window):
                 self.level_index += 1
                 if self.level_index >= len(constants.LEVEL_CLASSES):
                     self.level_index = 0  # Loop back to first level
+                self.stop_replay()
                 self.state = STATE_PLAYING
                 self.setup()
             return
 
         if self.state == STATE_LOSE:
             if key == arcade.key.R:
+                self.stop_replay()
                 self.state = STATE_PLAYING
-                self.setup()
+                self.restart()
             return
 
-        # Only allow car movement when playing and not in losing state
-        if self.state == STATE_PLAYING and self.car and not self.car.losing:
+        # Only allow car movement when playing, not in losing state and not replaying
+        if self.state == STATE_PLAYING and self.car and not self.car.losing and self.replay is None:
             if key == arcade.key.LEFT or key == arcade.key.A:
                 self.car.left_pressed = True
             elif key == arcade.key.RIGHT or key == arcade.key.D:
@@ -923,8 +923,8 @@ class MyGame(arcade.Window):
         if self.state != STATE_PLAYING:
             return
 
-        # Ignore key releases during losing state
-        if not self.car or self.car.losing:
+        # Ignore key releases during losing state and replays
+        if not self.car or self.car.losing or self.replay is not None:
             return
 
         if key == arcade.key.LEFT or key == arcade.key.A:
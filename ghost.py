@@ -0,0 +1,110 @@
+import os
+from array import array
+import numpy as np
+
+# Positions are stored in quarter pixels
+GHOST_SCALE = 4
+
+
+class GhostRecorder:
+    """Records the path of the player's car through one race, one point per tick."""
+
+    def __init__(self):
+        self.xs = array("d")
+        self.view_bottoms = array("d")
+
+    @property
+    def ticks(self):
+        return len(self.xs)
+
+    def record(self, x, view_bottom):
+        self.xs.append(x)
+        self.view_bottoms.append(view_bottom)
+
+    def save(self, path):
+        """Writes the path as an int16 .npy array of shape (ticks, 2).
+
+        Each row is (center_x, view_bottom) in quarter pixels. Row 0 holds the start
+        position; every later row holds the change since the row before it.
+        """
+        points = np.rint(np.column_stack([self.xs, self.view_bottoms]) * GHOST_SCALE).astype(np.int64)
+        deltas = np.diff(points, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+        if deltas.min(initial=0) < -32768 or deltas.max(initial=0) > 32767:
+            raise ValueError("Ghost path moves too far in one tick to store")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = path + ".tmp.npy"
+        np.save(temporary, deltas.astype("<i2"))
+        os.replace(temporary, path)
+        return path
+
+
+def ghost_ticks(path):
+    """Length of the ghost stored at path, or None when there is none."""
+    ghost = Ghost.load(path)
+    return ghost.ticks if ghost is not None else None
+
+
+def save_if_best(recorder, path):
+    """Stores a finished run as the ghost unless the stored one is at least as fast."""
+    best = ghost_ticks(path)
+    if best is None or recorder.ticks < best:
+        recorder.save(path)
+        return True
+    return False
+
+
+class Ghost:
+    """A stored path, played back by tick.
+
+    The file is memory-mapped and decoded as the race goes: seek() adds up the
+    deltas between the last tick it was asked for and the new one, reading plain
+    ints from a memoryview, so following the ghost allocates nothing per frame.
+    """
+
+    def __init__(self, deltas):
+        self.ticks = len(deltas)
+        # Flat (x, view_bottom) pairs as a memoryview of int16
+        self._deltas = memoryview(deltas.reshape(-1)).cast("B").cast("h")
+        self._tick = -1
+        self._x = 0
+        self._view_bottom = 0
+        # Position at the tick of the last seek(), in pixels
+        self.x = 0.0
+        self.view_bottom = 0.0
+
+    @classmethod
+    def load(cls, path):
+        """Maps a ghost file, or returns None when there is no usable one."""
+        try:
+            deltas = np.load(path, mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return None
+        if deltas.dtype != np.dtype("<i2") or deltas.ndim != 2 or deltas.shape[1] != 2 or not len(deltas):
+            return None
+        return cls(deltas)
+
+    @property
+    def finished(self):
+        """True once seek() went past the end of the path."""
+        return self._tick >= self.ticks
+
+    def seek(self, tick):
+        """Moves x and view_bottom to where the ghost was at tick (0-based)."""
+        if tick < self._tick:
+            # Back to the start line (retry)
+            self._tick = -1
+            self._x = 0
+            self._view_bottom = 0
+        deltas = self._deltas
+        end = min(tick, self.ticks - 1)
+        while self._tick < end:
+            self._tick += 1
+            self._x += deltas[2 * self._tick]
+            self._view_bottom += deltas[2 * self._tick + 1]
+        if tick > self._tick:
+            self._tick = tick
+        self.x = self._x / GHOST_SCALE
+        self.view_bottom = self._view_bottom / GHOST_SCALE
@@ -0,0 +1,293 @@
+"""Headless race simulation: levels, the player car and bots without a window.
+
+Nothing here opens an arcade.Window or needs a GL context, so races run as fast as
+the CPU allows. Player input comes from a script instead of the keyboard.
+
+    python headless.py --level 3 --races 100 --script lane_keeper
+    python headless.py --level 6 --profile profiles/level6.csv
+    python headless.py --replay replays/level2-last.bcr
+    python headless.py --level 5 --races 20 --telemetry telemetry/level5
+"""
+import argparse
+import math
+import os
+import time
+
+import constants
+from car import PlayerCar
+from constants import SIM_DELTA_TIME
+from lane_grid import BROKEN
+from profiler import PROFILER
+from replay import InputReplay
+from telemetry import Telemetry
+
+# Give up on races that run longer than this (seconds of race time)
+MAX_RACE_TIME = 180
+
+# Player spawn, same as MyGame.setup()
+PLAYER_START_X = 295
+PLAYER_START_Y = 400
+
+# Spacing in pixels of the x positions lane_keeper considers
+POSITION_STEP = 5
+
+
+def full_throttle(tick, car, level):
+    """Input script: accelerate straight ahead for the whole race."""
+    car.up_pressed = True
+
+
+def lane_keeper(tick, car, level, lookahead_rows=8):
+    """Input script: steers to the reachable x with the most free road ahead over the
+    next few rows of unbroken hazards, braking when it cannot get there in time."""
+    car.up_pressed = True
+    car.down_pressed = False
+    car.left_pressed = False
+    car.right_pressed = False
+
+    grids = level.grids_with_role("deadly", "trap")
+    if not grids:
+        return
+
+    # Hit box extent of the car around its centre, in the grids' frame
+    hit_box = car.get_adjusted_hit_box()
+    reach_left = car.center_x - min(point[0] for point in hit_box)
+    reach_right = max(point[0] for point in hit_box) - car.center_x
+    bottom = min(point[1] for point in hit_box) + level.scrolled_y
+    top = max(point[1] for point in hit_box) + level.scrolled_y
+
+    # Hazards ahead as (left, right, bottom)
+    blocked = []
+    for grid in grids:
+        first_row = max(0, int((bottom - grid.origin_y) // grid.tile_size))
+        start = first_row * grid.columns
+        window = grid.gids[start:min(grid.rows, first_row + lookahead_rows) * grid.columns]
+        for offset in [offset for offset, gid in enumerate(window) if gid]:
+            index = start + offset
+            if not grid.state[index] & BROKEN:
+                left, right, cell_bottom, cell_top = grid.cell_bounds(index)
+                if cell_top > bottom:
+                    blocked.append((left, right, cell_bottom))
+
+    def in_path(x, left, right):
+        return left < x + reach_right + 4 and right > x - reach_left - 4
+
+    # Free distance ahead with no hazard in the path at all
+    free_road = lookahead_rows * grids[0].tile_size
+
+    def clearance(x):
+        # Free distance ahead of the car if it were at x
+        gaps = [cell_bottom - top for left, right, cell_bottom in blocked if in_path(x, left, right)]
+        return min(gaps, default=free_road)
+
+    # PlayerCar.update moves by change_x and Sprite.update moves by it again
+    turn_rate = 2 * car.turn_speed
+    speed = max(car.speed, 1)
+
+    # Walls stop the car at x=70 and x=430; candidate x every POSITION_STEP pixels
+    x = car.center_x
+    positions = range(70, 431, POSITION_STEP)
+    last = len(positions) - 1
+    clearances = [math.inf] * len(positions)
+    for left, right, cell_bottom in blocked:
+        # Positions with the cell in their path, found by index (exact test at the ends)
+        first = max(0, math.floor((left - reach_right - 4 - 70) / POSITION_STEP))
+        end = min(last, math.ceil((right + reach_left + 4 - 70) / POSITION_STEP))
+        if not in_path(positions[first], left, right):
+            first += 1
+        if end >= first and not in_path(positions[end], left, right):
+            end -= 1
+        gap = cell_bottom - top
+        clearances[first:end + 1] = [gap if gap < clearance else clearance
+                                     for clearance in clearances[first:end + 1]]
+    clearances = [free_road if gap == math.inf else gap for gap in clearances]
+
+    # Position nearest the car, the lower one on a tie
+    current = min(last, max(0, int((x - 70) // POSITION_STEP)))
+    if current < last and abs(positions[current + 1] - x) < abs(positions[current] - x):
+        current += 1
+
+    # A target is reachable when the car clears every x it sweeps through on the way
+    # before getting there: scan outward from the car, stopping at the first miss.
+    # The reachable positions are the run lowest..highest around the car.
+    lowest = highest = current
+    while highest < last and clearances[highest + 1] > speed * abs(positions[highest + 1] - x) / turn_rate:
+        highest += 1
+    while lowest > 0 and clearances[lowest - 1] > speed * abs(positions[lowest - 1] - x) / turn_rate:
+        lowest -= 1
+
+    # Most free road, then the nearest; the leftmost of equals. Positions are visited
+    # nearest first, from the car outward on both sides.
+    best = max(clearances[lowest:highest + 1])
+    left, right = current, current + 1
+    while True:
+        if right > highest or left >= lowest and abs(positions[left] - x) <= abs(positions[right] - x):
+            target = left
+            left -= 1
+        else:
+            target = right
+            right += 1
+        if clearances[target] == best:
+            break
+    target_x = positions[target]
+    if target_x < car.center_x - 2:
+        car.left_pressed = True
+    elif target_x > car.center_x + 2:
+        car.right_pressed = True
+
+    # Brake when the next hazard in the current path comes before the car has moved aside
+    if blocked and car.speed > 1:
+        frames_to_clear = abs(target_x - car.center_x) / turn_rate
+        if clearance(car.center_x) < car.speed * (frames_to_clear + 4):
+            car.up_pressed = False
+            car.down_pressed = True
+
+
+INPUT_SCRIPTS = {
+    "full_throttle": full_throttle,
+    "lane_keeper": lane_keeper,
+}
+
+
+def race_over(car, level):
+    """Default end of a race: the player finished or has exploded."""
+    return car.race_won or car.explosion_over
+
+
+def run_race(level_index, script=lane_keeper, seed=None, max_time=MAX_RACE_TIME, on_step=None, traffic=None,
+             bots=None, until=race_over, telemetry=False):
+    """Runs one race of LEVEL_CLASSES[level_index] (or endless mode) and returns its outcome.
+
+    Steps match MyGame.simulation_step: level first, then the player car.
+    script(tick, car, level) sets the car's input flags before each step. The same
+    seed and script always give the same race. on_step(tick, car, level), when
+    given, runs after every step (benchmark.py draws the level there). traffic and
+    bots are the numbers of traffic cars and racing bots (TRAFFIC_CARS and
+    BOT_GRID_SIZE when None). The race stops once until(car, level) is true
+    (balance.py races on until the bot is done) or after max_time. With telemetry,
+    every step is recorded and the result holds the Telemetry.
+    """
+    car = PlayerCar(PLAYER_START_X, PLAYER_START_Y)
+    start = time.perf_counter()
+    level = constants.level_class(level_index)(car, constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT, seed=seed, traffic=traffic,
+                                               bots=bots)
+    load_seconds = time.perf_counter() - start
+    # Endless mode has no bot
+    bot = level.bot_list[0] if level.bot_list else None
+    recorder = Telemetry(len(level.bot_list)) if telemetry else None
+
+    race_time = 0.0
+    bot_finish_time = None
+    # Time spent in the simulation itself, without the input script
+    sim_seconds = 0.0
+    tick = 0
+    max_ticks = int(max_time / SIM_DELTA_TIME)
+    while tick < max_ticks:
+        # One profiler frame per step (see --profile)
+        PROFILER.begin_frame()
+        if not car.losing:
+            with PROFILER.section("script"):
+                script(tick, car, level)
+        start = time.perf_counter()
+        with PROFILER.section("level.update"):
+            level.update(SIM_DELTA_TIME)
+        with PROFILER.section("car.update"):
+            car.update(SIM_DELTA_TIME)
+        if recorder is not None:
+            with PROFILER.section("telemetry"):
+                recorder.record(car, level)
+        sim_seconds += time.perf_counter() - start
+        PROFILER.count("sprites_moved")
+        PROFILER.end_frame()
+        race_time += SIM_DELTA_TIME
+        tick += 1
+        if bot_finish_time is None and bot is not None and bot.race_finished:
+            bot_finish_time = race_time
+        if on_step is not None:
+            on_step(tick, car, level)
+        if until(car, level):
+            break
+    # Shared assets stay cached for the next race
+    level.release_assets()
+
+    return {
+        "level": level_index + 1,
+        "seed": level.seed,
+        "ticks": tick,
+        "load_seconds": load_seconds,
+        "sim_seconds": sim_seconds,
+        "won": car.race_won,
+        "lost": car.race_lost or car.explosion_over,
+        "timed_out": not (car.race_won or car.explosion_over),
+        "finish_time": race_time if car.race_won else None,
+        "lives_lost": 3 - max(0, car.lives),
+        "position": level.player_position,
+        "bots": len(level.bot_list),
+        "distance": level.view_bottom,
+        "bot_finished": bot is not None and bot.race_finished,
+        "bot_finish_time": bot_finish_time,
+        "bot_exploded": bot is not None and bot.exploding,
+        # Bot distance along the track, 0.0 at the start line and 1.0 at the finish
+        "bot_progress": max(0.0, min(1.0, (bot.center_y + level.scrolled_y) / level.track_end_y)) if bot else 0.0,
+        "telemetry": recorder,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run races without opening a window.")
+    parser.add_argument("--level", type=int, default=1, help="Level number (1-6, 7 for endless mode)")
+    parser.add_argument("--races", type=int, default=10, help="Number of races to run")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first race")
+    parser.add_argument("--script", choices=sorted(INPUT_SCRIPTS), default="lane_keeper")
+    parser.add_argument("--profile", metavar="CSV", help="Time every step and write the timings here")
+    parser.add_argument("--replay", metavar="FILE", help="Play back a recorded race and report its outcome")
+    parser.add_argument("--telemetry", metavar="DIR", help="Record every race and write its telemetry here")
+    args = parser.parse_args()
+
+    if args.replay:
+        # Level, seed and input all come from the recording
+        replay = InputReplay.load(args.replay)
+        result = run_race(replay.level - 1, replay.script, seed=replay.seed)
+        outcome = "won" if result["won"] else "lost" if result["lost"] else "timed out"
+        print(f"Level {result['level']}, seed {result['seed']}: {outcome} after {result['ticks']} ticks "
+              f"({replay.ticks} recorded)")
+        if result["won"]:
+            print(f"  finish time {result['finish_time']:.2f}s, lives lost {result['lives_lost']}")
+        return
+
+    if args.profile:
+        PROFILER.enable(window=args.races * int(MAX_RACE_TIME / SIM_DELTA_TIME))
+
+    script = INPUT_SCRIPTS[args.script]
+    start = time.perf_counter()
+    results = [run_race(args.level - 1, script, seed=args.seed + i, telemetry=bool(args.telemetry))
+               for i in range(args.races)]
+    elapsed = time.perf_counter() - start
+    if args.telemetry:
+        for result in results:
+            result["telemetry"].save(os.path.join(args.telemetry, f"level{result['level']}-seed{result['seed']}.npz"),
+                                     level=result["level"], seed=result["seed"])
+
+    wins = [result for result in results if result["won"]]
+    print(f"Level {args.level}: {len(results)} races in {elapsed:.2f}s "
+          f"({len(results) / elapsed * 60:.0f} races/min)")
+    print(f"  won {len(wins)}, lost {sum(result['lost'] for result in results)}, "
+          f"timed out {sum(result['timed_out'] for result in results)}")
+    if wins:
+        times = sorted(result["finish_time"] for result in wins)
+        print(f"  finish time min {times[0]:.2f}s, median {times[len(times) // 2]:.2f}s, max {times[-1]:.2f}s")
+    print(f"  lives lost (avg) {sum(result['lives_lost'] for result in results) / len(results):.2f}")
+    print(f"  bot finished {sum(result['bot_finished'] for result in results)}, "
+          f"exploded {sum(result['bot_exploded'] for result in results)}")
+
+    if args.profile:
+        print(f"  per step (ms)          p50     p95     p99   worst")
+        for name, p50, p95, p99, worst in PROFILER.stats():
+            print(f"    {name:<18}{p50:8.3f}{p95:8.3f}{p99:8.3f}{worst:8.3f}")
+        for name, p50, worst in PROFILER.counter_stats():
+            print(f"    {name:<18}{p50:8d}{'':8}{'':8}{worst:8d}")
+        print(f"  profile written to {PROFILER.dump_csv(args.profile)}")
+
+
+if __name__ == "__main__":
+    main()
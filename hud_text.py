@@ -0,0 +1,31 @@
+import arcade
+from profiler import PROFILER
+
+
+class HudText:
+    """Persistent text objects for the text drawn every frame.
+
+    arcade.draw_text lays out the glyphs of its string again on every call. Here each
+    piece of text keeps its own arcade.Text under a key, built the first time it is
+    drawn. Later frames only lay it out again when its string or position changes, so
+    static labels are laid out once and values (speed, time, percent) only when the
+    value shown on screen changes.
+    """
+
+    def __init__(self, font_name):
+        self.font_name = font_name
+        self._texts = {}
+
+    def draw(self, key, text, x, y, color, font_size, **kwargs):
+        """Draws text under key; kwargs are arcade.Text options (anchor_x, ...)."""
+        label = self._texts.get(key)
+        if label is None:
+            label = arcade.Text(text, x, y, color, font_size, font_name=self.font_name, **kwargs)
+            self._texts[key] = label
+        else:
+            if label.text != text:
+                label.text = text
+            if label.x != x or label.y != y:
+                label.position = (x, y)
+        label.draw()
+        PROFILER.count("draw_calls")
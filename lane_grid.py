@@ -0,0 +1,167 @@
+import math
+from array import array
+from bisect import bisect_right
+import arcade
+from profiler import PROFILER
+
+# Per-cell state flags
+BROKEN = 1      # Deadly obstacle already hit (shows the broken texture)
+STOPPED = 2     # Trap stopped by the player
+
+
+class LaneGrid:
+    """Collision index for one map layer, compiled once when the level loads.
+
+    The track is split into rows x columns cells of one tile each. `gids` holds the
+    tile in every cell (0 = empty) and doubles as the occupancy grid, `state` holds
+    per-cell flags. Finding what a car touches only looks at the two or three rows and
+    columns under its footprint and tests the exact hit box of those few tiles, so the
+    cost does not depend on how many tiles the layer has or whether they have sprites.
+    """
+
+    def __init__(self, level_data, layer_name, hit_box=None):
+        self.columns = level_data.width
+        self.rows = level_data.height
+        self.tile_size = level_data.tile_size
+        self.state = bytearray(self.columns * self.rows)
+        # How far the layer has been moved down (legacy scrolling only)
+        self.scrolled_y = 0
+        # World y of the bottom of row 0, for grids covering one chunk of a track (endless.py)
+        self.origin_y = 0
+
+        # hit_box overrides the tile hit boxes (layers replaced by animated sprites)
+        self._level_data = level_data
+        self._hit_box = hit_box
+        self._polygons = {}
+
+        if level_data.has_layer(layer_name):
+            self.gids = array("H", level_data.layer(layer_name))
+        else:
+            self.gids = array("H", bytes(2 * self.columns * self.rows))
+        self.reach = self._reach()
+
+    def refill(self, gids):
+        """Reuses the grid for other tiles of the same size: new GIDs, cleared state."""
+        self.gids[:] = gids
+        self.state[:] = bytes(len(self.state))
+        self._polygons.clear()
+        self.reach = self._reach()
+
+    def _reach(self):
+        extent = 0
+        for gid in set(self.gids):
+            if gid:
+                for x, y in self._tile_hit_box(gid):
+                    extent = max(extent, abs(x), abs(y))
+        # Hit boxes bigger than a tile (fire dispensers) reach into neighbouring cells
+        return max(0, int(math.ceil((extent - self.tile_size / 2) / self.tile_size)))
+
+    def _tile_hit_box(self, gid):
+        if self._hit_box is not None:
+            return self._hit_box
+        return self._level_data.hit_box(gid)
+
+    def cell_position(self, index):
+        """Current position of the centre of a cell."""
+        row, col = divmod(index, self.columns)
+        return (col + 0.5) * self.tile_size, self.origin_y + (row + 0.5) * self.tile_size - self.scrolled_y
+
+    def cell_bounds(self, index):
+        """World bounding box (left, right, bottom, top) of a cell's hit box."""
+        points, left, right, bottom, top = self._polygon(index)
+        return left, right, bottom + self.origin_y, top + self.origin_y
+
+    def _polygon(self, index):
+        # Hit box of a cell relative to origin_y, with its bounding box for a quick reject
+        polygon = self._polygons.get(index)
+        if polygon is None:
+            row, col = divmod(index, self.columns)
+            center_x = (col + 0.5) * self.tile_size
+            center_y = (row + 0.5) * self.tile_size
+            points = [(center_x + x, center_y + y) for x, y in self._tile_hit_box(self.gids[index])]
+            xs = [point[0] for point in points]
+            ys = [point[1] for point in points]
+            polygon = (points, min(xs), max(xs), min(ys), max(ys))
+            self._polygons[index] = polygon
+        return polygon
+
+    def check_for_collision(self, sprite):
+        """Returns the indices of the cells whose tiles collide with sprite."""
+        hit_box = sprite.get_adjusted_hit_box()
+        offset = self.scrolled_y - self.origin_y
+        if offset:
+            hit_box = [(x, y + offset) for x, y in hit_box]
+
+        xs = [point[0] for point in hit_box]
+        ys = [point[1] for point in hit_box]
+        left = min(xs)
+        right = max(xs)
+        bottom = min(ys)
+        top = max(ys)
+
+        size = self.tile_size
+        row_start = max(0, int(bottom // size) - self.reach)
+        row_end = min(self.rows - 1, int(top // size) + self.reach)
+        if row_start > row_end:
+            return []
+        col_start = max(0, int(left // size) - self.reach)
+        col_end = min(self.columns - 1, int(right // size) + self.reach)
+
+        gids = self.gids
+        hits = []
+        tests = 0
+        for row in range(row_start, row_end + 1):
+            base = row * self.columns
+            for col in range(col_start, col_end + 1):
+                index = base + col
+                if not gids[index]:
+                    continue
+                points, cell_left, cell_right, cell_bottom, cell_top = self._polygon(index)
+                if cell_left > right or cell_right < left or cell_bottom > top or cell_top < bottom:
+                    continue
+                tests += 1
+                if arcade.are_polygons_intersecting(hit_box, points):
+                    hits.append(index)
+        PROFILER.count("collision_tests", tests)
+        return hits
+
+
+class HazardIndex:
+    """Sorted y positions of the occupied cells of some lane grids, one array per column.
+
+    Built once per level for the bot, so "the nearest hazard ahead in this lane" is a
+    binary search per column instead of a scan over every hazard of the level. All
+    grids must come from the same level (same columns, tile size and scroll).
+    """
+
+    def __init__(self, grids):
+        self.grids = grids
+        self.columns = grids[0].columns if grids else 0
+        self.tile_size = grids[0].tile_size if grids else 0
+        self.column_x = [(col + 0.5) * self.tile_size for col in range(self.columns)]
+        ys = [[] for col in range(self.columns)]
+        for grid in grids:
+            for index, gid in enumerate(grid.gids):
+                if gid:
+                    row, col = divmod(index, self.columns)
+                    ys[col].append((row + 0.5) * self.tile_size)
+        self.column_ys = [array("d", sorted(column)) for column in ys]
+
+    def nearest_ahead(self, x, y, distance, half_width=50):
+        """Distance to the nearest hazard strictly between y and y + distance whose
+        centre is less than half_width from x, or None when there is none."""
+        if not self.grids:
+            return None
+        # Hazards are stored in world space; move y there (legacy scrolling)
+        world_y = y + self.grids[0].scrolled_y
+        nearest = None
+        for col in range(self.columns):
+            if abs(self.column_x[col] - x) >= half_width:
+                continue
+            column = self.column_ys[col]
+            i = bisect_right(column, world_y)
+            if i < len(column):
+                gap = column[i] - world_y
+                if gap < distance and (nearest is None or gap < nearest):
+                    nearest = gap
+        return nearest
@@ -0,0 +1,127 @@
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+# Compiled level file:
+#   header: magic, format version, length of the JSON info block
+#   JSON info: map metadata, tilesets, hit boxes, source file digests, layer offsets
+#   layer data: one uint16 GID per cell per layer, rows from the bottom of the map,
+#   starting right after the info block
+MAGIC = b"BCLV"
+VERSION = 1
+_HEADER = struct.Struct("<4sII")
+
+
+def file_digest(path):
+    with open(path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def compiled_path(map_path, cache_dir):
+    """Where the compiled form of a map lives; the name changes with the map's content."""
+    stem = os.path.splitext(os.path.basename(map_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{file_digest(map_path)[:16]}.lvl")
+
+
+def load_compiled(map_path, cache_dir):
+    """Maps the compiled form of a map into memory.
+
+    Returns (info, layers) with layers as name -> uint16 memoryview over the file, or
+    None when there is no usable compiled file: missing, cut short or otherwise
+    unreadable, or one of its source files (tilesets, tileset images) has changed
+    since it was written. The caller then compiles the TMX again.
+    """
+    path = compiled_path(map_path, cache_dir)
+    try:
+        with open(path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Missing, unreadable (permissions, a directory) or empty
+        return None
+
+    try:
+        compiled = _read_compiled(data)
+    except (OSError, struct.error, ValueError, KeyError, TypeError):
+        # json.JSONDecodeError is a ValueError
+        compiled = None
+    if compiled is None:
+        data.close()
+    return compiled
+
+
+def _read_compiled(data):
+    # (info, layers) of a mapped compiled file, None when it is stale; raises on a damaged file
+    magic, version, length = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        return None
+    start = _HEADER.size + length
+    if start > len(data):
+        raise ValueError("Compiled level cut off inside its info block")
+    info = json.loads(data[_HEADER.size:start])
+    if info["byteorder"] != sys.byteorder:
+        return None
+    for source, digest in info["sources"]:
+        if not os.path.exists(source) or file_digest(source) != digest:
+            return None
+
+    # Every layer holds one GID per cell, inside the file; all are checked before any
+    # view into the file exists, so a damaged file can be closed right away
+    cells = info["width"] * info["height"]
+    for name, offset, count in info["layers"]:
+        if count != cells or offset < 0 or start + offset + 2 * count > len(data):
+            raise ValueError(f"Compiled level layer {name} is cut off")
+    view = memoryview(data)
+    layers = {name: view[start + offset:start + offset + 2 * count].cast("H")
+              for name, offset, count in info["layers"]}
+    return info, layers
+
+
+def write_compiled(map_path, cache_dir, info, layers, sources):
+    """Writes the compiled form of a map and removes older ones of the same map.
+
+    info is the JSON-compatible metadata, layers maps names to uint16 arrays and
+    sources lists the files besides the map that the compiled data depends on.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = compiled_path(map_path, cache_dir)
+
+    info = dict(info)
+    info["byteorder"] = sys.byteorder
+    info["sources"] = [[source, file_digest(source)] for source in sources]
+    # Layer offsets count from the end of the info block
+    info["layers"] = []
+    offset = 0
+    for name, gids in layers.items():
+        info["layers"].append([name, offset, len(gids)])
+        offset += 2 * len(gids)
+    block = json.dumps(info).encode()
+    # Keep the layer data 2-byte aligned
+    block += b" " * ((_HEADER.size + len(block)) % 2)
+
+    for stale in glob.glob(os.path.join(cache_dir, os.path.basename(path).rsplit("-", 1)[0] + "-*.lvl")):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                # Another process (balance.py workers) removed it first
+                pass
+
+    # A temporary file of its own, so processes compiling the same map at once never
+    # write into each other's file; the last os.replace wins with a complete file
+    handle, temporary = tempfile.mkstemp(dir=cache_dir, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, len(block)))
+            file.write(block)
+            for gids in layers.values():
+                file.write(array("H", gids).tobytes())
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
@@ -0,0 +1,203 @@
+import json
+import os
+import xml.etree.ElementTree as ET
+from array import array
+from assets import ASSETS
+from constants import LEVEL_CACHE_DIR
+from level_cache import load_compiled, write_compiled
+
+# Tiled stores flip flags in the top bits of a GID
+FLIP_FLAGS = 0xE0000000
+
+
+class LevelData:
+    """Tile data of a Tiled map.
+
+    The first load of a map reads the TMX file and its tilesets and writes a compiled
+    copy to cache_dir (see level_cache.py): every layer as one flat GID array and the
+    hit box of every tile used. Later loads memory-map that file instead, as long as
+    the map, its tilesets and their images are unchanged. Rows are counted from the
+    bottom of the map so that row * tile_size is world y.
+    """
+
+    def __init__(self, map_path, scaling, cache_dir=LEVEL_CACHE_DIR):
+        self.map_path = map_path
+        self.scaling = scaling
+
+        self._textures = {}
+        # Tile textures taken from the asset registry, handed back by release_assets()
+        self.asset_specs = []
+
+        compiled = load_compiled(map_path, cache_dir) if cache_dir else None
+        if compiled is not None:
+            info, self._layers = compiled
+        else:
+            info, self._layers, sources = self._compile()
+            if cache_dir:
+                try:
+                    write_compiled(map_path, cache_dir, info, self._layers, sources)
+                except OSError:
+                    # A read-only install still runs, it just compiles every time
+                    pass
+
+        self.width = info["width"]
+        self.height = info["height"]
+        self.tile_width = info["tile_width"]
+        self.tile_height = info["tile_height"]
+        # Tiles are square in every map, so one size covers both axes
+        self.tile_size = self.tile_width * scaling
+        self.track_length = self.height * self.tile_height * scaling
+        self.tilesets = [(firstgid, tileset) for firstgid, tileset in info["tilesets"]]
+        self._hit_boxes = {
+            int(gid): [(x * scaling, y * scaling) for x, y in points]
+            for gid, points in info["hit_boxes"].items()
+        }
+
+    def _compile(self):
+        # Reads the TMX and tilesets into the compiled form: (info, layers, sources)
+        map_path = self.map_path
+        root = ET.parse(map_path).getroot()
+        width = int(root.get("width"))
+        height = int(root.get("height"))
+
+        map_directory = os.path.dirname(map_path)
+        tilesets = []
+        sources = []
+        for element in root.findall("tileset"):
+            tileset, tileset_sources = self._load_tileset(element, map_directory)
+            tilesets.append((int(element.get("firstgid")), tileset))
+            sources += tileset_sources
+        tilesets.sort(key=lambda item: item[0])
+        self.tilesets = tilesets
+
+        # One flat GID array per layer, bottom row first
+        layers = {}
+        for layer in root.findall("layer"):
+            name = layer.get("name")
+            data = layer.find("data")
+            if data.get("encoding") != "csv":
+                raise ValueError(f"Layer '{name}' in {map_path} is not CSV encoded")
+            lines = data.text.strip().split("\n")
+            gids = array("H")
+            for line in reversed(lines):
+                row = [int(value) for value in line.split(",") if value.strip()]
+                if any(gid & FLIP_FLAGS for gid in row):
+                    raise ValueError(f"Flipped tiles are not supported (layer '{name}' in {map_path})")
+                gids.extend(row)
+            if len(gids) != width * height:
+                raise ValueError(f"Layer '{name}' in {map_path} does not have {width}x{height} tiles")
+            layers[name] = gids
+
+        # Unscaled hit box of every tile in use
+        used = set()
+        for gids in layers.values():
+            used.update(gids)
+        used.discard(0)
+        hit_boxes = {str(gid): [list(point) for point in self.texture(gid).hit_box_points] for gid in sorted(used)}
+
+        info = {
+            "width": width,
+            "height": height,
+            "tile_width": int(root.get("tilewidth")),
+            "tile_height": int(root.get("tileheight")),
+            "tilesets": [list(item) for item in tilesets],
+            "hit_boxes": hit_boxes,
+        }
+        return info, layers, sources
+
+    def _load_tileset(self, element, map_directory):
+        # Returns the tileset and the files it was read from (besides the map)
+        source = element.get("source")
+        if source is None:
+            # Embedded tileset
+            tileset = self._tileset_from_xml(element, map_directory)
+            return tileset, [tileset["image"]]
+
+        path = os.path.join(map_directory, source)
+        if source.endswith(".tsx"):
+            tileset = self._tileset_from_xml(ET.parse(path).getroot(), os.path.dirname(path))
+            return tileset, [path, tileset["image"]]
+
+        # .tsj / .json tilesets
+        with open(path) as file:
+            info = json.load(file)
+        tileset = {
+            "image": os.path.join(os.path.dirname(path), info["image"]),
+            "columns": info["columns"],
+            "tile_width": info["tilewidth"],
+            "tile_height": info["tileheight"],
+            "margin": info.get("margin", 0),
+            "spacing": info.get("spacing", 0),
+        }
+        return tileset, [path, tileset["image"]]
+
+    def _tileset_from_xml(self, element, directory):
+        image = element.find("image")
+        return {
+            "image": os.path.join(directory, image.get("source")),
+            "columns": int(element.get("columns")),
+            "tile_width": int(element.get("tilewidth")),
+            "tile_height": int(element.get("tileheight")),
+            "margin": int(element.get("margin", 0)),
+            "spacing": int(element.get("spacing", 0)),
+        }
+
+    def has_layer(self, name):
+        return name in self._layers
+
+    def layer(self, name):
+        """GIDs of a whole layer (0 = empty), row by row from the bottom."""
+        return self._layers[name]
+
+    def row(self, name, row):
+        """Returns the GIDs of one layer row (0 = empty)."""
+        start = row * self.width
+        return self._layers[name][start:start + self.width]
+
+    def cell_center(self, col, row):
+        """World position of the centre of a tile."""
+        return (col + 0.5) * self.tile_size, (row + 0.5) * self.tile_size
+
+    def texture(self, gid):
+        """Texture for a GID, cut from its tileset image (decoded once per process)."""
+        texture = self._textures.get(gid)
+        if texture is None:
+            firstgid, tileset = [item for item in self.tilesets if item[0] <= gid][-1]
+            tile_id = gid - firstgid
+            column = tile_id % tileset["columns"]
+            row = tile_id // tileset["columns"]
+            spec = (
+                "texture",
+                tileset["image"],
+                tileset["margin"] + column * (tileset["tile_width"] + tileset["spacing"]),
+                tileset["margin"] + row * (tileset["tile_height"] + tileset["spacing"]),
+                tileset["tile_width"],
+                tileset["tile_height"],
+            )
+            texture = ASSETS.acquire(spec)
+            self.asset_specs.append(spec)
+            self._textures[gid] = texture
+        return texture
+
+    def preload_textures(self):
+        """Loads the texture of every tile in the map and returns them."""
+        gids = set()
+        for layer in self._layers.values():
+            gids.update(layer)
+        gids.discard(0)
+        return [self.texture(gid) for gid in sorted(gids)]
+
+    def release_assets(self):
+        """Drops this map's hold on its tile textures (see AssetRegistry.collect)."""
+        for spec in self.asset_specs:
+            ASSETS.release(spec)
+        self.asset_specs = []
+        self._textures = {}
+
+    def hit_box(self, gid):
+        """Scaled hit box of a GID's tile, relative to the tile centre."""
+        points = self._hit_boxes.get(gid)
+        if points is None:
+            points = [(x * self.scaling, y * self.scaling) for x, y in self.texture(gid).hit_box_points]
+            self._hit_boxes[gid] = points
+        return points
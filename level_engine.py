@@ -0,0 +1,439 @@
+import arcade
+import random
+from functools import partial
+from animation import AnimatedSprite, Animator
+from assets import ASSETS
+from bot_ai import BotCar
+from constants import BOT_GRID_SIZE, TILE_STREAM_MARGIN_ROWS, TRAFFIC_CARS, WORLD_SPACE_SCROLLING
+from lane_grid import BROKEN, STOPPED, LaneGrid
+from level_data import LevelData
+from obstacles import ANIMATED_KINDS
+from profiler import PROFILER
+from race_grid import DecisionScheduler, RaceOrder, find_contacts, grid_slots
+from simulation import reseed_stream, restore_fields, rng_stream, snapshot_fields
+from telemetry import EVENT_OBSTACLE, EVENT_PUDDLE, EVENT_RAMP, EVENT_TRAP
+from tile_stream import TileStream
+from traffic import Traffic, traffic_rng
+
+# Layer roles a level manifest can assign, in the order collisions are resolved
+# deadly: costs the player a life and breaks (swaps to the broken texture), explodes bots
+# trap: shakes the camera and stops the trap for the player, explodes bots
+# finish: finish line, slow: puddles, boost: speed ramps, light: light overlay
+# road: drawn only, never collided with
+COLLISION_ROLES = ["deadly", "trap", "finish", "slow", "boost", "light"]
+LAYER_ROLES = ["road"] + COLLISION_ROLES
+
+
+def level_asset_names(manifest):
+    """Names of the shared assets (see assets.ASSET_CATALOG) a level uses besides its tiles."""
+    names = ["broken_texture", "bot_sheet"]
+    names += [ANIMATED_KINDS[kind][2] for kind in manifest.get("animated", {}).values()]
+    return names
+
+
+def prepare_level(manifest):
+    """Reads a level's map and compiles its lane grids.
+
+    This is the part of loading a level that needs no GL context, so it can run on a
+    worker thread (see level_loader.py). Returns a dict with the LevelData and the
+    (role, layer) list in draw order. The lane grids hold the state of one race, so a
+    prepared level is used by a single LevelEngine.
+    """
+    map_path = manifest["map"]
+    # Rows are parsed as they are needed
+    level_data = LevelData(map_path, manifest["scaling"])
+
+    # Describe the layers in draw order; layers missing from the map stay empty
+    animated = manifest.get("animated", {})
+    layers = []
+    for name, role in manifest["layers"].items():
+        if role not in LAYER_ROLES:
+            raise ValueError(f"Unknown role '{role}' for layer '{name}' in {map_path}")
+        layer = {"name": name, "grid": None, "replace": None, "overlay": None}
+        if name in animated:
+            factory, mode, sheet = ANIMATED_KINDS[animated[name]]
+            layer[mode] = factory
+
+        # Collidable layers are compiled into a lane grid so a collision check
+        # only visits the cells under the car
+        if role != "road":
+            hit_box = None
+            if layer["replace"]:
+                # Animated sprites bring their own hit box
+                prototype = layer["replace"](arcade.Sprite(center_x=0, center_y=0))
+                hit_box = prototype.get_adjusted_hit_box()
+            layer["grid"] = LaneGrid(level_data, name, hit_box)
+        layers.append((role, layer))
+
+    return {"manifest": manifest, "level_data": level_data, "layers": layers}
+
+
+class LevelEngine:
+    """Runs any level described by a manifest (see LEVEL_MANIFESTS in constants.py).
+
+    update() is one fixed simulation step. Given the same seed and the same player
+    input every step, a race plays out exactly the same way.
+
+    restore() puts the level back to the start line in place (retry): the race state
+    lives in a few scalars, one state byte per lane grid cell and the bots, so nothing
+    is loaded or rebuilt.
+    """
+
+    # True for EndlessEngine, which has no finish line (track_end_y is None)
+    endless = False
+
+    # Scalars that change during a race (see snapshot/restore)
+    STATE_FIELDS = (
+        "puddle_timer", "speed_ramp_timer", "view_bottom", "scrolled_y", "shake_time",
+        "hit_wall_shake_time", "hit_wall_shake_offset_x", "hit_wall_shake_offset_y", "in_light",
+    )
+
+    def __init__(self, car, screen_width, screen_height, manifest, seed=None, prepared=None, traffic=None, bots=None):
+        self._init_race(car, screen_width, screen_height, manifest, seed)
+
+        # bots racing bots (BOT_GRID_SIZE when None), drawing from the streams "bot0",
+        # "bot1", ... of the race seed. Presets go down from the level's: bot n drives
+        # preset difficulty - n % difficulty
+        # Lane centers: [115, 205, 295, 385]
+        # Player spawns at lane 295, the first bot at lane 115 (outer left), the rest behind
+        if bots is None:
+            bots = BOT_GRID_SIZE
+        difficulty = manifest["bot_difficulty"]
+        for number, (bot_x, offset_y) in zip(range(bots), grid_slots()):
+            bot_y = car.center_y - 20 + offset_y  # Start side-by-side but slightly behind
+            bot = BotCar(bot_x, bot_y, level_difficulty=difficulty - number % difficulty, car_target=car,
+                         rng=rng_stream(self.seed, f"bot{number}"), scheduler=self.scheduler)
+            self.bot_list.append(bot)
+        assert not self.bot_list or car.center_x != self.bot_list[0].center_x, \
+            "Player and bot must spawn in different lanes"
+        self.race_order = RaceOrder([car] + list(self.bot_list))
+
+        # Map data and lane grids, unless a loader prepared them already
+        if prepared is None:
+            prepared = prepare_level(manifest)
+        self.level_data = prepared["level_data"]
+        self.layers = prepared["layers"]        # (role, layer) in draw order, layer as used by TileStream
+
+        # Track boundaries for progress calculation (vertical/y-axis)
+        # Track starts at y=0 and ends at the top of the map
+        self.track_start_y = 0
+        self.track_end_y = self.level_data.track_length
+
+        # Collidable layers sorted so effects apply in a fixed order
+        self.collision_layers = sorted(
+            [(role, index, layer["grid"]) for index, (role, layer) in enumerate(self.layers) if role != "road"],
+            key=lambda item: COLLISION_ROLES.index(item[0])
+        )
+
+        # Sprites only exist for the rows around the view
+        self.tiles = TileStream(
+            self.level_data,
+            [layer for role, layer in self.layers],
+            screen_height,
+            self.broken_texture,
+            TILE_STREAM_MARGIN_ROWS
+        )
+
+        # Pass obstacles and context to bot
+        for bot in self.bot_list:
+            bot.set_context(
+                obstacles=self.grids_with_role("deadly", "trap"),
+                puddles=self.grids_with_role("slow"),
+                ramps=self.grids_with_role("boost")
+            )
+
+        # Ambient traffic, traffic cars (TRAFFIC_CARS when None)
+        if traffic is None:
+            traffic = TRAFFIC_CARS
+        self.traffic = None
+        if traffic:
+            self.traffic = Traffic(traffic, self.level_data, self.grids_with_role("deadly", "trap"),
+                                   self.track_end_y, screen_height, traffic_rng(self.seed))
+            # Racers the traffic bumps into, with what a bump does to them
+            self.traffic_racers = [(self.car, self._traffic_hit_car)]
+            self.traffic_racers += [(bot, partial(self._traffic_hit_bot, bot)) for bot in self.bot_list]
+
+        # State at the start line, restored for a retry
+        self.initial_state = self.snapshot()
+
+    def _init_race(self, car, screen_width, screen_height, manifest, seed):
+        # Setup shared with EndlessEngine: everything but the track, bots and traffic
+        self.car = car
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.manifest = manifest
+        # Race seed, picked at random when not given so any race can be replayed
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        # Draw-time effects only, never used by the simulation
+        self.effects_rng = random.Random()
+
+        self.puddle_timer = 10
+        self.speed_ramp_timer = 5
+        self.view_bottom = 0
+        # How far the layers have been moved down (legacy scrolling only), used by the lane grids
+        self.scrolled_y = 0
+        # World-space mode: layers stay fixed and the game camera follows view_bottom
+        self.world_space = WORLD_SPACE_SCROLLING
+        self.map_path = manifest["map"]
+        # Shared assets this level keeps loaded until release_assets()
+        self.asset_names = level_asset_names(manifest)
+        for name in self.asset_names:
+            ASSETS.acquire(name)
+        self.broken_texture = ASSETS.get("broken_texture")
+
+        # Camera shake for obstacle hits
+        self.shake_time = 0
+        # Shake for hit_wall_rect (exposed for game.py to use)
+        self.hit_wall_shake_time = 0
+        # Current shake offsets (exposed for game.py to use)
+        self.hit_wall_shake_offset_x = 0
+        self.hit_wall_shake_offset_y = 0
+
+        # Light overlay state (exposed for game.py to use)
+        self.in_light = False
+        # Telemetry event bits of the player's collisions in the last step
+        self.player_events = 0
+        # Clock and texture updates of the animated obstacles
+        self.animator = Animator()
+
+        self.bot_list = arcade.SpriteList()
+        # The bots' AI decisions share one budget per step
+        self.scheduler = DecisionScheduler()
+
+    def snapshot(self):
+        """Compact copy of the race state of the level (not of the player car)."""
+        return {
+            "fields": snapshot_fields(self, self.STATE_FIELDS),
+            "cells": [bytes(grid.state) for role, index, grid in self.collision_layers],
+            "bots": [bot.snapshot() for bot in self.bot_list],
+            "bot_rngs": [bot.rng.getstate() for bot in self.bot_list],
+            "traffic": self.traffic.snapshot() if self.traffic is not None else None,
+            # Bots waiting for an AI decision and the running order, as indices
+            "waiting": [self.bot_list.index(bot) for bot in self.scheduler.waiting],
+            "order": [self.race_order.racers.index(racer) for racer in self.race_order.order],
+        }
+
+    def restore(self, state=None, seed=None):
+        """Puts the level back to a snapshot, by default the start line.
+
+        At the start line the bots' random streams restart from seed (a new random
+        seed when None) and the traffic is laid out again from it, as in a new race;
+        a mid-race snapshot brings back its own streams and traffic. The sprites
+        around the view come back with their animations from the start.
+        """
+        if state is None:
+            state = self.initial_state
+        restore_fields(self, self.STATE_FIELDS, state["fields"])
+        for (role, index, grid), cells in zip(self.collision_layers, state["cells"]):
+            grid.state[:] = cells
+            grid.scrolled_y = self.scrolled_y
+        for bot, bot_state in zip(self.bot_list, state["bots"]):
+            bot.restore(bot_state)
+        self.scheduler.reset([self.bot_list[index] for index in state["waiting"]])
+        self.race_order.reset([self.race_order.racers[index] for index in state["order"]])
+
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        if state is self.initial_state:
+            # Start line: the streams and traffic layout come from the race seed, as in a new race
+            for number, bot in enumerate(self.bot_list):
+                reseed_stream(bot.rng, self.seed, f"bot{number}")
+            if self.traffic is not None:
+                self.traffic.reset(traffic_rng(self.seed))
+        else:
+            for bot, rng_state in zip(self.bot_list, state["bot_rngs"]):
+                bot.rng.setstate(rng_state)
+            if self.traffic is not None:
+                self.traffic.restore(state["traffic"])
+
+        self.tiles.reset(self.view_bottom, self.scrolled_y)
+        self.animator.reset()
+
+    def release_assets(self):
+        """Hands the level's shared assets back to the registry once it is replaced."""
+        for name in self.asset_names:
+            ASSETS.release(name)
+        self.asset_names = []
+        self.level_data.release_assets()
+
+    def grids_with_role(self, *roles):
+        """Returns the lane grids of every layer with one of the given roles."""
+        return [grid for role, index, grid in self.collision_layers if role in roles]
+
+    @property
+    def player_position(self):
+        """The player's place in the race, 1 for the leader."""
+        return self.race_order.position(self.car)
+
+    def update(self, delta_time):
+        # Scroll background based on car speed
+        if not self.car.losing:
+            self.view_bottom += self.car.speed
+
+        # Single collision pass over every collidable layer for the player
+        with PROFILER.section("player.collisions"):
+            self._update_player_collisions(delta_time)
+        # Trigger shake when car hits wall
+        if self.car.hit_wall and self.hit_wall_shake_time <= 0:
+            self.hit_wall_shake_time = 0.3
+
+        self.scheduler.begin_step()
+        for bot in self.bot_list:
+            with PROFILER.section("bot.update"):
+                bot.update(delta_time)
+            if not bot.exploding and not bot.race_finished:
+                with PROFILER.section("bot.collisions"):
+                    self._update_bot_collisions(bot)
+        PROFILER.count("sprites_moved", len(self.bot_list))
+        if len(self.bot_list) > 1:
+            with PROFILER.section("bot.contacts"):
+                racing = [bot for bot in self.bot_list if bot.active and not bot.exploding]
+                for bot, other in find_contacts(racing):
+                    bot.bump(other)
+                    other.bump(bot)
+
+        if self.traffic is not None:
+            self.traffic.update(delta_time, self.view_bottom, self.scrolled_y, self.traffic_racers)
+
+        # Scroll all layers to create forward movement illusion
+        with PROFILER.section("level.scroll"):
+            if not self.car.losing:
+                if self.world_space:
+                    # Move the car up through the fixed layers instead (camera follows)
+                    self.car.center_y += self.car.speed
+                else:
+                    self.tiles.scroll(self.car.speed)
+                    for bot in self.bot_list:
+                        if not bot.race_finished:
+                            bot.center_y -= self.car.speed
+                    self.scrolled_y += self.car.speed
+                    for role, layer_index, grid in self.collision_layers:
+                        grid.scrolled_y = self.scrolled_y
+
+            # Stream tile rows in and out around the view
+            self.tiles.update(self.view_bottom)
+
+        with PROFILER.section("race.positions"):
+            self.race_order.update(self._race_progress)
+
+        # Update camera shake timer
+        if self.shake_time > 0:
+            self.shake_time -= delta_time
+        # Update hit wall shake timer
+        if self.hit_wall_shake_time > 0:
+            self.hit_wall_shake_time -= delta_time
+
+        # Update animated obstacles
+        with PROFILER.section("animation"):
+            self.animator.advance(delta_time)
+            view_bottom = self.view_bottom if self.world_space else 0
+            self.animator.update(self.tiles.animated_lists, view_bottom, view_bottom + self.screen_height,
+                                 self._player_nearby)
+
+    def _update_player_collisions(self, delta_time):
+        in_light = False
+        events = 0
+        for role, layer_index, grid in self.collision_layers:
+            hits = grid.check_for_collision(self.car)
+            if not hits:
+                continue
+
+            if role == "deadly":
+                # Collision with obstacles: replace with broken texture
+                for index in hits:
+                    if not grid.state[index] & BROKEN:
+                        grid.state[index] |= BROKEN
+                        obstacle = self.tiles.sprite_at(layer_index, index)
+                        if obstacle is not None:
+                            obstacle.texture = self.broken_texture
+                            # Broken obstacles keep their broken texture
+                            if isinstance(obstacle, AnimatedSprite):
+                                obstacle.stop_animation()
+                        self.car.lives -= 1
+                        self.car.life_just_lost = True  # Flag for sound system
+                        events |= EVENT_OBSTACLE
+                        # Start camera shake for obstacle hit
+                        self.shake_time = 0.3
+            elif role == "trap":
+                # Trap collision (shake and stop animation)
+                for index in hits:
+                    grid.state[index] |= STOPPED
+                    events |= EVENT_TRAP
+                    trap = self.tiles.sprite_at(layer_index, index)
+                    if trap is not None:
+                        trap.stop_animation()
+                    self.shake_time = 0.3
+            elif role == "finish":
+                if self.car.center_y > grid.cell_position(hits[0])[1]:
+                    self.car.race_won = True
+                    self.car.speed = 0
+            elif role == "slow":
+                events |= EVENT_PUDDLE
+                # Puddles slow down the car
+                if self.puddle_timer > 0:
+                    self.car.speed = 1
+                    self.puddle_timer -= delta_time
+            elif role == "boost":
+                events |= EVENT_RAMP
+                # Speed ramps boost the car
+                if self.speed_ramp_timer > 0:
+                    self.car.speed += 4
+                    self.speed_ramp_timer -= delta_time
+            elif role == "light":
+                in_light = True
+        self.in_light = in_light
+        self.player_events = events
+
+    def _update_bot_collisions(self, bot):
+        for role, layer_index, grid in self.collision_layers:
+            if role not in ("deadly", "trap", "finish"):
+                continue
+            hits = grid.check_for_collision(bot)
+            if not hits:
+                continue
+
+            if role == "deadly":
+                for index in hits:
+                    if not grid.state[index] & BROKEN:
+                        bot.explode()
+            elif role == "trap":
+                bot.explode()
+            elif role == "finish":
+                if bot.center_y > grid.cell_position(hits[0])[1] and not bot.race_finished:
+                    bot.race_finished = True
+                    self.car.race_lost = True
+                    self.car.losing = True
+
+    def _race_progress(self, racer):
+        # How far up the track a racer is; exploded bots are out of the race
+        if racer is not self.car and racer.exploding:
+            return float("-inf")
+        return racer.center_y + self.scrolled_y
+
+    def _traffic_hit_car(self):
+        # Same drag as contact with a bot
+        self.car.speed *= 0.9
+
+    def _traffic_hit_bot(self, bot):
+        bot.current_speed *= 0.9
+
+    def _player_nearby(self, sprite):
+        # Fire dispensers only start once the player gets close
+        return abs(sprite.center_x - self.car.center_x) + abs(sprite.center_y - self.car.center_y) < 300
+
+    def draw(self):
+        # Calculate shake offsets for hit_wall_rect
+        self.hit_wall_shake_offset_x = 0
+        self.hit_wall_shake_offset_y = 0
+        if self.hit_wall_shake_time > 0:
+            self.hit_wall_shake_offset_x = self.effects_rng.uniform(-2, 2)
+            self.hit_wall_shake_offset_y = self.effects_rng.uniform(-2, 2)
+
+        # Draw the layers in manifest order, then overlays and bots on top
+        self.tiles.draw()
+        if self.traffic is not None:
+            with PROFILER.section("draw.traffic"):
+                self.traffic.draw(self.scrolled_y)
+            PROFILER.count("draw_calls")
+        with PROFILER.section("draw.bots"):
+            self.bot_list.draw()
+        PROFILER.count("draw_calls")
@@ -0,0 +1,123 @@
+import sys
+import threading
+import traceback
+import arcade
+from assets import ASSETS
+
+# Textures uploaded to the GL texture atlas per frame while a prepared level is finished
+ATLAS_UPLOADS_PER_FRAME = 8
+
+
+def discard(prepared):
+    """Hands back the tile textures a prepared level holds when it will never be used."""
+    if prepared is not None:
+        prepared["level_data"].release_assets()
+
+
+class LevelLoader:
+    """Prepares the level the player is likely to start next, before it is started.
+
+    request(index) reads the map, compiles the lane grids and decodes every texture
+    of the level on a worker thread. Only the GL work is left for the main thread:
+    update(), called once per frame, adds the textures to the texture atlas a few at
+    a time so no single frame stalls. take(index) then hands the prepared level to
+    LevelEngine(prepared=...), which only has to create the sprites around the start.
+
+    A request for another level replaces the current one; the old worker still runs
+    to the end, but its result is dropped. A dropped level releases the tile textures
+    it holds, so AssetRegistry.collect() can evict them. A level that fails to prepare
+    is reported on stderr and its exception is raised again by take().
+    """
+
+    def __init__(self, manifests):
+        self.manifests = manifests
+        self.index = None
+        self._lock = threading.Lock()
+        self._worker = None
+        self._prepared = None
+        self._error = None
+        self._pending_textures = []
+
+    def request(self, index):
+        """Starts preparing manifests[index], unless it is already prepared or in progress."""
+        with self._lock:
+            if index == self.index:
+                return
+            dropped = self._prepared
+            self.index = index
+            self._prepared = None
+            self._error = None
+            self._pending_textures = []
+            self._worker = threading.Thread(target=self._prepare, args=(index,), daemon=True)
+            worker = self._worker
+        discard(dropped)
+        worker.start()
+
+    def _prepare(self, index):
+        manifest = self.manifests[index]
+        error = None
+        try:
+            # Imported here so the engine modules load on this thread, not at startup
+            from level_engine import level_asset_names, prepare_level
+            prepared = prepare_level(manifest)
+            textures = prepared["level_data"].preload_textures()
+            for name in level_asset_names(manifest):
+                asset = ASSETS.get(name)
+                textures += asset if isinstance(asset, list) else [asset]
+        except Exception as exception:
+            print(f"Preparing level {index + 1} failed:", file=sys.stderr)
+            traceback.print_exc()
+            prepared = None
+            textures = []
+            error = exception
+
+        with self._lock:
+            current = self._worker is threading.current_thread()
+            if current:
+                self._prepared = prepared
+                self._error = error
+                self._pending_textures = textures
+        if not current:
+            # Replaced while it ran: nobody will take this level
+            discard(prepared)
+
+    @property
+    def ready(self):
+        """True once the requested level is prepared and all its textures are on the GPU."""
+        return self._prepared is not None and not self._pending_textures
+
+    def update(self):
+        """Uploads the next few textures of a prepared level to the texture atlas."""
+        with self._lock:
+            batch = self._pending_textures[:ATLAS_UPLOADS_PER_FRAME]
+            self._pending_textures = self._pending_textures[ATLAS_UPLOADS_PER_FRAME:]
+        if not batch:
+            return
+        atlas = arcade.get_window().ctx.default_atlas
+        for texture in batch:
+            if not atlas.has_texture(texture):
+                atlas.add(texture)
+
+    def take(self, index):
+        """Returns the prepared level for index and forgets it, or None if it is not ready.
+
+        Raises the exception of a failed preparation of index. Textures still waiting
+        for the atlas are added by the sprite lists on first draw.
+        """
+        with self._lock:
+            if index != self.index:
+                return None
+            error = self._error
+            if error is not None:
+                self.index = None
+                self._worker = None
+                self._error = None
+                raise error
+            if self._prepared is None:
+                return None
+            prepared = self._prepared
+            self.index = None
+            self._worker = None
+            self._prepared = None
+            self._pending_textures = []
+            return prepared
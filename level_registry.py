@@ -0,0 +1,43 @@
+import importlib
+import threading
+from functools import partial
+
+
+class LazyLevel:
+    """A level class that imports its module the first time it is used.
+
+    Stands in for partial(EngineClass, manifest=manifest): calling it builds the level
+    the same way, level_class(car, width, height, ...). The engine module (and with it
+    the bots, traffic and obstacle modules) is only imported on the first call or
+    load(), so starting the game does not pay for levels nobody has played yet.
+    """
+
+    # Imports can happen on the level loader's worker thread as well as the main thread
+    _lock = threading.Lock()
+
+    def __init__(self, name, module_name, class_name, manifest):
+        self.name = name
+        self.module_name = module_name
+        self.class_name = class_name
+        self.manifest = manifest
+        self._factory = None
+
+    @property
+    def loaded(self):
+        return self._factory is not None
+
+    def load(self):
+        """Imports the engine module if needed; returns the level factory."""
+        if self._factory is None:
+            with self._lock:
+                if self._factory is None:
+                    module = importlib.import_module(self.module_name)
+                    self._factory = partial(getattr(module, self.class_name), manifest=self.manifest)
+        return self._factory
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyLevel {self.name}: {self.module_name}.{self.class_name}, {state}>"
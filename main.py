@@ -1,15 +1,33 @@
+import argparse
 import arcade
 from game import MyGame
 from constants import SCREEN_HEIGHT, SCREEN_WIDTH
+from replay import InputReplay
 
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Blind Circuit")
+    parser.add_argument("--replay", metavar="FILE", help="Play back a recorded race (replays/*.bcr)")
+    args = parser.parse_args()
+
     # Only window creation and initial setup happens here
     # All game logic is contained within the MyGame class in game.py
     window = MyGame(SCREEN_WIDTH, SCREEN_HEIGHT)
-    window.setup()
-    arcade.run()
+    # The window opens on the loading screen; the game starts once the assets are in
+    if args.replay:
+        replay = InputReplay.load(args.replay)
+        window.when_loaded(lambda: window.play_replay(replay))
+    else:
+        window.when_loaded(window.setup)
+    try:
+        arcade.run()
+    except Exception:
+        # Keep the moments before the crash for the bug report
+        path = window.dump_telemetry()
+        if path:
+            print(f"Telemetry of the last seconds written to {path}")
+        raise
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,93 @@
+import arcade
+from constants import ENDLESS_LEVEL_INDEX
+from profiler import PROFILER
+
+# Level select buttons: (level index, label, x and y offset from the window centre)
+# Drawing and hit-testing both read this table
+LEVEL_BUTTONS = [
+    (0, "Level 1", -80, -100),
+    (1, "Level 2", 80, -100),
+    (2, "Level 3", -80, -180),
+    (3, "Level 4", 80, -180),
+    (4, "Level 5", -80, -260),
+    (5, "Level 6", 80, -260),
+    (ENDLESS_LEVEL_INDEX, "Endless", 0, -340),
+]
+BUTTON_WIDTH = 120
+BUTTON_HEIGHT = 50
+BUTTON_FONT_SIZE = 20
+
+
+class LevelMenu:
+    """The level select buttons of the start screen.
+
+    The rectangles of all buttons live in one ShapeElementList and the labels in
+    persistent text objects, so the menu is one draw call for the geometry plus one
+    per label. The shapes are only rebuilt when the pressed button or the window size
+    changes.
+    """
+
+    def __init__(self, buttons, font_name):
+        self.buttons = buttons
+        self.font_name = font_name
+        # Level index of the button shown pressed, or None
+        self.pressed = None
+        self._shapes = None
+        self._shapes_key = None
+        self._labels = None
+        self._labels_key = None
+
+    def button_center(self, button, width, height):
+        level_index, label, dx, dy = button
+        return width // 2 + dx, height // 2 + dy
+
+    def button_at(self, x, y, width, height):
+        """Level index of the button under (x, y), or None."""
+        for button in self.buttons:
+            center_x, center_y = self.button_center(button, width, height)
+            if (center_x - BUTTON_WIDTH // 2 <= x <= center_x + BUTTON_WIDTH // 2 and
+                    center_y - BUTTON_HEIGHT // 2 <= y <= center_y + BUTTON_HEIGHT // 2):
+                return button[0]
+        return None
+
+    def _build_shapes(self, width, height):
+        shapes = arcade.ShapeElementList()
+        for button in self.buttons:
+            center_x, center_y = self.button_center(button, width, height)
+            # Change button color based on press state
+            color = arcade.color.DARK_GRAY if button[0] == self.pressed else arcade.color.GRAY
+            shapes.append(arcade.create_rectangle_filled(center_x, center_y, BUTTON_WIDTH, BUTTON_HEIGHT, color))
+            shapes.append(arcade.create_rectangle_outline(
+                center_x, center_y, BUTTON_WIDTH, BUTTON_HEIGHT, arcade.color.WHITE, 2
+            ))
+        return shapes
+
+    def _build_labels(self, width, height):
+        labels = []
+        for button in self.buttons:
+            center_x, center_y = self.button_center(button, width, height)
+            labels.append(arcade.Text(
+                button[1],
+                center_x,
+                center_y,
+                arcade.color.WHITE,
+                BUTTON_FONT_SIZE,
+                font_name=self.font_name,
+                anchor_x="center",
+                anchor_y="center",
+            ))
+        return labels
+
+    def draw(self, width, height):
+        shapes_key = (width, height, self.pressed)
+        if shapes_key != self._shapes_key:
+            self._shapes = self._build_shapes(width, height)
+            self._shapes_key = shapes_key
+        if (width, height) != self._labels_key:
+            self._labels = self._build_labels(width, height)
+            self._labels_key = (width, height)
+
+        self._shapes.draw()
+        for label in self._labels:
+            label.draw()
+        PROFILER.count("draw_calls", 1 + len(self._labels))
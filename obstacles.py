@@ -0,0 +1,88 @@
+from animation import AnimatedSprite
+
+
+class FireSprite(AnimatedSprite):
+    def __init__(self, parent_sprite):
+        super().__init__("fire")
+        self.parent_sprite = parent_sprite
+
+        # Set initial position
+        self.center_x = self.parent_sprite.center_x
+        self.center_y = self.parent_sprite.center_y + 10  # Vertical offset to be on top
+
+    def respawn(self, parent_sprite):
+        """Reuses a pooled fire on another tile, animation from the start."""
+        self.parent_sprite = parent_sprite
+        self.reset_animation()
+        self.update()
+
+    def update(self):
+        # Follow the parent sprite
+        self.center_x = self.parent_sprite.center_x
+        self.center_y = self.parent_sprite.center_y + 10
+
+
+class FireDispenser(AnimatedSprite):
+    """Fire dispenser that animates when the player gets close."""
+
+    def __init__(self, x, y):
+        # Shared spritesheet (5 horizontal frames, each 64x64)
+        super().__init__("fire_dispenser")
+        self.center_x = x
+        self.center_y = y
+        self.hit_box = [(-32, -32), (32, -32), (32, 32), (-32, 32)]
+
+    def respawn(self, tile):
+        """Reuses a pooled dispenser in place of another tile, idle again."""
+        self.center_x = tile.center_x
+        self.center_y = tile.center_y
+        self.reset_animation()
+
+
+class Drone(AnimatedSprite):
+    def __init__(self, x, y):
+        # Frames are shared by every drone (2 frames, 64x64)
+        super().__init__("drone")
+        self.center_x = x
+        self.center_y = y
+
+        # Drones is a tile layer in the TMX, so each drone replaces one loaded tile
+        # and is scaled by the caller to match the map scaling
+
+    def respawn(self, tile):
+        """Reuses a pooled drone in place of another tile, animation from the start."""
+        self.center_x = tile.center_x
+        self.center_y = tile.center_y
+        self.reset_animation()
+
+
+def make_fire(tile):
+    """Fire drawn on top of a tile (level 3 broken cars)."""
+    return FireSprite(tile)
+
+
+def make_fire_dispenser(tile):
+    """Fire dispenser replacing a tile (level 5)."""
+    dispenser = FireDispenser(tile.center_x or 0, tile.center_y or 0)
+    dispenser.scale = 2.5
+    return dispenser
+
+
+def make_drone(tile):
+    """Drone replacing a tile (level 6)."""
+    drone = Drone(tile.center_x, tile.center_y)
+    # Match the scaling of the map
+    drone.scale = 1.57
+    return drone
+
+
+# Animated sprite kinds that a level manifest can attach to a layer
+# Sprites that scroll out of view are pooled and put back with respawn(tile)
+# replace: the layer's tiles are swapped for the animated sprites
+# overlay: one animated sprite is drawn on top of every tile in the layer
+# The last item is the spritesheet the kind needs (see assets.ASSET_CATALOG)
+ANIMATED_KINDS = {
+    "fire": (make_fire, "overlay", "fire_sheet"),
+    "fire_dispenser": (make_fire_dispenser, "replace", "fire_dispenser_sheet"),
+    "drone": (make_drone, "replace", "drone_sheet"),
+}
@@ -0,0 +1,156 @@
+import csv
+import os
+import time
+from collections import deque
+from contextlib import nullcontext
+
+# Frames kept for the rolling statistics and the CSV dump (10 seconds at 60 FPS)
+PROFILE_WINDOW = 600
+
+_DISABLED = nullcontext()
+
+
+class _Section:
+    """Times one named stage; reused for every call of that stage."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        times = self.profiler._times
+        times[self.name] = times.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class FrameProfiler:
+    """Per-stage frame timings and per-frame counters.
+
+    Stages are timed with `with PROFILER.section(name):` and work is counted with
+    PROFILER.count(name, n). A stage that runs several times in a frame (one bot
+    update per bot, several simulation steps) adds up into one value for that frame.
+    Nested stages are included in the stage around them.
+
+    Frames go from begin_frame() to end_frame(). The last `window` frames are kept
+    for the rolling percentiles (stats()) and for dump_csv(). Outside a frame, and
+    while disabled, every call returns straight away, so the hooks can stay in the
+    game loop.
+    """
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.enabled = False
+        self.frames = deque(maxlen=window)
+        # Stage and counter names in the order they were first seen
+        self.stage_names = []
+        self.counter_names = []
+        self._sections = {}
+        self._times = {}
+        self._counts = {}
+        self._frame_start = None
+
+    def enable(self, enabled=True, window=None):
+        """Turns profiling on or off; history starts afresh when it is turned on.
+
+        window changes how many frames are kept.
+        """
+        if window is not None:
+            self.frames = deque(maxlen=window)
+        if enabled and not self.enabled:
+            self.frames.clear()
+        self.enabled = enabled
+        self._times = {}
+        self._counts = {}
+        self._frame_start = None
+
+    def section(self, name):
+        """Context manager timing one stage of the current frame."""
+        if self._frame_start is None:
+            return _DISABLED
+        section = self._sections.get(name)
+        if section is None:
+            section = _Section(self, name)
+            self._sections[name] = section
+        return section
+
+    def count(self, name, amount=1):
+        """Adds amount to a counter of the current frame."""
+        if self._frame_start is not None:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    def begin_frame(self):
+        if self.enabled and self._frame_start is None:
+            self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Closes the current frame and adds it to the history."""
+        if not self.enabled or self._frame_start is None:
+            return
+        frame_time = time.perf_counter() - self._frame_start
+        for name in self._times:
+            if name not in self.stage_names:
+                self.stage_names.append(name)
+        for name in self._counts:
+            if name not in self.counter_names:
+                self.counter_names.append(name)
+        self.frames.append((frame_time, self._times, self._counts))
+        self._times = {}
+        self._counts = {}
+        self._frame_start = None
+
+    def stats(self):
+        """Rolling statistics over the frames in the window.
+
+        Returns a list of (name, p50, p95, p99, worst) with times in milliseconds:
+        "frame" first, then every stage. Frames in which a stage did not run count
+        as 0 for it.
+        """
+        if not self.frames:
+            return []
+        rows = [("frame", [frame[0] for frame in self.frames])]
+        for name in self.stage_names:
+            rows.append((name, [frame[1].get(name, 0.0) for frame in self.frames]))
+        return [(name,) + _percentiles([value * 1000 for value in values]) for name, values in rows]
+
+    def counter_stats(self):
+        """(name, p50, worst) of every counter over the frames in the window."""
+        result = []
+        for name in self.counter_names:
+            values = sorted(frame[2].get(name, 0) for frame in self.frames)
+            result.append((name, values[len(values) // 2], values[-1]))
+        return result
+
+    def dump_csv(self, path):
+        """Writes one row per frame in the window: times in ms, then the counters."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame_ms"] + [f"{name}_ms" for name in self.stage_names] + self.counter_names)
+            for frame_time, times, counts in self.frames:
+                writer.writerow(
+                    [f"{frame_time * 1000:.4f}"]
+                    + [f"{times.get(name, 0.0) * 1000:.4f}" for name in self.stage_names]
+                    + [counts.get(name, 0) for name in self.counter_names]
+                )
+        return path
+
+
+def _percentiles(values):
+    # (p50, p95, p99, worst) by nearest rank
+    values = sorted(values)
+    last = len(values) - 1
+    return (
+        values[round(last * 0.50)],
+        values[round(last * 0.95)],
+        values[round(last * 0.99)],
+        values[last],
+    )
+
+
+PROFILER = FrameProfiler()
@@ -0,0 +1,137 @@
+from collections import deque
+import arcade
+from constants import AI_DECISIONS_PER_STEP
+from profiler import PROFILER
+
+# Start grid: the first bot beside the player, then rows of three behind them
+GRID_FRONT_X = 115
+GRID_ROW_X = (115, 250, 385)
+GRID_ROW_SPACING = 250
+
+
+def grid_slots():
+    """(x, y offset from the player's row) of every start slot, front to back."""
+    yield GRID_FRONT_X, 0
+    row = 1
+    while True:
+        for x in GRID_ROW_X:
+            yield x, -GRID_ROW_SPACING * row
+        row += 1
+
+
+class DecisionScheduler:
+    """Spreads the bots' AI decisions over simulation steps.
+
+    A bot whose decision is due asks grant(); at most `budget` decisions run per step.
+    A bot that is refused waits in line and is served first on a later step, so with
+    many bots the decisions of one step stay bounded and every bot still gets its
+    turn. The budget is a number of decisions rather than a time, so a race plays
+    out the same way on any machine (replays, ghosts).
+    """
+
+    def __init__(self, budget=AI_DECISIONS_PER_STEP):
+        self.budget = budget
+        # Bots refused on an earlier step, longest waiting first
+        self.waiting = deque()
+        self._waiting = set()
+        # Bots served from the line this step, and decisions left for the others
+        self._granted = set()
+        self._left = budget
+
+    def reset(self, waiting=()):
+        self.waiting = deque(waiting)
+        self._waiting = set(self.waiting)
+        self._granted = set()
+        self._left = self.budget
+
+    def begin_step(self):
+        """Hands this step's decisions to the bots waiting longest first."""
+        self._granted.clear()
+        while self.waiting and len(self._granted) < self.budget:
+            bot = self.waiting.popleft()
+            self._waiting.discard(bot)
+            self._granted.add(bot)
+        self._left = self.budget - len(self._granted)
+
+    def grant(self, bot):
+        """True when bot may make its decision now; otherwise it is put in line."""
+        if bot in self._granted:
+            self._granted.discard(bot)
+            PROFILER.count("ai_decisions")
+            return True
+        if bot in self._waiting:
+            return False
+        if self._left > 0:
+            self._left -= 1
+            PROFILER.count("ai_decisions")
+            return True
+        self.waiting.append(bot)
+        self._waiting.add(bot)
+        PROFILER.count("ai_deferred")
+        return False
+
+
+def find_contacts(bots):
+    """Pairs of bots whose hit boxes touch, found by sort and sweep along the track.
+
+    The bots are sorted by the bottom of their hit box; sweeping up the track, each
+    bot is only tested against the bots whose boxes it still overlaps in y, and only
+    those whose bounding boxes also overlap in x get the exact test of their hit box
+    polygons. Bots side by side or nose to tail are the only pairs ever looked at,
+    instead of every pair.
+    """
+    boxes = []
+    for bot in bots:
+        hit_box = bot.get_adjusted_hit_box()
+        xs = [point[0] for point in hit_box]
+        ys = [point[1] for point in hit_box]
+        boxes.append((min(ys), max(ys), min(xs), max(xs), bot, hit_box))
+    boxes.sort(key=lambda box: box[0])
+
+    pairs = []
+    active = []
+    for box in boxes:
+        bottom, top, left, right, bot, hit_box = box
+        active = [other for other in active if other[1] > bottom]
+        for other in active:
+            if other[2] < right and other[3] > left and arcade.are_polygons_intersecting(other[5], hit_box):
+                pairs.append((other[4], bot))
+        active.append(box)
+    return pairs
+
+
+class RaceOrder:
+    """Running order of the racers (the player and the bots), kept up to date each step.
+
+    The order changes by a swap or two per step at most, so update() re-sorts it
+    with an insertion sort over the previous order, which is a single pass when
+    nothing overtook. Racers out of the race (exploded bots) drop to the back.
+    """
+
+    def __init__(self, racers):
+        self.racers = list(racers)
+        self.order = list(self.racers)
+        self._positions = {racer: number for number, racer in enumerate(self.order, 1)}
+
+    def reset(self, order=None):
+        self.order = list(order if order is not None else self.racers)
+        self._positions = {racer: number for number, racer in enumerate(self.order, 1)}
+
+    def update(self, progress):
+        """Re-sorts the racers, best first; progress(racer) is how far along it is."""
+        order = self.order
+        keys = [progress(racer) for racer in order]
+        for i in range(1, len(order)):
+            racer, key = order[i], keys[i]
+            j = i
+            while j > 0 and keys[j - 1] < key:
+                order[j], keys[j] = order[j - 1], keys[j - 1]
+                self._positions[order[j]] = j + 1
+                j -= 1
+            if j != i:
+                order[j], keys[j] = racer, key
+                self._positions[racer] = j + 1
+
+    def position(self, racer):
+        """1 for the leader."""
+        return self._positions[racer]
@@ -0,0 +1,117 @@
+import os
+import struct
+from array import array
+from bisect import bisect_right
+
+# Recorded input file:
+#   header: magic, format version, level number, race seed, ticks, number of runs
+#   runs: (key mask, ticks) pairs, one per stretch of ticks with the same keys held
+MAGIC = b"BCRP"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHQII")
+_RUN = struct.Struct("<BH")
+# Longest run a single entry holds; longer stretches are split
+_MAX_RUN = 0xFFFF
+
+# Key mask bits, one per PlayerCar input flag
+KEY_LEFT = 1
+KEY_RIGHT = 2
+KEY_UP = 4
+KEY_DOWN = 8
+
+
+def input_mask(car):
+    """The car's input flags as a key mask."""
+    return (
+        (KEY_LEFT if car.left_pressed else 0)
+        | (KEY_RIGHT if car.right_pressed else 0)
+        | (KEY_UP if car.up_pressed else 0)
+        | (KEY_DOWN if car.down_pressed else 0)
+    )
+
+
+def apply_input(car, mask):
+    """Sets the car's input flags from a key mask."""
+    car.left_pressed = bool(mask & KEY_LEFT)
+    car.right_pressed = bool(mask & KEY_RIGHT)
+    car.up_pressed = bool(mask & KEY_UP)
+    car.down_pressed = bool(mask & KEY_DOWN)
+
+
+class InputRecorder:
+    """Records the keys held at every simulation step of one race.
+
+    Together with the level and the race seed, that is all it takes to play the race
+    again exactly (see InputReplay). Keys change rarely compared to the step rate, so
+    the ticks are stored as runs of the same mask: a whole race is a few KB.
+    """
+
+    def __init__(self, level, seed):
+        self.level = level
+        self.seed = seed
+        self.ticks = 0
+        self.masks = array("B")
+        self.counts = array("H")
+
+    def record(self, mask):
+        """Adds one simulation step with mask held."""
+        self.ticks += 1
+        if self.masks and self.masks[-1] == mask and self.counts[-1] < _MAX_RUN:
+            self.counts[-1] += 1
+        else:
+            self.masks.append(mask)
+            self.counts.append(1)
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, self.level, self.seed, self.ticks, len(self.masks)))
+            for mask, count in zip(self.masks, self.counts):
+                file.write(_RUN.pack(mask, count))
+        return path
+
+
+class InputReplay:
+    """Recorded input of one race, played back by tick (see InputRecorder)."""
+
+    def __init__(self, level, seed, masks, counts):
+        self.level = level
+        self.seed = seed
+        self.masks = masks
+        # Tick at which each run ends, for the lookup by tick
+        self.ends = array("I")
+        total = 0
+        for count in counts:
+            total += count
+            self.ends.append(total)
+        self.ticks = total
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, level, seed, ticks, runs = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a recorded race")
+        if version != VERSION:
+            raise ValueError(f"{path} was recorded with format version {version}, expected {VERSION}")
+        masks = array("B")
+        counts = []
+        for mask, count in _RUN.iter_unpack(data[_HEADER.size:_HEADER.size + runs * _RUN.size]):
+            masks.append(mask)
+            counts.append(count)
+        replay = cls(level, seed, masks, counts)
+        if replay.ticks != ticks:
+            raise ValueError(f"{path} is truncated")
+        return replay
+
+    def mask_at(self, tick):
+        """Key mask held at a simulation step (0-based); no keys after the recording ends."""
+        run = bisect_right(self.ends, tick)
+        return self.masks[run] if run < len(self.masks) else 0
+
+    def script(self, tick, car, level):
+        """Input script for headless.run_race playing the recording back."""
+        apply_input(car, self.mask_at(tick))
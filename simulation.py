@@ -0,0 +1,69 @@
+import random
+
+
+def rng_stream(seed, name):
+    """Random generator for one entity of a race.
+
+    Every entity draws from its own stream, derived from the race seed and the entity
+    name, so one entity's draws never shift another's. String seeds are hashed the
+    same way on every platform and Python build.
+    """
+    return random.Random(f"{seed}/{name}")
+
+
+def reseed_stream(rng, seed, name):
+    """Restarts a generator from rng_stream(seed, name) in place."""
+    rng.seed(f"{seed}/{name}")
+
+
+def snapshot_fields(obj, names):
+    """Values of the named attributes, in order (see restore_fields)."""
+    return tuple(getattr(obj, name) for name in names)
+
+
+def restore_fields(obj, names, values):
+    """Sets the named attributes back to snapshot values.
+
+    Sprite properties (center_x, texture, ...) go through their setters, so the sprite
+    lists holding the sprite pick up the change.
+    """
+    for name, value in zip(names, values):
+        setattr(obj, name, value)
+
+
+class FixedStepClock:
+    """Turns variable frame times into a whole number of fixed simulation steps.
+
+    Frame time is added to an accumulator and consumed one step at a time, so the
+    simulation runs the same steps whatever the refresh rate. After a long stall at
+    most max_steps steps run and the rest of the backlog is dropped, which slows the
+    game down instead of freezing it while it catches up.
+    """
+
+    def __init__(self, step, max_steps):
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        # Steps run since the last reset
+        self.ticks = 0
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.ticks = 0
+
+    def advance(self, delta_time):
+        """Returns how many simulation steps to run for a frame of delta_time."""
+        self.accumulator += delta_time
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        self.ticks += steps
+        return steps
+
+    @property
+    def alpha(self):
+        """How far the frame is into the next step (0.0 - 1.0), for interpolation."""
+        return self.accumulator / self.step
@@ -0,0 +1,113 @@
+import os
+import numpy as np
+from constants import SIM_DELTA_TIME, TELEMETRY_SECONDS
+
+# Event bits of the events column, set for every tick the event lasts
+EVENT_WALL = 1        # Scraping a wall
+EVENT_OBSTACLE = 2    # Hit an obstacle (the player loses a life)
+EVENT_PUDDLE = 4
+EVENT_RAMP = 8
+EVENT_TRAP = 16
+EVENT_EXPLODED = 32   # Out of the race
+EVENT_FINISHED = 64
+
+# Columns per racer; y is view_bottom for the player and the track position for bots
+PLAYER_COLUMNS = ("x", "view_bottom", "speed", "speed_row", "lives", "events")
+BOT_COLUMNS = ("x", "y", "speed", "speed_row", "events")
+
+
+class Telemetry:
+    """Per-tick state of the player and every bot, kept in preallocated ring buffers.
+
+    record() writes one row per racer into NumPy arrays sized for `seconds` of race
+    when the race starts, so nothing is allocated while it runs; a longer race keeps
+    its last `seconds`. It stores plain floats through flat memoryviews of the
+    arrays, which costs far less per tick than NumPy item or row assignment.
+
+    save() writes the kept ticks in order as a compressed .npz, one array per column
+    (player_x, bot_speed, ...; bot columns have one column per bot), and can be
+    limited to the last few seconds (crash dumps).
+    """
+
+    def __init__(self, bots, seconds=TELEMETRY_SECONDS):
+        self.capacity = int(seconds / SIM_DELTA_TIME)
+        self.player = np.zeros((self.capacity, len(PLAYER_COLUMNS)), np.float32)
+        self.bots = np.zeros((self.capacity, bots, len(BOT_COLUMNS)), np.float32)
+        # Flat float32 views of both arrays, one row per tick
+        self._player = memoryview(self.player.reshape(-1)).cast("B").cast("f")
+        self._bots = memoryview(self.bots.reshape(-1)).cast("B").cast("f")
+        # Ticks recorded since the start (the buffers hold the last `capacity` of them)
+        self.ticks = 0
+
+    def reset(self):
+        self.ticks = 0
+
+    def record(self, car, level):
+        """Stores the state after one simulation step."""
+        events = level.player_events
+        if car.hit_wall:
+            events |= EVENT_WALL
+        if car.exploding:
+            events |= EVENT_EXPLODED
+        if car.race_won:
+            events |= EVENT_FINISHED
+        row = self.ticks % self.capacity
+        player = self._player
+        base = row * len(PLAYER_COLUMNS)
+        player[base] = car.center_x
+        player[base + 1] = level.view_bottom
+        player[base + 2] = car.speed
+        player[base + 3] = car.speed_row
+        player[base + 4] = car.lives
+        player[base + 5] = events
+        if level.bot_list:
+            bots = self._bots
+            scrolled_y = level.scrolled_y
+            base = row * len(level.bot_list) * len(BOT_COLUMNS)
+            for bot in level.bot_list:
+                bots[base] = bot.center_x
+                bots[base + 1] = bot.center_y + scrolled_y
+                bots[base + 2] = bot.current_speed
+                bots[base + 3] = bot.speed_row
+                bots[base + 4] = (EVENT_EXPLODED if bot.exploding else 0) | (EVENT_FINISHED if bot.race_finished else 0)
+                base += len(BOT_COLUMNS)
+        self.ticks += 1
+
+    def _rows(self, last_ticks=None):
+        # Buffer rows of the kept ticks, oldest first
+        kept = min(self.ticks, self.capacity)
+        if last_ticks is not None:
+            kept = min(kept, last_ticks)
+        first = self.ticks - kept
+        return np.arange(first, self.ticks) % self.capacity, first
+
+    def columns(self, last_seconds=None):
+        """The kept ticks as a dict of column arrays, oldest tick first."""
+        last_ticks = None if last_seconds is None else int(last_seconds / SIM_DELTA_TIME)
+        rows, first = self._rows(last_ticks)
+        columns = {"tick": np.arange(first, self.ticks, dtype=np.int64)}
+        player = self.player[rows]
+        for index, name in enumerate(PLAYER_COLUMNS):
+            columns[f"player_{name}"] = player[:, index]
+        bots = self.bots[rows]
+        for index, name in enumerate(BOT_COLUMNS):
+            columns[f"bot_{name}"] = bots[:, :, index]
+        for name in ("player_speed_row", "player_lives", "player_events", "bot_speed_row", "bot_events"):
+            columns[name] = columns[name].astype(np.int16)
+        return columns
+
+    def save(self, path, last_seconds=None, **metadata):
+        """Writes the kept ticks (or the last `last_seconds`) as a columnar .npz file.
+
+        metadata (level, seed, ...) is stored as extra scalar entries.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        columns = self.columns(last_seconds)
+        columns.update({name: np.asarray(value) for name, value in metadata.items()})
+        columns["delta_time"] = np.asarray(SIM_DELTA_TIME)
+        temporary = path + ".tmp.npz"
+        np.savez_compressed(temporary, **columns)
+        os.replace(temporary, path)
+        return path
@@ -0,0 +1,189 @@
+import arcade
+from animation import AnimatedSprite
+from lane_grid import BROKEN, STOPPED
+from profiler import PROFILER
+
+
+class TileStream:
+    """Sprites for the map rows around the view, streamed in and out as the view moves.
+
+    Rows are read from the level data only when they come within `margin_rows` of the
+    view. Sprites come from recycled pools (plain tiles, and animated sprites per layer)
+    and go back to them once their row has scrolled past, so the number of live sprites
+    stays the same however long the track is. With margin_rows=None every row is loaded
+    up front and only released by reset().
+
+    Each layer is a dict with:
+        name: Tiled layer name
+        grid: LaneGrid holding the cell state (or None for layers without collisions)
+        replace: factory building an animated sprite in place of each tile (or None)
+        overlay: factory building an animated sprite on top of each tile (or None)
+    """
+
+    def __init__(self, level_data, layers, screen_height, broken_texture, margin_rows=None):
+        self.level_data = level_data
+        self.layers = layers
+        self.screen_height = screen_height
+        self.broken_texture = broken_texture
+        self.margin_rows = margin_rows
+
+        # Drawn in layer order, overlays on top
+        self._draw_sections = ["draw." + layer["name"] for layer in layers]
+        self.sprite_lists = [arcade.SpriteList() for layer in layers]
+        self.overlay_lists = [arcade.SpriteList() for layer in layers if layer["overlay"]]
+        self._overlay_for_layer = {}
+        overlay_index = 0
+        for layer_index, layer in enumerate(layers):
+            if layer["overlay"]:
+                self._overlay_for_layer[layer_index] = self.overlay_lists[overlay_index]
+                overlay_index += 1
+        # Every list holding animated sprites
+        self.animated_lists = [self.sprite_lists[i] for i, layer in enumerate(layers) if layer["replace"]]
+        self.animated_lists += self.overlay_lists
+
+        self._pool = []
+        # layer_index -> pooled animated sprites of that layer
+        self._replace_pools = {i: [] for i, layer in enumerate(layers) if layer["replace"]}
+        self._overlay_pools = {i: [] for i, layer in enumerate(layers) if layer["overlay"]}
+        # (layer_index, cell_index) -> [sprite, overlay sprite or None]
+        self._live = {}
+        # row -> keys of the live cells in that row
+        self._row_cells = {}
+        self.first_row = 0
+        self.last_row = -1
+        # How far the sprites have been moved down (legacy scrolling only)
+        self.scrolled_y = 0
+
+        self.reset(0)
+
+    def reset(self, view_bottom, scrolled_y=0):
+        """Releases every live row and loads the rows around view_bottom again.
+
+        Used to restart a race: sprites go back to their pools and come out of them with
+        their animations from the start and the cell state as it is in the lane grids.
+        """
+        for row in list(self._row_cells):
+            self._release_row(row)
+        self.scrolled_y = scrolled_y
+        self.first_row = 0
+        self.last_row = -1
+        if self.margin_rows is None:
+            self._load_rows(0, self.level_data.height - 1)
+            self.last_row = self.level_data.height - 1
+        else:
+            self.update(view_bottom)
+
+    def update(self, view_bottom):
+        """Slides the window of live rows to follow the view."""
+        if self.margin_rows is None:
+            return
+
+        size = self.level_data.tile_size
+        first = max(0, int(view_bottom // size) - self.margin_rows)
+        last = min(self.level_data.height - 1, int((view_bottom + self.screen_height) // size) + self.margin_rows)
+        if first == self.first_row and last == self.last_row:
+            return
+
+        # Release rows that left the window, then load the ones that entered it
+        for row in range(self.first_row, self.last_row + 1):
+            if row < first or row > last:
+                self._release_row(row)
+        for row in range(first, last + 1):
+            if row < self.first_row or row > self.last_row:
+                self._load_rows(row, row)
+        self.first_row = first
+        self.last_row = last
+
+    def _load_rows(self, first, last):
+        data = self.level_data
+        for row in range(first, last + 1):
+            keys = []
+            for layer_index, layer in enumerate(self.layers):
+                if not data.has_layer(layer["name"]):
+                    continue
+                for col, gid in enumerate(data.row(layer["name"], row)):
+                    if gid:
+                        keys.append(self._create(layer_index, layer, row, col, gid))
+            self._row_cells[row] = keys
+
+    def _create(self, layer_index, layer, row, col, gid):
+        data = self.level_data
+        index = row * data.width + col
+        center_x, center_y = data.cell_center(col, row)
+
+        # Plain tile from the pool, positioned in the current scroll frame
+        tile = self._pool.pop() if self._pool else arcade.Sprite()
+        tile.texture = data.texture(gid)
+        tile.scale = data.scaling
+        tile.center_x = center_x
+        tile.center_y = center_y - self.scrolled_y
+
+        sprite = tile
+        if layer["replace"]:
+            pool = self._replace_pools[layer_index]
+            if pool:
+                sprite = pool.pop()
+                sprite.respawn(tile)
+            else:
+                sprite = layer["replace"](tile)
+            self._pool.append(tile)
+
+        overlay = None
+        if layer["overlay"]:
+            pool = self._overlay_pools[layer_index]
+            if pool:
+                overlay = pool.pop()
+                overlay.respawn(tile)
+            else:
+                overlay = layer["overlay"](tile)
+            self._overlay_for_layer[layer_index].append(overlay)
+
+        # Re-apply state from earlier in the race
+        grid = layer["grid"]
+        if grid is not None:
+            if grid.state[index] & BROKEN:
+                sprite.texture = self.broken_texture
+                if isinstance(sprite, AnimatedSprite):
+                    sprite.stop_animation()
+            if grid.state[index] & STOPPED:
+                sprite.stop_animation()
+
+        self.sprite_lists[layer_index].append(sprite)
+        key = (layer_index, index)
+        self._live[key] = [sprite, overlay]
+        return key
+
+    def _release_row(self, row):
+        for key in self._row_cells.pop(row, []):
+            sprite, overlay = self._live.pop(key)
+            layer_index = key[0]
+            self.sprite_lists[layer_index].remove(sprite)
+            if overlay is not None:
+                self._overlay_for_layer[layer_index].remove(overlay)
+                self._overlay_pools[layer_index].append(overlay)
+            if self.layers[layer_index]["replace"]:
+                self._replace_pools[layer_index].append(sprite)
+            else:
+                self._pool.append(sprite)
+
+    def sprite_at(self, layer_index, cell_index):
+        """Live sprite of a cell, or None when its row is outside the window."""
+        live = self._live.get((layer_index, cell_index))
+        return live[0] if live else None
+
+    def scroll(self, distance):
+        """Moves every live sprite down (legacy scrolling)."""
+        for sprite_list in self.sprite_lists + self.overlay_lists:
+            for sprite in sprite_list:
+                sprite.center_y -= distance
+            PROFILER.count("sprites_moved", len(sprite_list))
+        self.scrolled_y += distance
+
+    def draw(self):
+        for name, sprite_list in zip(self._draw_sections, self.sprite_lists):
+            with PROFILER.section(name):
+                sprite_list.draw()
+        with PROFILER.section("draw.overlays"):
+            for sprite_list in self.overlay_lists:
+                sprite_list.draw()
+        PROFILER.count("draw_calls", len(self.sprite_lists) + len(self.overlay_lists))
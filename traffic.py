@@ -0,0 +1,293 @@
+import arcade
+import numpy as np
+from assets import ASSETS
+from profiler import PROFILER
+from simulation import rng_stream
+
+# Look and size of a traffic car (bot sheet, cruising frame)
+TRAFFIC_FRAME = 4
+TRAFFIC_SCALE = 2.5
+TRAFFIC_TINTS = [(255, 255, 255), (255, 170, 170), (170, 200, 255), (190, 255, 170), (255, 230, 140)]
+
+# Driving, in pixels per step (the player tops out around 6.5)
+CRUISE_SPEED_MIN = 2.5
+CRUISE_SPEED_MAX = 4.5
+ACCELERATION = 0.05
+BRAKING = 0.2
+LATERAL_SPEED = 2.0
+# Distances ahead of a car's centre: hazards it plans around, hazards it stops for
+LOOKAHEAD = 400
+STOP_DISTANCE = 200
+# Gap to the car ahead in the same lane: match its speed below FOLLOW_GAP, stop below MIN_GAP
+FOLLOW_GAP = 260
+MIN_GAP = 180
+# Seconds between two lane changes of one car
+LANE_CHANGE_COOLDOWN = 1.5
+# Seconds a car ignores a racer after bumping into it
+CONTACT_COOLDOWN = 1.0
+# Nothing spawns this close to the start line
+START_CLEAR = 800
+# Cars coming back from behind the view spawn within this many screens above it
+RECYCLE_SCREENS = 3
+
+# Stride between lanes in the combined (lane, y) sort key; bigger than any track
+_LANE_KEY = 1e7
+
+# _write_positions writes SpriteList's private position buffer as laid out in arcade
+# 2.6 (checked against 2.6.17); other versions set the sprites' positions instead
+_WRITE_POSITION_BUFFER = arcade.version.VERSION.startswith("2.6.")
+
+
+def traffic_rng(seed):
+    """NumPy generator for the traffic of a race, from the stream "traffic" of its seed."""
+    return np.random.default_rng(rng_stream(seed, "traffic").getrandbits(64))
+
+
+class Traffic:
+    """Ambient cars driving up the track, hundreds of them at a time.
+
+    The cars are not sprites with an update() each: their positions, speeds, lanes
+    and timers are NumPy arrays, and update() moves every car in a few array
+    operations. Hazards are looked up in a per-column running count of the blocked
+    rows of the level, so "is there a hazard in this lane between y0 and y1" is two
+    indexed reads for any number of cars. Cars in the same lane are found by sorting
+    on (lane, y) once per step.
+
+    Traffic cars keep to the lanes (the tile columns between the road edges), follow
+    the car ahead, change lanes around hazards and slower cars, and stop when they
+    cannot. A car left a screen behind the view (or driven past the finish line)
+    comes back in the few screens ahead of the view, never past the finish line.
+    Only as many cars come back as keep the stretch around the view as busy as the
+    track was at the start, so the traffic density stays the same over the whole
+    race; the others wait where they are. Bumping into a racer slows both down, like
+    the bots' contact with the player; traffic never costs a life.
+
+    All cars are drawn by one SpriteList whose position buffer is written as one
+    array (see _write_positions).
+    """
+
+    # Per-car arrays that change during a race (see snapshot/restore)
+    STATE_ARRAYS = ("x", "y", "speed", "cruise_speed", "lane", "lane_timer", "contact_timer")
+
+    def __init__(self, count, level_data, hazard_grids, track_length, screen_height, rng):
+        self.count = count
+        self.tile_size = level_data.tile_size
+        self.screen_height = screen_height
+        self.track_length = track_length
+        # rng draws every random choice (spawns, lane picks) of the traffic
+        self.rng = rng
+
+        # Lanes are the tile columns between the road edges
+        self.lane_column = np.arange(1, level_data.width - 1)
+        self.lane_x = (self.lane_column + 0.5) * self.tile_size
+
+        # Blocked cells of every hazard layer, as a running count per column:
+        # rows a to b of column c hold hazards when blocked_rows[b, c] > blocked_rows[a, c]
+        rows, columns = level_data.height, level_data.width
+        blocked = np.zeros((rows, columns), dtype=bool)
+        for grid in hazard_grids:
+            blocked |= np.frombuffer(grid.gids, dtype=np.uint16).reshape(rows, columns) != 0
+        self.blocked_rows = np.zeros((rows + 1, columns), dtype=np.int32)
+        np.cumsum(blocked, axis=0, out=self.blocked_rows[1:])
+
+        # Per-car state
+        self.x = np.zeros(count)
+        self.y = np.zeros(count)
+        self.speed = np.zeros(count)
+        self.cruise_speed = np.zeros(count)
+        self.lane = np.zeros(count, dtype=np.intp)
+        self.lane_timer = np.zeros(count)
+        self.contact_timer = np.zeros(count)
+        self._spawn(np.arange(count), START_CLEAR, track_length)
+        self.x[:] = self.lane_x[self.lane]
+
+        # One sprite per car, in buffer slot order
+        texture = ASSETS.get("bot_sheet")[TRAFFIC_FRAME]
+        self.sprite_list = arcade.SpriteList()
+        for number in range(count):
+            sprite = arcade.Sprite(texture=texture, scale=TRAFFIC_SCALE)
+            sprite.color = TRAFFIC_TINTS[number % len(TRAFFIC_TINTS)]
+            self.sprite_list.append(sprite)
+        self._slots = np.array([self.sprite_list.sprite_slot[sprite] for sprite in self.sprite_list], dtype=np.intp)
+
+        # Hit box extent around a car's centre, for the contact test
+        hit_box = arcade.Sprite(texture=texture, scale=TRAFFIC_SCALE).get_adjusted_hit_box()
+        self.hit_left = min(point[0] for point in hit_box)
+        self.hit_right = max(point[0] for point in hit_box)
+        self.hit_bottom = min(point[1] for point in hit_box)
+        self.hit_top = max(point[1] for point in hit_box)
+
+    def snapshot(self):
+        state = {name: getattr(self, name).copy() for name in self.STATE_ARRAYS}
+        # The random stream goes with the cars, so a restored race draws what it drew before
+        state["rng"] = self.rng.bit_generator.state
+        return state
+
+    def restore(self, state):
+        """Puts every car and the random stream back to a snapshot."""
+        for name in self.STATE_ARRAYS:
+            getattr(self, name)[:] = state[name]
+        self.rng.bit_generator.state = state["rng"]
+
+    def reset(self, rng):
+        """Lays the traffic out afresh from rng, as a new race with that stream starts."""
+        self.rng = rng
+        self._spawn(np.arange(self.count), START_CLEAR, self.track_length)
+        self.x[:] = self.lane_x[self.lane]
+
+    def _spawn(self, cars, low, high):
+        # Puts cars at random free spots between low and high, at cruising speed
+        # (a car moved up off a hazard stops at high)
+        rng = self.rng
+        self.y[cars] = rng.uniform(low, high, len(cars))
+        self.lane[cars] = rng.integers(len(self.lane_x), size=len(cars))
+        # Move off hazards: another lane, or further up the track
+        for attempt in range(4):
+            column = self.lane_column[self.lane[cars]]
+            on_hazard = self._hazards(column, self.y[cars] - self.tile_size, self.y[cars] + self.tile_size)
+            if not on_hazard.any():
+                break
+            moved = cars[on_hazard]
+            self.lane[moved] = rng.integers(len(self.lane_x), size=len(moved))
+            self.y[moved] = np.minimum(self.y[moved] + self.tile_size * 2, high)
+        self.cruise_speed[cars] = rng.uniform(CRUISE_SPEED_MIN, CRUISE_SPEED_MAX, len(cars))
+        self.speed[cars] = self.cruise_speed[cars]
+        self.lane_timer[cars] = 0.0
+        self.contact_timer[cars] = 0.0
+
+    def _hazards(self, column, y0, y1):
+        """True for every car whose column holds a hazard between y0 and y1 (arrays)."""
+        rows = len(self.blocked_rows) - 1
+        first = np.clip((y0 // self.tile_size).astype(np.intp), 0, rows)
+        last = np.clip((y1 // self.tile_size).astype(np.intp) + 1, 0, rows)
+        return self.blocked_rows[last, column] > self.blocked_rows[first, column]
+
+    def update(self, delta_time, view_bottom, scrolled_y, racers):
+        """One simulation step of every car.
+
+        racers is a list of (sprite, on_contact): when cars start touching a racer's
+        hit box they slow down and on_contact() is called (once per CONTACT_COOLDOWN
+        for each car).
+        """
+        with PROFILER.section("traffic.update"):
+            self._drive(delta_time)
+            self._recycle(view_bottom)
+        with PROFILER.section("traffic.contact"):
+            for sprite, on_contact in racers:
+                self._contact(sprite, scrolled_y, on_contact)
+        PROFILER.count("traffic_cars", self.count)
+
+    def _drive(self, delta_time):
+        x, y, lane = self.x, self.y, self.lane
+        lanes = len(self.lane_x)
+        count = self.count
+
+        # Car ahead in the same lane: sort on (lane, y), neighbours in the order share a lane
+        keys = lane * _LANE_KEY + y
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+        same_lane = lane[order[1:]] == lane[order[:-1]]
+        gap = np.full(count, np.inf)
+        leader_speed = np.full(count, np.inf)
+        gap[order[:-1]] = np.where(same_lane, y[order[1:]] - y[order[:-1]], np.inf)
+        leader_speed[order[:-1]] = np.where(same_lane, self.speed[order[1:]], np.inf)
+
+        # Change lanes around hazards and slower cars ahead
+        column = self.lane_column[lane]
+        hazard_ahead = self._hazards(column, y, y + LOOKAHEAD)
+        held_up = (gap < FOLLOW_GAP) & (leader_speed < self.cruise_speed)
+        cars = np.flatnonzero((hazard_ahead | held_up) & (self.lane_timer <= 0))
+        if len(cars):
+            # Left or right first at random; a side is open when it exists, has no
+            # hazard ahead and no car within FOLLOW_GAP
+            side = np.where(self.rng.random(len(cars)) < 0.5, -1, 1)
+            chosen = np.full(len(cars), -1)
+            for direction in (side, -side):
+                target = lane[cars] + direction
+                open_lane = (target >= 0) & (target < lanes) & (chosen < 0)
+                target = np.clip(target, 0, lanes - 1)
+                open_lane &= ~self._hazards(self.lane_column[target], y[cars] - self.tile_size, y[cars] + LOOKAHEAD)
+                low = np.searchsorted(sorted_keys, target * _LANE_KEY + y[cars] - FOLLOW_GAP)
+                high = np.searchsorted(sorted_keys, target * _LANE_KEY + y[cars] + FOLLOW_GAP)
+                open_lane &= low == high
+                chosen = np.where(open_lane, target, chosen)
+            moved = chosen >= 0
+            lane[cars[moved]] = chosen[moved]
+            self.lane_timer[cars] = LANE_CHANGE_COOLDOWN
+
+        # Speed: cruise, follow the car ahead, stop for hazards under the car
+        target_speed = self.cruise_speed.copy()
+        following = gap < FOLLOW_GAP
+        target_speed[following] = np.minimum(target_speed[following], leader_speed[following])
+        target_speed[gap < MIN_GAP] = 0.0
+        left_column = ((x + self.hit_left) // self.tile_size).astype(np.intp)
+        right_column = ((x + self.hit_right) // self.tile_size).astype(np.intp)
+        stop = self._hazards(left_column, y, y + STOP_DISTANCE) | self._hazards(right_column, y, y + STOP_DISTANCE)
+        target_speed[stop] = 0.0
+        self.speed += np.clip(target_speed - self.speed, -BRAKING, ACCELERATION)
+
+        # Steer to the lane centre, then drive (BotCar's speed scaling)
+        x += np.clip(self.lane_x[lane] - x, -LATERAL_SPEED, LATERAL_SPEED)
+        y += self.speed * delta_time * 60
+        self.lane_timer -= delta_time
+        self.contact_timer -= delta_time
+
+    def _recycle(self, view_bottom):
+        # Cars a screen behind the view or past the finish line come back ahead of the
+        # view, as many as keep the stretch from a screen behind the view to
+        # RECYCLE_SCREENS above it at the density of the start
+        bottom = view_bottom - self.screen_height
+        low = view_bottom + self.screen_height + self.tile_size
+        high = min(view_bottom + (RECYCLE_SCREENS + 1) * self.screen_height, self.track_length)
+        out = (self.y < bottom) | (self.y > self.track_length)
+        if low >= high or not out.any():
+            return
+        wanted = int(self.count * (high - bottom) / (self.track_length - START_CLEAR))
+        around = np.count_nonzero(self.y < high) - np.count_nonzero(self.y < bottom)
+        back = np.flatnonzero(out)[:max(0, wanted - around)]
+        if len(back):
+            self._spawn(back, low, high)
+            self.x[back] = self.lane_x[self.lane[back]]
+            PROFILER.count("traffic_recycled", len(back))
+
+    def _contact(self, sprite, scrolled_y, on_contact):
+        # Hit box overlap as bounding boxes, against every car at once
+        # (moved to world space for legacy scrolling)
+        hit_box = sprite.get_adjusted_hit_box()
+        left = min(point[0] for point in hit_box)
+        right = max(point[0] for point in hit_box)
+        bottom = min(point[1] for point in hit_box) + scrolled_y
+        top = max(point[1] for point in hit_box) + scrolled_y
+        touching = (
+            (self.x + self.hit_left < right) & (self.x + self.hit_right > left)
+            & (self.y + self.hit_bottom < top) & (self.y + self.hit_top > bottom)
+            & (self.contact_timer <= 0)
+        )
+        if touching.any():
+            self.speed[touching] *= 0.8
+            self.contact_timer[touching] = CONTACT_COOLDOWN
+            on_contact()
+
+    def draw(self, scrolled_y=0):
+        self._write_positions(scrolled_y)
+        self.sprite_list.draw()
+
+    def _write_positions(self, scrolled_y):
+        """Copies every car's position into the sprite list's position buffer.
+
+        SpriteList keeps positions as a flat (x, y) float buffer per slot; writing it
+        as one array replaces a position setter call per sprite. The sprites' own
+        center_x/center_y are not updated: traffic sprites are only ever drawn.
+        The buffer (_sprite_pos_data, _sprite_pos_changed) is private to arcade 2.6;
+        with any other arcade version every sprite's position is set instead.
+        """
+        if not _WRITE_POSITION_BUFFER:
+            for sprite, x, y in zip(self.sprite_list, self.x.tolist(), (self.y - scrolled_y).tolist()):
+                sprite.position = (x, y)
+            PROFILER.count("sprites_moved", self.count)
+            return
+        positions = np.frombuffer(self.sprite_list._sprite_pos_data, dtype=np.float32)
+        positions[self._slots * 2] = self.x
+        positions[self._slots * 2 + 1] = self.y - scrolled_y
+        self.sprite_list._sprite_pos_changed = True
+        PROFILER.count("sprites_moved", self.count)